@@ -0,0 +1,61 @@
+from timeit import default_timer as timer
+from typing import Callable
+
+from logic_variables import euc, n_Vars, unify_pairs, Var
+from sequence_options.linked_list import append, emptyLinkedList, LinkedList
+
+"""
+LinkedList append on long lists: the trampolined append against the nested yield-from version it replaced.
+
+  forward:   append(Xs, Ys, Zs) with Xs of length n and Zs a Var. One solution, found at depth n.
+  backward:  append(Xs, Ys, Zs) with Xs and Ys Vars and Zs of length n. n+1 solutions, the kth at depth k.
+
+With nested yield froms, each resume passes down the whole delegation chain, so the backward run is
+quadratic, and a deep enough chain raises RecursionError. The trampolined version resumes only the
+innermost goal.
+
+Run from the pylog directory:  python -m benchmarks.deep_append
+"""
+
+
+@euc
+def nested_append(Xs, Ys, Zs):
+  """ append as it was written before trampolining. """
+  yield from unify_pairs([(Xs, emptyLinkedList), (Ys, Zs)])
+  (XZ_Head, Xs_Tail, Zs_Tail) = n_Vars(3)
+  for _ in unify_pairs([(Xs, LinkedList(XZ_Head, Xs_Tail)),
+                        (Zs, LinkedList(XZ_Head, Zs_Tail))]):
+    yield from nested_append(Xs_Tail, Ys, Zs_Tail)
+
+
+def forward(append_function: Callable, n: int):
+  (Xs, Ys, Zs) = (LinkedList(list(range(n))), LinkedList(['end']), Var( ))
+  for _ in append_function(Xs, Ys, Zs):
+    assert len(Zs.unification_chain_end( )) == n + 1
+    return 1
+  return 0
+
+
+def backward(append_function: Callable, n: int):
+  (Xs, Ys, Zs) = (Var( ), Var( ), LinkedList(list(range(n))))
+  return sum(1 for _ in append_function(Xs, Ys, Zs))
+
+
+def time_it(run: Callable, append_function: Callable, n: int) -> str:
+  start = timer( )
+  try:
+    solutions = run(append_function, n)
+  except RecursionError:
+    return f'{"RecursionError":>22}'
+  return f'{timer( ) - start:>9.3f} sec {solutions:>6} sol'
+
+
+def run_benchmark(sizes=(100, 200, 400, 1_000, 2_000, 10_000)):
+  print(f'{"":<10}{"n":>7}  {"trampolined":>22}  {"nested yield from":>22}')
+  for run in [forward, backward]:
+    for n in sizes:
+      print(f'{run.__name__:<10}{n:>7}  {time_it(run, append, n)}  {time_it(run, nested_append, n)}')
+
+
+if __name__ == '__main__':
+  run_benchmark( )
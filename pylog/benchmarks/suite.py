@@ -0,0 +1,185 @@
+import io
+import json
+import platform
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from os.path import dirname, join
+from timeit import default_timer as timer
+from typing import Any, Dict, List, Optional
+
+from finite_domains import propagation_queue
+from logic_variables import trail
+
+from benchmarks.workloads import queens_no_logic_vars, Workload, WORKLOADS
+
+"""
+The benchmark suite: every shipped example workload at several scales.
+
+For each workload and scale it records
+  seconds       the best wall time of --repeat runs,
+  unifications  calls to unify_on_trail,
+  backtracks    trail rollbacks that undid at least one binding,
+  propagations  propagator runs, for the finite-domain workloads,
+  peak_kib      peak traced memory, from a separate run under tracemalloc, and
+  solutions     the number of solutions found.
+The results are written as JSON and compared with the stored baseline. Any regression is listed, and the
+exit status is 1. The counts are the same on every machine, so they are compared exactly: a different
+number of solutions, or more work (unifications, backtracks, propagations) than the baseline, is a
+regression. Times and memory depend on the machine and the Python version, so they are compared only
+when asked for, with --time-tolerance and --memory-tolerance. Times are first scaled by how fast this
+machine runs a fixed pure-Python calibration search, against the machine that recorded the baseline.
+On a busy or shared machine, times still vary by more than any useful tolerance.
+
+Run from the pylog directory:
+  python -m benchmarks.suite                     # Run everything and compare with benchmarks/baseline.json.
+  python -m benchmarks.suite zebra n_queens_cp   # Run only these workloads.
+  python -m benchmarks.suite --time-tolerance 0.25   # Also flag times 25% over the (scaled) baseline.
+  python -m benchmarks.suite --update-baseline   # Record a new baseline, e.g., on a new machine.
+  python -m benchmarks.suite n_queens_fd --update-baseline   # Re-record only these workloads.
+"""
+
+BASELINE = join(dirname(__file__), 'baseline.json')
+RESULTS = join(dirname(__file__), 'results.json')
+
+
+def measure(workload: Workload, scale: Any, repeat: int) -> Dict[str, Any]:
+  """ Run workload at scale repeat times for time and counts, then once more under tracemalloc for memory. """
+  best_seconds = float('inf')
+  for _ in range(repeat):
+    (unifications, backtracks, propagations) = \
+      (trail.unifications, trail.backtracks, propagation_queue.propagations)
+    start = timer( )
+    # The puzzles print a trace as they go. Keep it out of the report.
+    with redirect_stdout(io.StringIO( )):
+      solutions = workload.run(scale)
+    best_seconds = min(best_seconds, timer( ) - start)
+    (unifications, backtracks, propagations) = (trail.unifications - unifications, trail.backtracks - backtracks,
+                                                propagation_queue.propagations - propagations)
+
+  tracemalloc.start( )
+  with redirect_stdout(io.StringIO( )):
+    workload.run(scale)
+  (_, peak) = tracemalloc.get_traced_memory( )
+  tracemalloc.stop( )
+
+  return {'solutions': solutions, 'seconds': round(best_seconds, 4), 'unifications': unifications,
+          'backtracks': backtracks, 'propagations': propagations, 'peak_kib': round(peak / 1024, 1)}
+
+
+def calibrate(repeat: int = 10) -> float:
+  """
+  How fast this machine runs plain Python: the best time of the 8-queens search written without logic
+  variables (n_queens_no_logic_vars), which no change to pylog affects.
+  """
+  best = float('inf')
+  for _ in range(repeat):
+    start = timer( )
+    queens_no_logic_vars(8)
+    best = min(best, timer( ) - start)
+  return round(best, 4)
+
+
+def run_suite(names: List[str], repeat: int) -> Dict[str, Dict[str, Any]]:
+  results = {}
+  for name in names:
+    workload = WORKLOADS[name]
+    for scale in workload.scales:
+      key = f'{name}[{scale}]'
+      results[key] = measure(workload, scale, repeat)
+      print(f'{key:<45} ' + '  '.join(f'{k}: {v}' for (k, v) in results[key].items( )), flush=True)
+  return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            time_tolerance: Optional[float], memory_tolerance: Optional[float], work_tolerance: float,
+            slowdown: float = 1) -> List[str]:
+  """
+  Return a description of each regression of results against baseline.
+  A tolerance is the fraction by which a measurement may exceed its baseline. A tolerance of None means
+  that measurement is not compared. Baseline times are multiplied by slowdown, this machine's calibration
+  time over the baseline's. Differences in time under 10 ms and in memory under 64 KiB are never
+  regressions. They are below the noise.
+  """
+  regressions = []
+  for (key, result) in results.items( ):
+    base = baseline.get(key)
+    if base is None:
+      continue
+    if result['solutions'] != base['solutions']:
+      regressions.append(f"{key}: {result['solutions']} solutions; the baseline has {base['solutions']}")
+    limits = [('seconds', time_tolerance, 0.010, slowdown),
+              ('peak_kib', memory_tolerance, 64, 1),
+              ('unifications', work_tolerance, 0, 1),
+              ('backtracks', work_tolerance, 0, 1),
+              ('propagations', work_tolerance, 0, 1)]
+    for (measurement, tolerance, noise, scale) in limits:
+      # A baseline recorded before a measurement was added has nothing to compare it with.
+      if tolerance is None or measurement not in base:
+        continue
+      (new, old) = (result[measurement], round(base[measurement] * scale, 4))
+      if new > old * (1 + tolerance) and new - old > noise:
+        regressions.append(f'{key}: {measurement} {new} vs. baseline {old} (x{new / max(old, 1e-9):.2f})')
+  return regressions
+
+
+def main(argv: List[str]) -> int:
+  parser = ArgumentParser(description='Run the pylog benchmark suite and compare it with the baseline.')
+  parser.add_argument('workloads', nargs='*', help=f'default: all of them: {", ".join(WORKLOADS)}')
+  parser.add_argument('--repeat', type=int, default=3, help='runs per measurement; the best time is kept')
+  parser.add_argument('--output', default=RESULTS, help='where to write the JSON results')
+  parser.add_argument('--baseline', default=BASELINE)
+  parser.add_argument('--update-baseline', action='store_true',
+                      help='store these results in the baseline, replacing the entries for the workloads run')
+  parser.add_argument('--time-tolerance', type=float, default=None,
+                      help='compare times, after calibration, allowing this fraction more; default: no')
+  parser.add_argument('--memory-tolerance', type=float, default=None,
+                      help='compare peak memory, allowing this fraction more; default: no')
+  parser.add_argument('--work-tolerance', type=float, default=0,
+                      help='the fraction more unifications, backtracks, and propagations allowed')
+  args = parser.parse_args(argv)
+  unknown = [name for name in args.workloads if name not in WORKLOADS]
+  if unknown:
+    parser.error(f'unknown workload(s) {", ".join(unknown)}; choose from {", ".join(WORKLOADS)}')
+
+  calibration = calibrate( )
+  print(f'Calibration: {calibration} sec', flush=True)
+  results = run_suite(args.workloads or list(WORKLOADS), args.repeat)
+  report = {'python': platform.python_version( ), 'platform': platform.platform( ),
+            'calibration_seconds': calibration, 'results': results}
+  with open(args.output, 'w') as output:
+    json.dump(report, output, indent=2)
+
+  if args.update_baseline:
+    if args.workloads:
+      # Keep the stored entries for the workloads not run.
+      with open(args.baseline) as baseline_file:
+        stored = json.load(baseline_file)
+      # The new times are scaled to the stored calibration, so that all the times are on one machine's scale.
+      stored_calibration = stored.get('calibration_seconds', calibration)
+      for result in results.values( ):
+        result['seconds'] = round(result['seconds'] * stored_calibration / calibration, 4)
+      report['results'] = {**stored['results'], **results}
+      report['calibration_seconds'] = stored_calibration
+    with open(args.baseline, 'w') as baseline_file:
+      json.dump(report, baseline_file, indent=2)
+    print(f'\nBaseline written to {args.baseline}')
+    return 0
+
+  with open(args.baseline) as baseline_file:
+    baseline = json.load(baseline_file)
+  slowdown = calibration / baseline['calibration_seconds'] if 'calibration_seconds' in baseline else 1
+  regressions = compare(results, baseline['results'], args.time_tolerance, args.memory_tolerance,
+                        args.work_tolerance, slowdown)
+  if regressions:
+    print(f'\n{"!" * 30} {len(regressions)} REGRESSION{"S" if len(regressions) > 1 else ""} {"!" * 30}')
+    for regression in regressions:
+      print(f'  {regression}')
+    return 1
+  print(f'\nNo regressions against {args.baseline}')
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,85 @@
+import tracemalloc
+from itertools import count
+from typing import Callable
+
+from logic_variables import PyValue, Structure, Var
+
+"""
+Bytes per term, before and after Terms were given __slots__.
+
+"Before" is a faithful copy of the old layout: every Term had a __dict__ and took a term_id from a
+global counter when it was created. "After" is the current Term hierarchy.
+
+The slots alone took a PyValue from 148 to 80 bytes and a 3-arg Structure from 568 to 304. The current
+Terms carry more than that. A PyValue has a _ground flag and a __weakref__ slot for the intern table,
+for 96 bytes. A Structure has a _ground flag too. Each distinct constant in it also adds an entry to the
+intern table, so a Structure with distinct constants takes about 476 bytes. One whose constants come
+from a small vocabulary, as in the puzzles, shares interned PyValues and takes about 184 bytes.
+
+Run from the pylog directory:  python -m benchmarks.term_memory
+"""
+
+
+class DictTerm:
+  term_count = count(1)
+
+  def __init__(self):
+    self.term_id = next(DictTerm.term_count)
+
+
+class DictVar(DictTerm):
+  def __init__(self):
+    self.unification_chain_next = None
+    super().__init__()
+
+
+class DictPyValue(DictTerm):
+  def __init__(self, py_value=None):
+    self._py_value = py_value
+    super().__init__()
+
+
+class DictStructure(DictTerm):
+  def __init__(self, term):
+    self.functor = term[0]
+    self.args = tuple(term[1:])
+    super().__init__()
+
+
+def bytes_per_term(make_term: Callable, n: int = 100_000) -> float:
+  """ The memory allocated per call of make_term, averaged over n calls that are all kept alive. """
+  tracemalloc.start( )
+  before = tracemalloc.take_snapshot( )
+  terms = [make_term(i) for i in range(n)]
+  after = tracemalloc.take_snapshot( )
+  tracemalloc.stop( )
+  allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+  # Don't charge the terms for the list that holds them.
+  allocated -= terms.__sizeof__( )
+  return allocated / n
+
+
+def run(n: int = 100_000):
+  # The Structure rows include their three args, i.e., a 'house' with two constants and a Var.
+  # The constants are distinct, as in the other rows, so the rows measure the layout alone.
+  rows = [('Var',       lambda _: DictVar( ),
+                        lambda _: Var( )),
+          ('PyValue',   lambda i: DictPyValue(i),
+                        lambda i: PyValue(i)),
+          ('Structure', lambda i: DictStructure(('house', DictPyValue(i), DictPyValue(i), DictVar( ))),
+                        lambda i: Structure(('house', i, i, Var( )))),
+          ]
+  print(f'{"term":<10} {"before":>8} {"after":>8}   (bytes per term, {n:,} terms)')
+  for (name, make_before, make_after) in rows:
+    (before, after) = (bytes_per_term(make_before, n), bytes_per_term(make_after, n))
+    print(f'{name:<10} {before:>8.1f} {after:>8.1f}')
+
+  # Interning is a separate saving. In the puzzles, the constants come from a small vocabulary, and
+  # Structures share the interned PyValues for them.
+  colors = ['blue', 'green', 'red', 'white', 'yellow']
+  shared = bytes_per_term(lambda i: Structure(('house', colors[i % 5], i % 5, Var( ))), n)
+  print(f'\nA Structure with constants from a vocabulary of 5: {shared:.1f} bytes, with interned PyValues shared')
+
+
+if __name__ == '__main__':
+  run( )
@@ -0,0 +1,250 @@
+import random
+from os.path import join
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+
+from checkpoints import resumable_solutions
+from control_structures import Trace, trampoline
+from finite_domains import FDVar, labeling, post
+from logic_variables import PyValue, TermTemplate
+from parallel import parallel_count, work_stealing_count
+from search import geometric, label, luby, restarts
+from serialization import dumps, loads
+from sequence_options.linked_list import LinkedList
+from sequence_options.sequences import PyList, PySet, PyTuple
+
+import examples.cryptarithmetic as cryptarithmetic
+import examples.cryptarithmetic_fd as cryptarithmetic_fd
+import examples.logic_puzzles.scholarship_problem_fd as scholarship_problem_fd
+import examples.logic_puzzles.zebra_problem_fd as zebra_problem_fd
+import examples.n_queens.n_queens as n_queens
+import examples.n_queens.n_queens_cp as n_queens_cp
+import examples.n_queens.n_queens_fd as n_queens_fd
+import examples.n_queens.n_queens_no_logic_vars as n_queens_no_logic_vars
+import examples.trains as trains
+import examples.transversals as transversals
+from examples.logic_puzzles.scholarship_problem import ScholarshipProblem
+from examples.logic_puzzles.zebra_problem import House, ZebraProblem
+
+"""
+The shipped example workloads, packaged to run headless: no input( ), no timing prints.
+
+Each workload takes one scale argument and returns the number of solutions it found, which the suite
+checks against the baseline. A workload's scales are listed in WORKLOADS.
+"""
+
+
+class Workload(NamedTuple):
+  run: Callable[..., int]
+  scales: Tuple
+
+
+def zebra(list_type_name: str) -> int:
+  """ All solutions of the zebra puzzle, using the named sequence type for the Houses. """
+  problem = ZebraProblem( )
+  problem.ListType = LIST_TYPES[list_type_name]
+  return sum(1 for _ in problem.run_all_clues( ))
+
+
+def zebra_backjumping(list_type_name: str) -> int:
+  """ zebra( ) with conflict-directed backjumping and nogoods. """
+  problem = ZebraProblem( )
+  problem.ListType = LIST_TYPES[list_type_name]
+  return sum(1 for _ in problem.run_all_clues_backjumping( ))
+
+
+def zebra_fd(_) -> int:
+  """ All solutions of the zebra puzzle with finite-domain variables. """
+  return sum(1 for _ in zebra_problem_fd.solve_zebra(zebra_problem_fd.new_houses( )))
+
+
+def scholarship(list_type_name: str) -> int:
+  """ All solutions of the scholarship puzzle, using the named sequence type for the Students. """
+  problem = ScholarshipProblem( )
+  problem.ListType = LIST_TYPES[list_type_name]
+  return sum(1 for _ in problem.run_all_clues( ))
+
+
+def scholarship_fd(_) -> int:
+  """ All solutions of the scholarship puzzle with finite-domain variables. """
+  return sum(1 for _ in scholarship_problem_fd.solve_scholarship(scholarship_problem_fd.new_students( )))
+
+
+def queens(board_width: int) -> int:
+  """ All solutions, with a PyValue per row. """
+  placement = [PyValue( ) for _ in range(board_width)]
+  return sum(1 for _ in n_queens.place_remaining_queens(placement))
+
+
+def queens_no_logic_vars(board_width: int) -> int:
+  """ All solutions, with plain Python ints. """
+  return sum(1 for _ in n_queens_no_logic_vars.place_remaining_queens([], board_width))
+
+
+def queens_fd(board_width: int) -> int:
+  """ All solutions, with an FDVar per row and the constraints posted before labeling. """
+  Queens = [FDVar(range(board_width)) for _ in range(board_width)]
+  return sum(1 for _ in post(*n_queens_fd.queens_constraints(Queens)) for _ in labeling(Queens))
+
+
+def queens_parallel(board_width: int) -> int:
+  """ All solutions with an FDVar per row, counted by two worker processes, split three levels down. """
+  return parallel_count(n_queens_fd.queens_problem, (board_width, ), depth=3, max_workers=2)
+
+
+def queens_stealing(board_width: int) -> int:
+  """ All solutions with an FDVar per row, counted by two worker processes that share the work as they go. """
+  return work_stealing_count(n_queens_fd.queens_problem, (board_width, ), workers=2)
+
+
+def queens_search(order_and_width: str) -> int:
+  """
+  The first solution with an FDVar per row, given as 'var_order:value_order:n', labeled by search.label
+  with random tie-breaking from a fixed seed.
+  """
+  (var_order, value_order, board_width) = order_and_width.split(':')
+  Queens = [FDVar(range(int(board_width))) for _ in range(int(board_width))]
+  for _ in post(*n_queens_fd.queens_constraints(Queens)):
+    for _ in label(Queens, var_order, value_order, 'random', random.Random(int(board_width))):
+      return 1
+  return 0
+
+
+def queens_restarts(cutoffs_and_width: str) -> int:
+  """
+  The first solution with an FDVar per row, given as 'cutoffs:n', where cutoffs is luby or geometric, in
+  fails. Each run labels first_fail with random values and tie-breaking, from a fixed seed.
+  """
+  (cutoffs, board_width) = cutoffs_and_width.split(':')
+  Queens = [FDVar(range(int(board_width))) for _ in range(int(board_width))]
+  rng = random.Random(int(board_width))
+  for _ in post(*n_queens_fd.queens_constraints(Queens)):
+    search = lambda stop: label(Queens, 'first_fail', 'random', 'random', rng, stop)
+    for _ in restarts(search, luby(4) if cutoffs == 'luby' else geometric(4, 1.5)):
+      return 1
+  return 0
+
+
+def queens_cp(board_size: int) -> int:
+  """ The first solution of the forward-checking version, from a fixed random seed and without restarts. """
+  (goal, _) = n_queens_cp.queens_problem(board_size, 1)
+  for _ in trampoline(goal):
+    return 1
+  return 0
+
+
+def queens_checkpoint(board_size: int) -> int:
+  """ queens_cp, checkpointed to a temporary file every 100 alternatives. """
+  with TemporaryDirectory( ) as directory:
+    for _ in resumable_solutions(n_queens_cp.queens_problem, (board_size, 1), join(directory, 'checkpoint'), 100):
+      return 1
+  return 0
+
+
+def solved_zebra( ) -> PyList:
+  """ The zebra puzzle's solution. """
+  return PyList([House(*properties) for properties in [('Norwegian', 'Kools', 'fox', 'water', 'yellow'),
+                                                        ('Ukrainian', 'Chesterfield', 'horse', 'tea', 'blue'),
+                                                        ('English', 'Old Gold', 'snails', 'milk', 'red'),
+                                                        ('Spanish', 'Lucky Strike', 'dog', 'orange juice', 'ivory'),
+                                                        ('Japanese', 'Parliament', 'zebra', 'coffee', 'green')]])
+
+
+def unsolved_houses( ) -> LinkedList:
+  """ Houses before the clues: unbound, but for two that share a pet. """
+  Houses = [House( ) for _ in range(5)]
+  Houses[3] = House(nationality='Spanish', pet=Houses[0].args[2])
+  return LinkedList(Houses)
+
+
+SERIALIZED_TERMS: Dict[str, Callable[[], Any]] = {
+  'zebra':       solved_zebra,
+  'houses':      unsolved_houses,
+  'linked_list': lambda: LinkedList(list(range(1000))),
+  }
+
+
+def serialize(term_name: str) -> int:
+  """ 100 round trips of a term through serialization.dumps and loads. """
+  T = SERIALIZED_TERMS[term_name]( )
+  return sum(1 for _ in range(100) if loads(dumps(T)) is not T)
+
+
+def templates(how: str) -> int:
+  """
+  10,000 Houses with two properties each, as the zebra clues make them: by 'constructor', from a
+  'template' (logic_variables.TermTemplate), or by House.fresh( ), which looks the template up ('fresh').
+  """
+  make = {'constructor': lambda: House(nationality='English', color='red'),
+          'template':    TermTemplate(House(nationality='English', color='red')),
+          'fresh':       lambda: House.fresh(nationality='English', color='red')}[how]
+  return sum(1 for _ in range(10_000) if make( ) is not None)
+
+
+def crypto(puzzle: str) -> int:
+  """ All solutions of an alphametic given as 'TERM1+TERM2=SUM'. """
+  (terms, sum_word) = puzzle.split('=')
+  (t1, t2) = terms.split('+')
+  (Carries, T1, T2, Sum, Leading_Digits) = cryptarithmetic.set_up_puzzle(t1, t2, sum_word, PyValue(0))
+  return sum(1 for _ in cryptarithmetic.solve(Carries, T1, T2, Sum, Leading_Digits))
+
+
+def crypto_fd(puzzle: str) -> int:
+  """ All solutions of an alphametic given as 'TERM+...+TERM=SUM', as one linear constraint. """
+  (terms, sum_word) = puzzle.split('=')
+  return sum(1 for _ in cryptarithmetic_fd.solve_crypto(terms.split('+'), sum_word))
+
+
+def transversal(n: int) -> int:
+  """
+  All transversals of n sets: set i is {1, ..., n} without i. (The transversals are the derangements of n.)
+  """
+  sets = [PySet(set(range(1, n + 1)) - {i}) for i in range(1, n + 1)]
+  Trace.trace = False
+  try:
+    return sum(1 for _ in transversals.tnvsl_dfs_gen_lv(sets, tuple(PyValue( ) for _ in range(n))))
+  finally:
+    Trace.trace = True
+
+
+def transversal_fd(n_and_consistency: str) -> int:
+  """ All transversals of the same sets as transversal( ), given as 'n/consistency', with all_different posted. """
+  (n, consistency) = n_and_consistency.split('/')
+  sets = [set(range(1, int(n) + 1)) - {i} for i in range(1, int(n) + 1)]
+  return sum(1 for _ in transversals.tnvsl_fd(sets, consistency))
+
+
+def train_routes(pair_count: int) -> int:
+  """ best_route for the first pair_count ordered pairs of distinct stations. """
+  stations = sorted({station for stations in trains.lines.values( ) for station in stations})
+  pairs = [(s1, s2) for s1 in stations for s2 in stations if s1 != s2][:pair_count]
+  return sum(1 for (s1, s2) in pairs for _ in trains.best_route(PyValue(s1), PyValue(s2)))
+
+
+LIST_TYPES: Dict[str, type] = {'PyList': PyList, 'PyTuple': PyTuple, 'LinkedList': LinkedList}
+
+WORKLOADS: Dict[str, Workload] = {
+  'zebra':                Workload(zebra, ('PyList', 'PyTuple', 'LinkedList')),
+  'zebra_backjumping':    Workload(zebra_backjumping, ('PyList', 'LinkedList')),
+  'zebra_fd':             Workload(zebra_fd, ('FDVar', )),
+  'scholarship':          Workload(scholarship, ('PyList', 'PyTuple', 'LinkedList')),
+  'scholarship_fd':       Workload(scholarship_fd, ('FDVar', )),
+  'n_queens':             Workload(queens, (6, 7, 8)),
+  'n_queens_no_logic_vars': Workload(queens_no_logic_vars, (6, 8, 9)),
+  'n_queens_fd':          Workload(queens_fd, (6, 7, 8)),
+  'n_queens_parallel':    Workload(queens_parallel, (8, 9)),
+  'n_queens_stealing':    Workload(queens_stealing, (8, 9)),
+  'n_queens_search':      Workload(queens_search, ('first_fail:median:40', 'dom/wdeg:median:40',
+                                                   'most_constrained:min:60')),
+  'n_queens_restarts':    Workload(queens_restarts, ('luby:60', 'geometric:60', 'luby:100')),
+  'n_queens_cp':          Workload(queens_cp, (8, 50, 235)),
+  'n_queens_checkpoint':  Workload(queens_checkpoint, (50, 235)),
+  'cryptarithmetic':      Workload(crypto, ('BASE+BALL=GAMES', 'SEND+MORE=MONEY', 'SATURN+URANUS=PLANETS')),
+  'cryptarithmetic_fd':   Workload(crypto_fd, ('BASE+BALL=GAMES', 'SEND+MORE=MONEY', 'SATURN+URANUS=PLANETS')),
+  'transversals':         Workload(transversal, (5, 6, 7)),
+  'transversals_fd':      Workload(transversal_fd, ('5/domain', '7/domain', '7/bounds')),
+  'trains':               Workload(train_routes, (10, 40, 160)),
+  'serialization':        Workload(serialize, ('zebra', 'houses', 'linked_list')),
+  'templates':            Workload(templates, ('constructor', 'template', 'fresh')),
+}
+
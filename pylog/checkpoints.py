@@ -0,0 +1,115 @@
+import os
+import pickle
+from typing import Any, Callable, Generator, Iterator, List, Optional, Tuple
+
+from control_structures import ChoiceTrampoline
+from logic_variables import trail
+from serialization import packed, unpacked
+
+"""
+Checkpoints: a long search that can be stopped, or can crash, and be resumed where it was.
+
+The state of a running search lives in its generators' frames, which can't be saved. What can be saved is
+where the search is: the subproblems it has not yet searched, each a choice path and the first alternative
+to try at its end (see control_structures.ChoiceTrampoline.frontier). That is a short list of small ints.
+To resume, each subproblem's search is rebuilt by running the goal again from the start down its path,
+skipping the alternatives off the path. So, as for parallel.py, the search is given as a problem function
+that builds a fresh goal and an answer function, and the goal must make the same choices each time it is
+built. A randomized search must get its random numbers from a seeded rng, and must draw them the same
+way when alternatives are skipped (see n_queens_cp.queens_problem).
+
+A Checkpoint also has the bindings the search had reached: answer( ) when the checkpoint was taken. They
+show how far it got. Resuming doesn't need them: the replay rebuilds them.
+
+    for answer in resumable_solutions(queens_problem, (235, ), 'queens.checkpoint'):
+      ...
+starts the search or, if queens.checkpoint exists, resumes it. A checkpoint is written every interval
+alternatives and as each answer is given, so a resumed search starts after the last answer given.
+"""
+
+
+class Checkpoint:
+  """ The subproblems a search has not yet searched, in search order, and how far it got. """
+
+  __slots__ = ('frontier', 'solutions', 'nodes', 'bindings')
+
+  def __init__(self, frontier: List[Tuple[Tuple[int, ...], int]], solutions: int = 0, nodes: int = 0,
+               bindings: Any = None):
+    self.frontier = frontier
+    (self.solutions, self.nodes, self.bindings) = (solutions, nodes, bindings)
+
+  def __getstate__(self):
+    return (self.frontier, self.solutions, self.nodes, packed(self.bindings))
+
+  def __setstate__(self, state):
+    (self.frontier, self.solutions, self.nodes, bindings) = state
+    self.bindings = unpacked(bindings)
+
+  def __str__(self):
+    return (f'{len(self.frontier)} subproblems left after {self.nodes} alternatives and '
+            f'{self.solutions} solutions: {self.bindings}')
+
+  def done(self) -> bool:
+    return not self.frontier
+
+
+def save_checkpoint(checkpoint: Checkpoint, file_name: str):
+  """ Write checkpoint to file_name. A crash while writing leaves the previous checkpoint. """
+  with open(file_name + '.tmp', 'wb') as file:
+    pickle.dump(checkpoint, file, pickle.HIGHEST_PROTOCOL)
+  os.replace(file_name + '.tmp', file_name)
+
+
+def load_checkpoint(file_name: str) -> Checkpoint:
+  with open(file_name, 'rb') as file:
+    return pickle.load(file)
+
+
+def resumable_solutions(problem: Callable[..., Tuple[Generator, Callable[[], Any]]], args: Tuple = ( ),
+                        file_name: Optional[str] = None, interval: int = 10000,
+                        checkpoint: Optional[Checkpoint] = None) -> Iterator[Any]:
+  """
+  The answers of problem(*args)'s solutions, in search order, checkpointed to file_name every interval
+  alternatives. The search starts from checkpoint, if given; else from file_name, if it exists; else from
+  the beginning. A finished search leaves a checkpoint with nothing left to search.
+  """
+  if checkpoint is None:
+    checkpoint = load_checkpoint(file_name) if file_name and os.path.exists(file_name) else Checkpoint([(( ), 0)])
+  # The subproblems left, last first, so the next is popped from the end.
+  left = checkpoint.frontier[::-1]
+  (solutions, nodes) = (checkpoint.solutions, checkpoint.nodes)
+
+  def take(search: Optional[ChoiceTrampoline] = None, bindings: Any = None):
+    """ Take a checkpoint. The subproblems the search has left come before the others. """
+    checkpoint.frontier = (search.frontier( ) if search else []) + left[::-1]
+    (checkpoint.solutions, checkpoint.nodes) = (solutions, nodes + (search.nodes if search else 0))
+    checkpoint.bindings = bindings
+    if file_name:
+      save_checkpoint(checkpoint, file_name)
+
+  while left:
+    (goal, answer) = problem(*args)
+    search = ChoiceTrampoline(goal, *left.pop( ), lambda search: take(search, answer( )), interval)
+    mark = trail.mark( )
+    try:
+      for _ in search:
+        # The checkpoint counts this answer as given, so it must have the answer that is given.
+        bindings = answer( )
+        solutions += 1
+        take(search, bindings)
+        yield bindings
+    finally:
+      trail.undo_to(mark)
+    nodes += search.nodes
+  take( )
+
+
+if __name__ == '__main__':
+  from examples.n_queens.n_queens_fd import queens_problem
+
+  # Stop the search for the 10-queens solutions after 5 of them, and resume it.
+  checkpoint = Checkpoint([(( ), 0)])
+  first = [answer for (_, answer) in zip(range(5), resumable_solutions(queens_problem, (10, ), checkpoint=checkpoint))]
+  print(f'{first}\nCheckpoint: {checkpoint}')
+  rest = list(resumable_solutions(queens_problem, (10, ), checkpoint=checkpoint))
+  print(f'{len(first)} + {len(rest)} solutions. Checkpoint: {checkpoint}')
@@ -1,8 +1,11 @@
 # from inspect import getmembers
+from functools import wraps
 from inspect import isgeneratorfunction, signature
-from typing import Generator
+from types import GeneratorType
+from itertools import islice
+from typing import Any, Callable, Generator, Iterator, List, Optional, Tuple, Union
 
-from logic_variables import PyValue, Var, euc, unify, unify_pairs
+from logic_variables import PyValue, Term, trail, Var, euc, unify, unify_pairs
 
 
 class Bool_Yield_Wrapper:
@@ -160,28 +163,286 @@ def forany(gens):
     yield from gen( )
 
 
+def trampoline(goal: Generator) -> Iterator[Any]:
+  """
+  Run goal on an explicit stack of generators rather than through nested yield froms.
+
+  A goal run this way yields either
+  o a generator, a subgoal, meaning: every success of the subgoal is a success of this goal. It is what
+    "yield from subgoal" means, except that the subgoal is pushed onto the stack instead of being
+    delegated to. When the subgoal is exhausted, it is popped, and this goal resumes after the yield.
+  o anything else, a success, which trampoline passes on to its caller. (Usually None; some searches
+    yield their answers.)
+
+  When a success reaches the caller, the goals below the top of the stack are not involved. Asking for the
+  next solution resumes only the top goal. So resuming costs the same at any depth, and depth is limited
+  only by memory, not by the recursion limit.
+  """
+  stack = [goal]
+  try:
+    while stack:
+      try:
+        result = next(stack[-1])
+      except StopIteration:
+        stack.pop( )
+        continue
+      if isinstance(result, GeneratorType):
+        stack.append(result)
+      else:
+        yield result
+  finally:
+    # If our caller stops early, close the goals still on the stack, innermost first.
+    while stack:
+      stack.pop( ).close( )
+
+
+def trampolined(goal_function: Callable[..., Generator]) -> Callable[..., Iterator[Any]]:
+  """
+  A decorator for goal functions written for trampoline( ).
+
+  Calling the decorated function runs the goal on a trampoline, so callers use it like any other generator:
+      for _ in append(Xs, Ys, Zs): ...
+  Inside the goal, a tail call to a trampolined function yields the undecorated goal:
+      yield append.goal(Xs_Tail, Ys, Zs_Tail)
+  rather than "yield from append(Xs_Tail, Ys, Zs_Tail)", which would start another trampoline.
+  """
+  @wraps(goal_function)
+  def trampolined_wrapper(*args, **kwargs):
+    return trampoline(goal_function(*args, **kwargs))
+
+  trampolined_wrapper.goal = goal_function
+  return trampolined_wrapper
+
+
+def choice_paths(goal: Generator, depth: int) -> Iterator[Tuple[int, ...]]:
+  """
+  The choice paths to the subgoals depth levels down goal's trampoline stack, in search order.
+
+  Each goal on the stack is a choice point. Its n-th yield, counting from 0, is its alternative n.
+  A path (n_0, n_1, ...) says: take alternative n_0 of goal, a subgoal; then alternative n_1 of that
+  subgoal; and so on. A path stops at depth, or sooner at a success found above depth.
+  follow_path(goal, path) searches below a path. Together the paths cover the whole search, in order,
+  and each can be searched on its own: in another process, or after a restart from a checkpoint.
+  The subgoals at depth are not run.
+  """
+  (stack, alternatives) = ([goal], [-1])
+  try:
+    while stack:
+      try:
+        result = next(stack[-1])
+      except StopIteration:
+        stack.pop( )
+        alternatives.pop( )
+        continue
+      alternatives[-1] += 1
+      if isinstance(result, GeneratorType) and len(stack) < depth:
+        stack.append(result)
+        alternatives.append(-1)
+      else:
+        if isinstance(result, GeneratorType):
+          result.close( )
+        yield tuple(alternatives)
+  finally:
+    while stack:
+      stack.pop( ).close( )
+
+
+class ChoiceTrampoline:
+  """
+  A trampoline( ) that knows where it is in the search, so the search can be shared out, or stopped and resumed.
+
+  It runs goal only below path (see choice_paths), and at the end of the path only alternatives first, first + 1,
+  and so on. goal is run from the start: the alternatives before those on the path are skipped, not searched.
+  So goal must make the same choices each time it is run.
+
+  The rest of the search is described by (path, first) pairs, subproblems like the one the trampoline was
+  started with:
+  o split( ) gives away the oldest alternatives not yet tried, those nearest the root, as one subproblem.
+    This trampoline will not try them.
+  o frontier( ) lists all the alternatives not yet tried, as subproblems in search order. Running them
+    one after another finds the rest of the solutions, in order.
+  Both may be called between successes, or from on_interval, which is called with the trampoline every
+  interval alternatives taken. If on_interval returns True, the search stops.
+  """
+
+  def __init__(self, goal: Generator, path: Tuple[int, ...] = ( ), first: int = 0,
+               on_interval: Optional[Callable[['ChoiceTrampoline'], Optional[bool]]] = None, interval: int = 1000):
+    (self.goal, self.path, self.first) = (goal, tuple(path), first)
+    (self.on_interval, self.interval) = (on_interval, interval)
+    # The goals being run, the alternative each is on, whether its later alternatives were given away, and
+    # the trail when it was pushed. A goal that was given away is popped without being run to the end, so
+    # the bindings it would have undone are undone to that mark.
+    self.stack: List[Generator] = []
+    self.alternatives: List[int] = []
+    self.given_away: List[bool] = []
+    self.marks: List[int] = []
+    # The number of alternatives taken.
+    self.nodes = 0
+
+  def __iter__(self) -> Iterator[Any]:
+    replayed = [self.goal]
+    mark = trail.mark( )
+    try:
+      for (level, alternative) in enumerate(self.path + (self.first - 1, )):
+        for n in range(alternative + 1):
+          try:
+            result = next(replayed[-1])
+          except StopIteration:
+            if level == len(self.path):
+              # No alternatives from first on.
+              return
+            raise ValueError(f'{self.path} is not a choice path of this goal: level {level} has {n} alternatives')
+          if isinstance(result, GeneratorType) and (n < alternative or level == len(self.path)):
+            result.close( )
+        if level < len(self.path):
+          if not isinstance(result, GeneratorType):
+            if level < len(self.path) - 1:
+              raise ValueError(f'{self.path} is not a choice path of this goal: level {level} is a success')
+            yield result
+            return
+          replayed.append(result)
+      (self.stack, self.alternatives, self.given_away, self.marks) = \
+        ([replayed.pop( )], [self.first - 1], [False], [trail.mark( )])
+      yield from self._run( )
+      # Neither are the goals on the path, nor a search that was stopped.
+      trail.undo_to(mark)
+    finally:
+      for stack in [self.stack, replayed]:
+        while stack:
+          stack.pop( ).close( )
+
+  def _run(self) -> Iterator[Any]:
+    (stack, alternatives, given_away, marks) = (self.stack, self.alternatives, self.given_away, self.marks)
+    while stack:
+      # A goal whose later alternatives were given away is done once it is back on top.
+      if not given_away[-1]:
+        try:
+          result = next(stack[-1])
+        except StopIteration:
+          pass
+        else:
+          self.nodes += 1
+          # on_interval sees this alternative as not yet tried: a checkpoint taken there must include it.
+          if self.on_interval and self.nodes % self.interval == 0 and self.on_interval(self):
+            # Stopped: this alternative is left untried.
+            if isinstance(result, GeneratorType):
+              result.close( )
+            return
+          alternatives[-1] += 1
+          if isinstance(result, GeneratorType):
+            stack.append(result)
+            alternatives.append(-1)
+            given_away.append(False)
+            marks.append(trail.mark( ))
+          else:
+            yield result
+          continue
+      stack.pop( ).close( )
+      alternatives.pop( )
+      if given_away.pop( ):
+        trail.undo_to(marks[-1])
+      marks.pop( )
+
+  def split(self) -> Optional[Tuple[Tuple[int, ...], int]]:
+    """
+    Give away the untried alternatives of the goal nearest the root that has any still to give, below the
+    goal being run. Return them as a subproblem, or None if there is nothing to give.
+    """
+    for level in range(len(self.stack) - 1):
+      if not self.given_away[level]:
+        self.given_away[level] = True
+        return (self.path + tuple(self.alternatives[:level]), self.alternatives[level] + 1)
+    return None
+
+  def frontier(self) -> List[Tuple[Tuple[int, ...], int]]:
+    """ The alternatives not yet tried and not given away, as subproblems in search order: deepest first. """
+    return [(self.path + tuple(self.alternatives[:level]), self.alternatives[level] + 1)
+            for level in reversed(range(len(self.stack))) if not self.given_away[level]]
+
+
+def follow_path(goal: Generator, path: Tuple[int, ...], first: int = 0) -> Iterator[Any]:
+  """ Run goal on a trampoline, but only below path, from alternative first on. See ChoiceTrampoline. """
+  return iter(ChoiceTrampoline(goal, path, first))
+
+
+def solutions(goal: Generator, *Vars: Term, limit: Optional[int] = None) -> Iterator[Tuple]:
+  """
+  Run goal and yield, for each solution, the tuple of the py_values of Vars.
+
+  The tuples are snapshots. They stay valid after the goal backtracks, so they can be collected, compared,
+  or passed around, unlike the Vars themselves, which are unbound again on backup.
+  goal may be an ordinary generator or a goal written for trampoline( ).
+  Stops after limit solutions if limit is given. Any bindings still in place are then undone.
+  """
+  mark = trail.mark( )
+  try:
+    for _ in islice(trampoline(goal), limit):
+      yield tuple(V.get_py_value( ) for V in Vars)
+  finally:
+    trail.undo_to(mark)
+
+
+def solve(goal: Generator, *Vars: Term, limit: Optional[int] = None, count_only: bool = False) \
+          -> Union[List[Tuple], int]:
+  """
+  The list of solutions(goal, *Vars, limit=limit).
+  If count_only, return only the number of solutions. No py_values are extracted.
+  E.g.,
+      (Xs, Ys) = (Var( ), Var( ))
+      solve(append(Xs, Ys, LinkedList([1, 2])), Xs, Ys) => [([], [1, 2]), ([1], [2]), ([1, 2], [])]
+      solve(append(Xs, Ys, LinkedList([1, 2])), count_only=True) => 3
+  """
+  if count_only:
+    return sum(1 for _ in solutions(goal, limit=limit))
+  return list(solutions(goal, *Vars, limit=limit))
+
+
+def findall(Template: Term, goal: Generator, limit: Optional[int] = None) -> List[Any]:
+  """ Prolog's findall/3: the py_value of Template for each solution of goal. """
+  return [py_value for (py_value, ) in solutions(goal, Template, limit=limit)]
+
+
 class Trace:
+  """
+  A decorator that prints each call with its arguments, indented by call depth.
+
+  Trace.trace switches the printing on and off at run time. While it is off, a call goes straight to the
+  decorated function: no depth bookkeeping and no extra generator layer.
+  Trace.enabled is read when a function is decorated. If it is False then, @Trace returns the function
+  itself, and tracing costs nothing at all. Set it before importing the traced module.
+  """
+  enabled = True
   trace = True
 
+  def __new__(cls, f):
+    if not Trace.enabled:
+      return f
+    return super( ).__new__(cls)
+
   def __init__(self, f):
     self.param_names = [param.name for param in signature(f).parameters.values()]
     self.f = f
     self.depth = 0
+    self.is_generator_function = isgeneratorfunction(f)
 
-  def __call__(self, *args):
-    if Trace.trace:
-      print(self.trace_line(args))
+  def __call__(self, *args, **kwargs):
+    if not Trace.trace:
+      return self.f(*args, **kwargs)
+    print(self.trace_line(args, kwargs))
     self.depth += 1
-    if isgeneratorfunction(self.f):
-      return self.yield_from(*args)
+    if self.is_generator_function:
+      return self.yield_from(*args, **kwargs)
     else:
-      f_return = self.f(*args)
+      try:
+        return self.f(*args, **kwargs)
+      finally:
+        self.depth -= 1
+
+  def yield_from(self, *args, **kwargs):
+    try:
+      yield from self.f(*args, **kwargs)
+    finally:
       self.depth -= 1
-      return f_return
-
-  def yield_from(self, *args):
-    yield from self.f(*args)
-    self.depth -= 1
 
   @staticmethod
   def to_str(xs):
@@ -192,12 +453,13 @@ class Trace:
       xs_string = str(xs)
     return xs_string
 
-  def trace_line(self, args):
+  def trace_line(self, args, kwargs=None):
     prefix = "  " * self.depth
     params = ", ".join([f'{param_name}: {Trace.to_str(arg)}'
-                        for (param_name, arg) in zip(self.param_names, args)])
+                        for (param_name, arg) in zip(self.param_names, args)] +
+                       [f'{param_name}: {Trace.to_str(arg)}' for (param_name, arg) in (kwargs or {}).items()])
     # Special case for the transversal functions
-    termination = ' <=' if not args[0] else ''
+    termination = ' <=' if args and not args[0] else ''
     return prefix + params + termination
 
 
@@ -209,9 +471,11 @@ def trace(x, succeed=True, show_trace=True):
   it doesn't provent forall from succeeding.
   When included in a list of forany generators, succeed should be set to False so that forany
   will just go on the the next generator one and won't take this one as an extraneous successes.
+  x may be a function of no arguments that returns the message. It is called only if show_trace,
+  so a message that is expensive to build costs nothing when it isn't shown.
   """
   if show_trace:
-    print(x)
+    print(x( ) if callable(x) else x)
   if succeed:
     yield
 
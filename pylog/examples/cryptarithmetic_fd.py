@@ -0,0 +1,66 @@
+from timeit import default_timer as timer
+from typing import Dict, List, Tuple
+
+from finite_domains import FDVar, Linear, labeling, post, Propagator
+from global_constraints import AllDifferent
+
+"""
+Alphametics (see cryptarithmetic.py) with finite-domain variables.
+
+Instead of adding column by column with carries, the whole sum is one linear constraint. Each letter
+gets the sum of its place values in the words: plus in the terms, minus in the sum. E.g., SEND + MORE = MONEY
+is
+    1000*S + 91*E - 90*N + D - 9000*M - 900*O + 10*R - Y == 0
+with all the letters different and S and M not 0. Bounds propagation on that one constraint, with
+all_different, prunes the digits before labeling tries any. The terms may be as many and as long as wanted.
+"""
+
+
+def set_up_puzzle(terms: List[str], total: str) -> Tuple[Dict[str, FDVar], List[Propagator]]:
+  """ An FDVar per letter and the constraints on them. """
+  letters = sorted(set(''.join(terms) + total))
+  if len(letters) > 10:
+    raise ValueError(f'Too many letters: {letters}')
+  leading = {word[0] for word in terms + [total] if len(word) > 1}
+  Letters = {letter: FDVar(range(1 if letter in leading else 0, 10)) for letter in letters}
+  place_values = {letter: 0 for letter in letters}
+  for (sign, words) in [(1, terms), (-1, [total])]:
+    for word in words:
+      for (place, letter) in enumerate(reversed(word)):
+        place_values[letter] += sign * 10 ** place
+  return (Letters, [AllDifferent(list(Letters.values( ))),
+                    Linear([place_values[letter] for letter in letters], [Letters[letter] for letter in letters],
+                           '==', 0)])
+
+
+def solve_crypto(terms: List[str], total: str):
+  """ Yield the letters' FDVars for each solution, with them all bound. """
+  (Letters, constraints) = set_up_puzzle(terms, total)
+  # Label the letters with the largest place values first: they are the most constrained.
+  order = sorted(Letters, key=lambda letter: -max(10 ** (len(word) - 1 - word.rindex(letter))
+                                                  for word in terms + [total] if letter in word))
+  for _ in post(*constraints):
+    for _ in labeling([Letters[letter] for letter in order]):
+      yield Letters
+
+
+def word_value(word: str, Letters: Dict[str, FDVar]) -> str:
+  return ''.join(str(Letters[letter].get_py_value( )) for letter in word)
+
+
+if __name__ == '__main__':
+
+  # See http://bach.istc.kobe-u.ac.jp/llp/crypt.html (and links) for these and many(!) more.
+  for (terms, total) in [(['SEND', 'MORE'], 'MONEY'),
+                         (['BASE', 'BALL'], 'GAMES'),
+                         (['SATURN', 'URANUS'], 'PLANETS'),
+                         (['POTATO', 'TOMATO'], 'PUMPKIN'),
+                         (['SO', 'MANY', 'MORE', 'MEN', 'SEEM', 'TO', 'SAY', 'THAT', 'THEY', 'MAY', 'SOON', 'TRY',
+                           'TO', 'STAY', 'AT', 'HOME', 'SO', 'AS', 'TO', 'SEE', 'OR', 'HEAR', 'THE', 'SAME', 'ONE',
+                           'MAN', 'TRY', 'TO', 'MEET', 'THE', 'TEAM', 'ON', 'THE', 'MOON', 'AS', 'HE', 'HAS', 'AT',
+                           'THE', 'OTHER', 'TEN'], 'TESTS')]:
+    start = timer( )
+    print(f'\n{" + ".join(terms)} = {total}')
+    for Letters in solve_crypto(terms, total):
+      print(f'{" + ".join(word_value(word, Letters) for word in terms)} = {word_value(total, Letters)}')
+    print(f'({round(timer( ) - start, 3)} sec)')
@@ -1,8 +1,8 @@
 from timeit import default_timer as timer
-from typing import List, Type
+from typing import Dict, FrozenSet, List, Type
 
-from control_structures import fails, trace
-from logic_variables import Term
+from control_structures import fails, trace, trampoline
+from logic_variables import PyValue, Term, trail
 
 
 def all_distinct(lst: List[Term]):
@@ -34,8 +34,11 @@ class Problem:
     self.printing_time = 0
     self.rule_applications = SimpleCounter( )
     self.show_trace_list = None
+    # For run_all_clues_backjumping: the clue levels jumped over, and the clues a nogood failed at once.
+    self.backjumps = SimpleCounter( )
+    self.nogood_prunes = SimpleCounter( )
 
-  def __call__(self, ListType: Type):
+  def __call__(self, ListType: Type, backjumping: bool = False):
     """ Run the problem and display the answer. Take and display timing information. """
 
     self.ListType = ListType
@@ -44,7 +47,7 @@ class Problem:
 
     last_rule_count = 0
 
-    for _ in self.run_all_clues( ):
+    for _ in (self.run_all_clues_backjumping( ) if backjumping else self.run_all_clues( )):
       rule_applications_increment = self.rule_applications.count( ) - last_rule_count
       last_rule_count = self.rule_applications.count( )
       pause_timer = timer( )
@@ -77,26 +80,142 @@ class Problem:
     yield
 
   # noinspection SpellCheckingInspection
-  def run_clue(self, clue_nbr):
-    """ Run clue_<clue_nbr>, check the all_distinct constraints, and show progress. """
+  def run_clue(self, clue_nbr, skip=0):
+    """
+    Run clue_<clue_nbr>, check the all_distinct constraints, and show progress.
+    The first skip successes are passed over, neither counted nor shown. (See run_all_clues_backjumping.)
+    """
     for _ in self.clues[clue_nbr](self.Items):
       for _ in all_all_distinct(self.all_distinct_lists):
+        if skip:
+          skip -= 1
+          continue
         pause_timer = timer()
-        for _ in trace(f'{self.rule_applications.incr( )}) '
-                       f'After {"initial setup" if clue_nbr == 0 else ("clue " + str(clue_nbr))}: {self.Items}',
-                       show_trace=(clue_nbr) in self.show_trace_list):
+        # Count the rule application whether or not it is shown. Build the message only if it is.
+        rule_application = self.rule_applications.incr( ).count( )
+        for _ in trace(lambda: f'{rule_application}) '
+                               f'After {"initial setup" if clue_nbr == 0 else ("clue " + str(clue_nbr))}: '
+                               f'{self.Items}',
+                       show_trace=clue_nbr in self.show_trace_list):
           self.printing_time += timer() - pause_timer
           yield
       
   def run_all_clues(self, clue_number=0):
+    """ Run the clues from clue_number on. Each clue is a level on a single trampoline. """
+    return trampoline(self.run_clues_from(clue_number))
+
+  def run_clues_from(self, clue_number):
+    """ The goal run by run_all_clues. It yields the goal for the remaining clues rather than delegating to it. """
     if clue_number >= len(self.clues):
       # Ran all the clues. Succeed.
       yield
     else:
       # Run the current clue and the rest of them.
       for _ in self.run_clue(clue_number):
-        yield from self.run_all_clues(clue_number+1)
+        yield self.run_clues_from(clue_number+1)
     
+  def run_all_clues_backjumping(self):
+    """
+    run_all_clues with conflict-directed backjumping and nogood recording. It finds the same solutions.
+
+    When a clue fails outright, run_all_clues backs up to the clue before it, even if that clue's bindings
+    had nothing to do with the failure. Here the failing clue is tried again with the bindings of the
+    clues before it undone, latest first. The first clue whose undoing lets it succeed is the one
+    responsible. The search jumps straight back to that clue's next alternative. The clues in between are
+    dropped, since no choice of theirs could have saved the failing clue.
+
+    The state of the Items when the failing clue still failed is a nogood for that clue. Later, when the
+    Items have at least those bindings, the clue fails at once, without being run.
+
+    Both rest on two assumptions, which the puzzles meet:
+      o a clue's outcome depends only on the bindings in the Items, and
+      o more bindings never make a clue succeed that failed with fewer.
+    A clue that runs out of alternatives after some success backs up chronologically, as in run_all_clues.
+
+    Jumping back undoes all the bindings of the responsible clue, including those of its own choice points.
+    Its suspended run_clue generator can't go on from there. It is restarted instead, passing over the
+    successes it has already had. Clues are deterministic, so the restarted clue finds them again in order.
+    """
+    nogoods: Dict[int, List[FrozenSet]] = {}
+    # One entry per clue in progress:
+    #   [the run_clue generator, the trail mark before it, whether it succeeded, how many times it succeeded].
+    levels = [[self.run_clue(0), trail.mark( ), False, 0]]
+
+    def fails_outright(clue_nbr) -> bool:
+      """ Whether clue clue_nbr has no solution given the current bindings. """
+      state = self.state_of_items( )
+      if any(nogood <= state for nogood in nogoods.get(clue_nbr, [])):
+        self.nogood_prunes.incr( )
+        return True
+      return not self.clue_can_succeed(clue_nbr)
+
+    def backjump(clue_nbr):
+      """ clue_nbr, the clue after the levels in progress, has failed outright. Jump to the one responsible. """
+      state = self.state_of_items( )
+      while len(levels) > 1:
+        (run, mark, _, successes) = levels[-1]
+        trail.undo_to(mark)
+        if not fails_outright(clue_nbr):
+          # This level is responsible. Its next alternative is next. Replay it up to there.
+          run.close( )
+          levels[-1][0] = self.run_clue(len(levels) - 1, skip=successes)
+          break
+        state = self.state_of_items( )
+        levels.pop( )
+        run.close( )
+        self.backjumps.incr( )
+      nogoods.setdefault(clue_nbr, []).append(state)
+
+    while levels:
+      level = levels[-1]
+      try:
+        next(level[0])
+      except StopIteration:
+        levels.pop( )
+        trail.undo_to(level[1])
+        if not level[2] and levels:
+          backjump(len(levels))
+        continue
+      level[2] = True
+      level[3] += 1
+      next_clue = len(levels)
+      if next_clue == len(self.clues):
+        yield
+      else:
+        state = self.state_of_items( )
+        if any(nogood <= state for nogood in nogoods.get(next_clue, [])):
+          self.nogood_prunes.incr( )
+          backjump(next_clue)
+        else:
+          levels.append([self.run_clue(next_clue), trail.mark( ), False, 0])
+
+  def clue_can_succeed(self, clue_nbr) -> bool:
+    """ Whether clue clue_nbr and the all_distinct checks can succeed now. Neither counted nor traced. """
+    mark = trail.mark( )
+    try:
+      for _ in self.clues[clue_nbr](self.Items):
+        for _ in all_all_distinct(self.all_distinct_lists):
+          return True
+      return False
+    finally:
+      trail.undo_to(mark)
+
+  def state_of_items(self) -> FrozenSet:
+    """
+    The bindings in the Items: (position, value) for each bound arg, and (position, ('same as', position))
+    for an unbound arg that shares its Var with an earlier one. More bindings give a superset.
+    """
+    state = set( )
+    first_positions = {}
+    for (i, item) in enumerate(self.Items):
+      for (j, arg) in enumerate(item.args):
+        end = arg.unification_chain_end( )
+        if end.is_instantiated( ):
+          state.add(((i, j), end.get_py_value( ) if isinstance(end, PyValue) else str(end)))
+        elif first_positions.setdefault(id(end), (i, j)) != (i, j):
+          state.add(((i, j), ('same as', first_positions[id(end)])))
+    return frozenset(state)
+
   def set_clues_list(self, clues):
     self.clues = clues
 
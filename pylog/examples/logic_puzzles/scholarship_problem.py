@@ -42,6 +42,7 @@ Students:
 
 
 class Student(StructureItem):
+  __slots__ = ()
 
   def __init__(self, name=None, major=None, scholarship=None, first_arg_as_str_functor=True):
     # Package the properties together and create a StructureItem for this Student.
@@ -64,7 +65,7 @@ class ScholarshipProblem(Problem):
     # To avoid arithmetic, we'll use the fact that the scholarships
     # are evenly spaced with $5,000 increments. The code deals with
     # scholarship numbers in thousands, i.e., 25, 30, 35, 40.
-    Students = ListType([Student(scholarship=(25 + i * 5)) for i in range(4)])
+    Students = self.ListType([Student.fresh(scholarship=(25 + i * 5)) for i in range(4)])
     self.Items = Students
 
     # Map attribute name to tuple position in Student objects.
@@ -93,7 +94,7 @@ class ScholarshipProblem(Problem):
   # See: https://stackoverflow.com/questions/41921255/staticmethod-object-is-not-callable-switch-case.
   def clue_1(self, Students: SuperSequence):
     """ 1. The student who studies Astronomy gets a smaller scholarship than Amy. """
-    yield from is_a_subsequence_of([Student(major='Astronomy'), Student(name='Amy')], Students)
+    yield from is_a_subsequence_of([Student.fresh(major='Astronomy'), Student.fresh(name='Amy')], Students)
 
   def clue_2(self, Students: SuperSequence):
     """ 2. Amy studies either Philosophy or English. """
@@ -105,17 +106,17 @@ class ScholarshipProblem(Problem):
   def clue_3(self, Students: SuperSequence):
     """ 3. The student who studies Comp Sci has a $5,000 larger scholarship than Carrie. """
     # To avoid arithmetic, take advantage of the known structure of the Scholarships list.
-    yield from is_contiguous_in([Student(name='Carrie'), Student(major='Comp Sci')], Students)
+    yield from is_contiguous_in([Student.fresh(name='Carrie'), Student.fresh(major='Comp Sci')], Students)
 
   def clue_4(self, Students: SuperSequence):
     """ 4. Erma has a $10,000 larger scholarship than Carrie.
         This means that Erma comes after the person who comes after Carrie.
     """
-    yield from is_contiguous_in([Student(name='Carrie'), Var( ), Student(name='Erma')], Students)
+    yield from is_contiguous_in([Student.fresh(name='Carrie'), Var( ), Student.fresh(name='Erma')], Students)
 
   def clue_5(self, Students: SuperSequence):
     """ 5. Tracy has a larger scholarship than the student who studies English. """
-    yield from is_a_subsequence_of([Student(major='English'), Student(name='Tracy')], Students)
+    yield from is_a_subsequence_of([Student.fresh(major='English'), Student.fresh(name='Tracy')], Students)
 
 
 if __name__ == '__main__':
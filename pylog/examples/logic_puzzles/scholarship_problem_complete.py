@@ -42,6 +42,7 @@ Students:
 
 
 class Stdnt(StructureItem):
+  __slots__ = ()
 
   def __init__(self, name=None, major=None, scholarship=None, first_arg_as_str_functor=True):
     # Package the properties together and create a StructureItem for this Student.
@@ -118,8 +119,8 @@ class ScholarshipProblem:
       for _ in all_all_distinct(self.all_distinct_lists):
         pause_timer = timer()
         self.rule_applications.incr()
-        for _ in trace(f'{"Initially" if clue_nbr == 0 else ("Clue " + str(clue_nbr))}: '
-                       f'{", ".join([str(std) for std in self.Students])}',
+        for _ in trace(lambda: f'{"Initially" if clue_nbr == 0 else ("Clue " + str(clue_nbr))}: '
+                               f'{", ".join([str(std) for std in self.Students])}',
                        show_trace=clue_nbr in self.show_trace_list):
           self.printing_time += timer() - pause_timer
           yield
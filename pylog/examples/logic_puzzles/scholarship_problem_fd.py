@@ -0,0 +1,84 @@
+from itertools import product
+from timeit import default_timer as timer
+from typing import Dict, List, Tuple
+
+from finite_domains import Codebook, FDVar, labeling, Linear, post, Propagator
+from global_constraints import AllDifferent, position_of, subsequence_constraints, Table
+
+from examples.logic_puzzles.scholarship_problem import Student
+
+"""
+The scholarship problem (see scholarship_problem.py) with finite-domain variables.
+
+The Students are ordered by scholarship, as in the original. Each name and major is an FDVar over the
+(coded) names or majors. Every clue is a constraint:
+  1, 5  is_a_subsequence_of as position variables, pos(A) < pos(B) (see subsequence_constraints),
+  2     a Table per student: if the name is Amy, the major is English or Philosophy, and
+  3, 4  the dollar amounts, stated directly as linear constraints, e.g., for 4,
+          scholarship(Erma) - scholarship(Carrie) == 10.
+"""
+
+attribute_values: Dict[str, List[str]] = {
+  'name':  ['Amy', 'Carrie', 'Erma', 'Tracy'],
+  'major': ['Astronomy', 'Comp Sci', 'English', 'Philosophy'],
+  }
+
+codebook = Codebook(value for values in attribute_values.values( ) for value in values)
+
+
+def scholarship_of(Template: Student, Students: List[Student]) -> Tuple[FDVar, List[Propagator]]:
+  """
+  An FDVar for the scholarship of the Student that matches Template, and the constraints that tie it to
+  that Student's position: the scholarships go up by 5 from 25.
+  """
+  (Pos, Position) = position_of(Template, Students, codebook)
+  Amount = FDVar(S.args[2].get_py_value( ) for S in Students)
+  return (Amount, [Position, Linear([1, -5], [Amount, Pos], '==', 25)])
+
+
+def scholarship_constraints(Students: List[Student]):
+  constraints = [AllDifferent([S.args[i] for S in Students]) for i in range(len(attribute_values))]
+  constraints += subsequence_constraints([Student(major='Astronomy'), Student(name='Amy')],
+                                         Students, codebook)                                      # 1
+  (amy, majors) = (codebook.code('Amy'), codebook.codes(['English', 'Philosophy']))
+  for S in Students:                                                                               # 2
+    (Name, Major) = S.args[:2]
+    tuples = [(name, major) for (name, major) in product(Name.values( ), Major.values( ))
+              if name != amy or major in majors]
+    constraints.append(Table([Name, Major], tuples))
+  ((Carrie, Carrie_ties), (Comp_Sci, Comp_Sci_ties), (Erma, Erma_ties)) = \
+    [scholarship_of(Template, Students) for Template in
+     [Student(name='Carrie'), Student(major='Comp Sci'), Student(name='Erma')]]
+  constraints += Carrie_ties + Comp_Sci_ties + Erma_ties
+  constraints += [Linear([1, -1], [Comp_Sci, Carrie], '==', 5),                                   # 3
+                  Linear([1, -1], [Erma, Carrie], '==', 10)]                                      # 4
+  constraints += subsequence_constraints([Student(major='English'), Student(name='Tracy')],
+                                         Students, codebook)                                      # 5
+  return constraints
+
+
+def solve_scholarship(Students: List[Student]):
+  """ Succeed for each solution, with every name and major bound. """
+  for _ in post(*scholarship_constraints(Students)):
+    yield from labeling([arg for S in Students for arg in S.args[:2]])
+
+
+def decoded(S: Student) -> Student:
+  """ S with its codes replaced by the values they stand for. """
+  (Name, Major, Scholarship) = S.args
+  return Student(codebook.decode(Name.get_py_value( )), codebook.decode(Major.get_py_value( )), Scholarship)
+
+
+def new_students( ) -> List[Student]:
+  return [Student(*(FDVar(codebook.codes(values)) for values in attribute_values.values( )), 25 + i * 5)
+          for i in range(4)]
+
+
+if __name__ == '__main__':
+  start = timer( )
+  Students = new_students( )
+  for _ in solve_scholarship(Students):
+    print('Solution:')
+    for S in Students:
+      print(f'\t{decoded(S)}')
+  print(f'\nThe total compute time was: {round(timer( ) - start, 3)} sec')
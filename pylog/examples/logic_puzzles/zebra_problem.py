@@ -47,6 +47,8 @@ Houses:
 
 
 class House(StructureItem):
+  __slots__ = ()
+
   def __init__(self, nationality=None, smoke=None, pet=None, drink=None, color=None, first_arg_as_str_functor=True):
     # Package the properties together and create a StructureItem for this Student.
     super( ).__init__( (nationality, smoke, pet, drink, color), first_arg_as_str_functor)
@@ -73,7 +75,7 @@ class ZebraProblem(Problem):
         a favorite smoke: Chesterfield, Kool, Lucky, Old Gold, Parliament, and
         a favorite drink: coffee, juice, milk, tea, water.
     """
-    Houses = self.ListType([House( ) for _ in range(5)])
+    Houses = self.ListType([House.fresh( ) for _ in range(5)])
     self.Items = Houses
 
     # Check all attributes for distinctness
@@ -92,66 +94,66 @@ class ZebraProblem(Problem):
 
   def clue_1(self, Houses: SuperSequence):
     """ 1. The English live in the red house.  """
-    yield from member(House(nationality='English', color='red'), Houses)
+    yield from member(House.fresh(nationality='English', color='red'), Houses)
 
   def clue_2(self, Houses: SuperSequence):
     """ 2. The Spanish have a dog. """
-    yield from member(House(nationality='Spanish', pet='dog'), Houses)
+    yield from member(House.fresh(nationality='Spanish', pet='dog'), Houses)
 
   def clue_3(self, Houses: SuperSequence):
     """ 3. They drink coffee in the green house. """
-    yield from member(House(drink='coffee', color='green'), Houses)
+    yield from member(House.fresh(drink='coffee', color='green'), Houses)
 
   def clue_4(self, Houses: SuperSequence):
     """ 4. The Ukrainians drink tea. """
-    yield from member(House(nationality='Ukrainians', drink='tea'), Houses)
+    yield from member(House.fresh(nationality='Ukrainians', drink='tea'), Houses)
 
   def clue_5(self, Houses: SuperSequence):
     """ 5. The green house is immediately to the right of the white house. """
-    yield from is_contiguous_in([House(color='white'), House(color='green')], Houses)
+    yield from is_contiguous_in([House.fresh(color='white'), House.fresh(color='green')], Houses)
 
   def clue_6(self, Houses: SuperSequence):
     """ 6. The Old Gold smokers have snails. """
-    yield from member(House(smoke='Old Gold', pet='snails'), Houses)
+    yield from member(House.fresh(smoke='Old Gold', pet='snails'), Houses)
 
   def clue_7(self, Houses: SuperSequence):
     """ 7. They smoke Kool in the yellow house. """
-    yield from member(House(smoke='Kool', color='yellow'), Houses)
+    yield from member(House.fresh(smoke='Kool', color='yellow'), Houses)
 
   def clue_8(self, Houses: SuperSequence):
     """ 8. They drink milk in the middle house.
         Note the use of a slice. Houses[2] picks the middle house. """
-    yield from unify(House(drink='milk'), Houses[2])
+    yield from unify(House.fresh(drink='milk'), Houses[2])
 
   def clue_9(self, Houses: SuperSequence):
     """ 9. The Norwegians live in the first house on the left.
         Instead of Houses.head(), could have written Houses[0]. """
-    yield from unify(House(nationality='Norwegians'), Houses.head())
+    yield from unify(House.fresh(nationality='Norwegians'), Houses.head())
 
   def clue_10(self, Houses: SuperSequence):
     """ 10. The Chesterfield smokers live next to the fox.
         Saying 'next to' doesn't commit to the right or left. """
-    yield from next_to(House(smoke='Chesterfield'), House(pet='fox'), Houses)
+    yield from next_to(House.fresh(smoke='Chesterfield'), House.fresh(pet='fox'), Houses)
 
   def clue_11(self, Houses: SuperSequence):
     """ 11. They smoke Kool in the house next to the horse. """
-    yield from next_to(House(smoke='Kool'), House(pet='horse'), Houses)
+    yield from next_to(House.fresh(smoke='Kool'), House.fresh(pet='horse'), Houses)
 
   def clue_12(self, Houses: SuperSequence):
     """ 12. The Lucky smokers drink juice. """
-    yield from member(House(drink='juice', smoke='Lucky'), Houses)
+    yield from member(House.fresh(drink='juice', smoke='Lucky'), Houses)
 
   def clue_13(self, Houses: SuperSequence):
     """ 13. The Japanese smoke Parliament. """
-    yield from member(House(nationality='Japanese', smoke='Parliament'), Houses)
+    yield from member(House.fresh(nationality='Japanese', smoke='Parliament'), Houses)
 
   def clue_14(self, Houses: SuperSequence):
     """ 14. The Norwegians live next to the blue house. """
-    yield from next_to(House(nationality='Norwegians'), House(color='blue'), Houses)
+    yield from next_to(House.fresh(nationality='Norwegians'), House.fresh(color='blue'), Houses)
 
   def clue_15(self, Houses: SuperSequence):
     """ 15 (implicit) Fill in unmentioned properties. """
-    yield from members([House(pet='zebra'), House(drink='water')], Houses)
+    yield from members([House.fresh(pet='zebra'), House.fresh(drink='water')], Houses)
 
 
 if __name__ == '__main__':
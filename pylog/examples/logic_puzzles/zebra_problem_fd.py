@@ -0,0 +1,85 @@
+from timeit import default_timer as timer
+from typing import Dict, List
+
+from control_structures import forall
+from finite_domains import Codebook, FDVar, labeling, post
+from global_constraints import AllDifferent, contiguous_constraints, member_tables, next_to_constraints
+from logic_variables import unify
+
+from examples.logic_puzzles.zebra_problem import House
+
+"""
+The zebra problem (see zebra_problem.py) with finite-domain variables.
+
+Each attribute of each House is an FDVar over the (coded) values of that attribute. Rather than trying
+the houses one by one for each clue, the clues are posted as constraints:
+  o all_different for each attribute,
+  o member(House(...), Houses) as a Table per house (see member_tables),
+  o is_contiguous_in and next_to as position variables (see contiguous_constraints and
+    next_to_constraints), and
+  o a value in a given house as a unification.
+No clue is searched for house by house. labeling searches only what propagation leaves open.
+"""
+
+attribute_values: Dict[str, List[str]] = {
+  'nationality': ['English', 'Japanese', 'Norwegians', 'Spanish', 'Ukrainians'],
+  'smoke':       ['Chesterfield', 'Kool', 'Lucky', 'Old Gold', 'Parliament'],
+  'pet':         ['dog', 'fox', 'horse', 'snails', 'zebra'],
+  'drink':       ['coffee', 'juice', 'milk', 'tea', 'water'],
+  'color':       ['blue', 'green', 'red', 'white', 'yellow'],
+  }
+
+codebook = Codebook(value for values in attribute_values.values( ) for value in values)
+
+
+def coded_house(**attributes) -> House:
+  """ A House template whose given attribute values are replaced by their codes. """
+  return House(**{attribute: codebook.code(value) for (attribute, value) in attributes.items( )})
+
+
+def zebra_constraints(Houses: List[House]):
+  """ The constraints for all the clues but 8 and 9, which are unifications. """
+  constraints = [AllDifferent([H.args[i] for H in Houses]) for i in range(len(attribute_values))]
+  for member_clue in [House(nationality='English', color='red'),      # 1
+                      House(nationality='Spanish', pet='dog'),        # 2
+                      House(drink='coffee', color='green'),           # 3
+                      House(nationality='Ukrainians', drink='tea'),   # 4
+                      House(smoke='Old Gold', pet='snails'),          # 6
+                      House(smoke='Kool', color='yellow'),            # 7
+                      House(drink='juice', smoke='Lucky'),            # 12
+                      House(nationality='Japanese', smoke='Parliament')]:  # 13
+    constraints += member_tables(member_clue, Houses, codebook)
+  constraints += contiguous_constraints([House(color='white'), House(color='green')], Houses, codebook)   # 5
+  for (A, B) in [(House(smoke='Chesterfield'), House(pet='fox')),                                      # 10
+                 (House(smoke='Kool'), House(pet='horse')),                                            # 11
+                 (House(nationality='Norwegians'), House(color='blue'))]:                              # 14
+    constraints += next_to_constraints(A, B, Houses, codebook)
+  return constraints
+
+
+def solve_zebra(Houses: List[House]):
+  """ Succeed for each solution, with every attribute of every House bound. """
+  for _ in post(*zebra_constraints(Houses)):
+    for _ in forall([lambda: unify(coded_house(drink='milk'), Houses[2]),                          # 8
+                     lambda: unify(coded_house(nationality='Norwegians'), Houses[0]),              # 9
+                     lambda: labeling([arg for H in Houses for arg in H.args])]):
+      yield
+
+
+def decoded(H: House) -> House:
+  """ H with its codes replaced by the values they stand for. """
+  return House(*(codebook.decode(arg.get_py_value( )) for arg in H.args))
+
+
+def new_houses( ) -> List[House]:
+  return [House(*(FDVar(codebook.codes(values)) for values in attribute_values.values( ))) for _ in range(5)]
+
+
+if __name__ == '__main__':
+  start = timer( )
+  Houses = new_houses( )
+  for _ in solve_zebra(Houses):
+    print('Solution:')
+    for (index, H) in enumerate(Houses):
+      print(f'\t{index + 1}. {decoded(H)}')
+  print(f'\nThe total compute time was: {round(timer( ) - start, 3)} sec')
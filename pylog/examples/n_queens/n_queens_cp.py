@@ -1,22 +1,31 @@
+import random
+import sys
 from math import log10
-from random import choice
+from random import Random
 from timeit import default_timer as timer
-from typing import Dict
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from checkpoints import resumable_solutions
+from control_structures import trampoline
+from finite_domains import bit_count
+from search import luby, restarts, RestartStats
 
 
 class Placement(Dict):
   """
   This is a dictionary that stores the column placements.
   The keys are rows. For each row, store a tuple(value, available_values):
-  (a) If a col has been assigned for that row, value is that col and available_values is frozenset({}).
+  (a) If a col has been assigned for that row, value is that col and available_values is 0.
   (b) If no col hsa yet been assigned for that row, value is None and the available_values are those that don't
       conflict with any of the assigned rows.
+  available_values is a bitset: bit c is set if col c is available. Removing cols from it and counting them
+  are int operations. (This is the same representation as the domain of a finite_domains.FDVar.)
   """
   def __init__(self, board_size=8):
     self.board_size = board_size
     for row in range(board_size):
       # Initially every row is uninstantiated, and all values are available.
-      self[row] = (None, frozenset(range(board_size)))
+      self[row] = (None, (1 << board_size) - 1)
     super().__init__()
     
   def uninstantiated_rows(self):
@@ -24,8 +33,13 @@ class Placement(Dict):
     return [row for row in self if self.value_for(row) is None]
 
   def values_available_for(self, row):
-    """ Return the values available for this row. """
-    return self[row][1]
+    """ Return the values available for this row, in increasing order. """
+    available = self[row][1]
+    return [col for col in range(available.bit_length()) if available >> col & 1]
+
+  def count_available_for(self, row):
+    """ Return the number of values available for this row. """
+    return bit_count(self[row][1])
 
   def value_for(self, row):
     """ Return the value assigned to this row. """
@@ -42,97 +56,117 @@ def new_placement_val(next_row, col, r, c, avail):
   col: The value being assigned to next_row
   r: some row in the current placement
   c: the current value of r
-  avail: the values currently available for r
+  avail: the values currently available for r, as a bitset
   """
   diff = abs(next_row - r)
-  # If next_row == r: the tuple is (col, frozenset())
+  # If next_row == r: the tuple is (col, 0)
   # If r already has an assigned value. Keep it
   # If r is unassigned, keep it unassigned, but remove {col, col+diff, col-diff}) from its available_values.
-  return (col, frozenset()) if next_row == r else \
+  # (A bit beyond the board is never set. col-diff may be off the board on the left. Leave it out.)
+  return (col, 0) if next_row == r else \
          (c, avail) if c is not None else \
-         (None, avail - {col, col+diff, col-diff})
-
-
-# Timing and counting
-limit = 0
-start = 0
-total_time_start = 0
+         (None, avail & ~(1 << col | 1 << (col+diff) | (1 << (col-diff) if col >= diff else 0)))
 
 
-def place_n_queens(board_size: int):
+def place_n_queens(board_size: int, checkpoint_file: Optional[str] = None, seed: int = 1, interval: int = 10000):
   """
   The main function.
   
   Generate and display solutions to the n-queens problem.
+  The search is random, and some runs take far longer than others. So restart it when a run has
+  taken too long: after 1/4 sec, then longer and longer by the Luby sequence.
+
+  With a checkpoint_file, there is one run, with its random choices made by an rng seeded with seed. Where
+  it is is saved to checkpoint_file every interval alternatives and at each solution. If the file exists,
+  the run resumes from it (see checkpoints.py). (A run cut off by restarts would not be worth resuming.)
   """
-  global limit, start, total_time_start
-  starts = 0
+  stats = RestartStats( )
   total_time_start = timer( )
-  i = 0
-  while True:
-    i += 1
-    limit = i/4
-    starts += 1
-    start = timer()
-    placement = Placement(board_size)
-    solutionNbr = 0
-    for solution in place_remaining_queens(placement):
-      solutionNbr += 1
-      display_solution(board_size, solution, solutionNbr, start, starts, total_time_start)
-      inp = input('\nMore? (y, or n)? > ').lower( )
-      if inp != 'y':
-        return
-      starts = 1
-      total_time_start = start = timer()
-      i = 1
-
-
-def place_remaining_queens(placement: Placement):
+  solutionNbr = 0
+  if checkpoint_file:
+    solutions = resumable_solutions(queens_problem, (board_size, seed), checkpoint_file, interval)
+  else:
+    search = lambda stop: trampoline(place_remaining_queens(Placement(board_size), stop))
+    solutions = (placement_vector(solution) for solution in restarts(search, luby(0.25), measure='seconds',
+                                                                     stats=stats))
+  for solution in solutions:
+    solutionNbr += 1
+    display_solution(board_size, solution, solutionNbr, stats, total_time_start)
+    inp = input('\nMore? (y, or n)? > ').lower( )
+    if inp != 'y':
+      return
+
+
+def queens_problem(board_size: int, seed: int = 0) -> Tuple[Generator, Callable[[], List[Optional[int]]]]:
+  """
+  A new search with its random choices seeded by seed, and an answer function: the col of the queen in each
+  row of the placement the search has reached (None for a row without one). See checkpoints.py.
   """
-  Find a safe spot for the next queen and either quit if it's the last unfilled row or call this recursively.
+  latest = [Placement(board_size)]
+  return (place_remaining_queens(latest[0], rng=Random(seed), latest=latest), lambda: placement_vector(latest[0]))
+
+
+def place_remaining_queens(placement: Placement, stop: Callable[[], bool] = lambda: False, rng: Any = random,
+                           latest: Optional[List[Placement]] = None):
+  """
+  Find a safe spot for the next queen and either quit if it's the last unfilled row or go on to the next row.
+  Quit if stop( ) says the run has taken too long.
+
+  This is a goal for trampoline( ): for the next row, it yields a goal rather than yield from it.
+  rng makes the random choices. Each goal for a next row gets an rng of its own, seeded from this one. So
+  the choices made below one col don't depend on what happened below the cols before it, and a search that
+  skips those cols (see checkpoints.py) makes the same choices. If latest is given, latest[0] is kept as the
+  placement being tried.
   """
   uninstantiated_rows = placement.uninstantiated_rows()
   # Select the row with the fewest available possibilities as the next_row to be instantiated.
-  most_constrained_row = min( uninstantiated_rows, key=lambda row: len(placement.values_available_for(row)) )
-  avail_size = len(placement.values_available_for(most_constrained_row))
-  most_constrained_rows = [k for k in uninstantiated_rows if len(placement.values_available_for(k)) == avail_size]
+  most_constrained_row = min( uninstantiated_rows, key=placement.count_available_for )
+  avail_size = placement.count_available_for(most_constrained_row)
+  most_constrained_rows = [k for k in uninstantiated_rows if placement.count_available_for(k) == avail_size]
   # Pick a random most_constrained_row as the next one to instantiate.
-  next_row = choice(most_constrained_rows)
+  next_row = rng.choice(most_constrained_rows)
   for col in placement.values_available_for(next_row):
     # Quit and restart if we've taken too long.
-    if timer( ) - start > limit:
+    if stop( ):
       return
     # Build the next placement.
     next_placement = Placement(placement.board_size)
     for (r, (c, avail)) in placement.items( ):
       next_placement[r] = new_placement_val(next_row, col, r, c, avail)
+    if latest:
+      latest[0] = next_placement
     # Have we just instantiated our last column?
     # if len(uninstantiated_rows) was 1, we have just instantiated the final row.
     if len(uninstantiated_rows) == 1:
       yield next_placement
 
     # If some column now has no options left, fail and try the next col for next_row.
-    elif frozenset() in [next_placement.values_available_for(row) for row in next_placement.uninstantiated_rows()]:
+    elif any(next_placement.count_available_for(row) == 0 for row in next_placement.uninstantiated_rows()):
       # This must be pass rather than return. We want to continue on to the next col, not jump out of the loop.
       pass
 
     # More queens to place.
     else:
       # Find columns for the remaining queens.
-      yield from place_remaining_queens(next_placement)
+      yield place_remaining_queens(next_placement, stop, Random(rng.getrandbits(64)), latest)
       
       
 #############  Display functions  #############
 
 
-def display_solution(board_size, solution, solutionNbr, start, starts, total_time_start):
+def placement_vector(placement: Placement) -> List[Optional[int]]:
+  """ The col for each row, in order. """
+  return [placement.value_for(row) for row in range(placement.board_size)]
+
+
+def display_solution(board_size, solution, solutionNbr, stats, total_time_start):
   end = timer( )
-  sol = sorted([(r, c) for (r, (c, _)) in solution.items( )])
-  placement_vector = [c for (_, c) in sol]
-  solution_display = layout(placement_vector, board_size)
+  solution_display = layout(solution, board_size)
   print(f'\n{solutionNbr}.\n{solution_display}')
-  print(f'After {starts} start{"" if starts == 1 else "s"}, time: {round(end - start, 3)} sec '
-        f'on the final run out of {round(end - total_time_start, 3)} total seconds.')
+  # The run that found this solution is still going, so it is not in stats yet.
+  starts = len(stats.runs) + 1
+  print(f'After {starts} start{"" if starts == 1 else "s"}, time: {round(end - total_time_start - stats.seconds, 3)} '
+        f'sec on the final run out of {round(end - total_time_start, 3)} total seconds.')
 
 
 def layout(placement_vector: [int], board_size: int) -> str:
@@ -158,4 +192,5 @@ def space_offset(n, board_size):
 
 if __name__ == "__main__":
   # The parameter to place_n_queens is the size of the board, typically 8x8.
-  place_n_queens(235)
+  # python n_queens_cp.py queens.checkpoint checkpoints the search to queens.checkpoint, or resumes it from there.
+  place_n_queens(235, sys.argv[1] if len(sys.argv) > 1 else None)
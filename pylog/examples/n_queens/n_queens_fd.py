@@ -0,0 +1,59 @@
+from timeit import default_timer as timer
+from typing import Any, Callable, Generator, List, Tuple
+
+from finite_domains import FDVar, labeling, NotEqual, post
+from search import label
+from examples.n_queens.n_queens import layout
+
+"""
+The n-queens problem with finite-domain variables.
+
+Queens[r] is the column of the queen in row r. Rather than placing a queen and then checking it against
+the earlier ones, as n_queens.py does, the constraints are posted first. Placing a queen then removes the
+columns it attacks from the domains of all the rows not yet placed, and a row whose domain becomes empty
+fails at once.
+"""
+
+
+def queens_constraints(Queens: List[FDVar]) -> List[NotEqual]:
+  """ No two queens share a column or a diagonal. """
+  return [NotEqual(Queens[r1], Queens[r2], offset)
+          for r1 in range(len(Queens)) for r2 in range(r1 + 1, len(Queens))
+          for offset in (0, r2 - r1, r1 - r2)]
+
+
+def queens_goal(Queens: List[FDVar]):
+  """ A goal for trampoline( ) that succeeds for each placement of Queens. """
+  for _ in post(*queens_constraints(Queens)):
+    yield labeling.goal(Queens, 0)
+
+
+def queens_problem(board_width: int) -> Tuple[Generator, Callable[[], Any]]:
+  """ A new n-queens search and its answer function, for parallel.py. """
+  Queens = [FDVar(range(board_width)) for _ in range(board_width)]
+  return (queens_goal(Queens), lambda: tuple(Q.get_py_value( ) for Q in Queens))
+
+
+def place_n_queens(board_width: int, var_order: str = 'input_order', value_order: str = 'min',
+                   tie_break: str = 'first'):
+  """
+  Generate and display all solutions to the n-queens problem, labeling the rows with the given heuristics
+  (see search.label). n_queens_cp.py chooses the most constrained row, breaking ties at random.
+  """
+  start = timer( )
+  Queens = [FDVar(range(board_width)) for _ in range(board_width)]
+  solutionNbr = 0
+  for _ in post(*queens_constraints(Queens)):
+    for _ in label(Queens, var_order, value_order, tie_break):
+      solutionNbr += 1
+      print(f'\n{solutionNbr}.\n{layout([Q.get_py_value( ) for Q in Queens], board_width)}')
+      print(f'time: {round(timer( ) - start, 3)}')
+      inp = input('\nMore? (y, or n)? > ').lower( )
+      if inp != 'y':
+        return
+      start = timer( )
+
+
+if __name__ == "__main__":
+  # The parameter to place_n_queens is the size of the board, typically 8x8.
+  place_n_queens(20, var_order='most_constrained', tie_break='random')
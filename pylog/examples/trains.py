@@ -1,7 +1,8 @@
 from functools import reduce
-from typing import Iterator, List, Tuple, Union
+from typing import Iterator, List, Sequence, Tuple, Union
 
 # from control_structures import forall
+from control_structures import solve
 from logic_variables import PyValue, Term, unify
 
 
@@ -32,9 +33,9 @@ def best_route(Start: PyValue, End: PyValue):
     legs = [Start, *intermediate, End]
     # If route(*legs) succeeds, route will instantiate legs to
     #         [Station, (Line, int), Station, (Line, int), ... , Station]
-    # Once legs is instantiated, must extract the py_values so that the collection
-    # of routes remains instantiated after the list comprehension terminates.
-    route_options = [ [elt.get_py_value() for elt in legs] for _ in route(*legs) ]
+    # solve extracts the py_values of legs for each solution, so that the collection
+    # of routes remains instantiated after the search backtracks.
+    route_options = solve(route(*legs), *legs)
     # Once we find an i so that there is at least one route from Start to End using i lines,
     # find the best of them and quit--by using return at the bottom.
     # No point in looking for routes that use more lines.
@@ -105,7 +106,7 @@ def route(*legs: List[Term]):
       yield from route(*legs[2:])
 
 
-def sum_distances(legs: List[Union[str, Tuple[str, int]]]) -> Tuple[List[str], int]:
+def sum_distances(legs: Sequence[Union[str, Tuple[str, int]]]) -> Tuple[List[str], int]:
   """
   For a given route of legs, sum the distances along each line.
   :param legs: Each leg is either a station or a (line, dist) tuple.
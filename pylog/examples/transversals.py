@@ -2,7 +2,10 @@ from inspect import isgeneratorfunction, signature
 from typing import Generator, List, Optional, Set, Tuple
 
 from control_structures import fails, Trace
+from finite_domains import FDVar
+from global_constraints import all_different
 from logic_variables import PyValue, Var
+from search import label
 from sequence_options.sequences import PyList, PySet, PyTuple
 from sequence_options.super_sequence import member
 
@@ -175,6 +178,19 @@ def tnvsl_dfs_gen_lv(sets, tnvsl):
                                             tnvsl)
 
 
+def tnvsl_fd(sets: List[Set[int]], consistency: str = 'domain', var_order: str = 'input_order'):
+    """
+    A transversal as finite-domain variables, one per set. all_different is posted before any choice is
+    made, so a value that no transversal can use is never tried.
+    The variants above differ in propagation and in which set they fill next. Here propagation is
+    all_different, and which set is next is var_order: tnvsl_dfs_smallest is var_order='first_fail'.
+    """
+    Tnvsl = [FDVar(S) for S in sets]
+    for _ in all_different(Tnvsl, consistency):
+        for _ in label(Tnvsl, var_order):
+            yield tuple(T.get_py_value() for T in Tnvsl)
+
+
 if __name__ == '__main__':
     print('\n\n latest')
     Trace.trace = True
@@ -189,6 +205,11 @@ if __name__ == '__main__':
         if A + B + C == N: break
     print(f'{"=" * 15}')
 
+    print(f'\n{"-" * 75}'
+          f'\ntnvsl_fd({sets})\n')
+    for tnvsl in tnvsl_fd(sets, var_order='first_fail'):
+        print('=> ', tnvsl)
+
 
 # propagate = True
 # smallest_first = True
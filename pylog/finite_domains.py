@@ -0,0 +1,463 @@
+from collections import deque
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from control_structures import trampolined
+from logic_variables import interned_py_value, PyValue, Term, trail, Var
+
+"""
+Finite-domain variables and constraint propagation.
+
+An FDVar is a Var with a domain, the set of ints it may still take, and a registry of the propagators
+that constrain it. Propagators narrow domains. Each narrowing wakes the propagators of the narrowed FDVar,
+and the propagation_queue runs them until nothing changes (a fixpoint) or some domain becomes empty
+(a failure). A search can then prune before it branches instead of generating values and testing them.
+
+Domains and registries change only through the trail, so backup undoes them along with everything else.
+An FDVar whose domain is down to one value is bound to that value, so the rest of pylog sees an
+instantiated Var. An FDVar also unifies like any Var: with a value in its domain, with another FDVar
+(the two domains are intersected and kept equal), or with an unbound Var (which is bound to the FDVar).
+
+    (X, Y) = (FDVar(range(3)), FDVar(range(3)))
+    for _ in post(NotEqual(X, Y)):
+      for _ in unify(X, 1):
+        # Y's domain is now {0, 2}.
+"""
+
+# The number of bits set in an int mask, i.e., the size of a domain. int.bit_count( ) is new in Python 3.10.
+bit_count = int.bit_count if hasattr(int, 'bit_count') else lambda mask: bin(mask).count('1')
+
+
+class FDVar(Var):
+  """
+  A logic variable with a finite domain of ints and the propagators that constrain it.
+
+  The domain is a bitset: bit i of the int mask is set if offset + i is in the domain. offset is the
+  smallest value of the initial domain and never changes. Size, min, max, membership, and removal are a
+  few int operations, and a narrowed domain is a new int, which the trail restores on backup.
+  """
+
+  __slots__ = ('_mask', '_offset', 'propagators')
+
+  constrained = True
+
+  def __init__(self, domain: Iterable[int]):
+    super( ).__init__( )
+    if isinstance(domain, range) and domain.step == 1 and domain:
+      (self._offset, self._mask) = (domain.start, (1 << len(domain)) - 1)
+    else:
+      values = set(domain)
+      if not values or any(type(value) is not int for value in values):
+        raise ValueError(f'An FDVar domain must be a nonempty collection of ints, not {domain}')
+      self._offset = min(values)
+      self._mask = sum(1 << (value - self._offset) for value in values)
+    # A tuple, not a list, so that posting a propagator is a single trailed assignment.
+    self.propagators = ( )
+    if self.size( ) == 1:
+      self.unification_chain_next = interned_py_value(self._offset)
+
+  @property
+  def domain(self) -> frozenset:
+    return frozenset(self.values( ))
+
+  @property
+  def mask(self) -> int:
+    return self._mask
+
+  @property
+  def offset(self) -> int:
+    return self._offset
+
+  def contains(self, value: Any) -> bool:
+    return type(value) is int and value >= self._offset and self._mask >> (value - self._offset) & 1 == 1
+
+  def size(self) -> int:
+    return bit_count(self._mask)
+
+  def min(self) -> int:
+    return self._offset + (self._mask & -self._mask).bit_length( ) - 1
+
+  def max(self) -> int:
+    return self._offset + self._mask.bit_length( ) - 1
+
+  def values(self) -> List[int]:
+    """ The domain, in increasing order. """
+    (mask, values) = (self._mask, [])
+    while mask:
+      lowest_bit = mask & -mask
+      values.append(self._offset + lowest_bit.bit_length( ) - 1)
+      mask ^= lowest_bit
+    return values
+
+  def mask_of(self, values: Iterable[int]) -> int:
+    """ The mask, relative to this FDVar's offset, of those values that could be in its domain. """
+    offset = self._offset
+    return sum(1 << (value - offset) for value in set(values) if type(value) is int and value >= offset)
+
+  def mask_relative_to(self, offset: int) -> int:
+    """ This FDVar's mask, shifted to be relative to offset. Values below offset are dropped. """
+    shift = self._offset - offset
+    return self._mask << shift if shift >= 0 else self._mask >> -shift
+
+  def _narrow(self, mask: int) -> bool:
+    """
+    Replace the domain by mask, which must be a subset of it, and wake this FDVar's propagators.
+    Return False if mask is empty. If it has one value, bind this FDVar to it.
+    """
+    if mask == self._mask:
+      return True
+    if not mask:
+      return False
+    trail.assign(self, '_mask', mask)
+    if mask & (mask - 1) == 0 and self.unification_chain_next is None:
+      trail.assign(self, 'unification_chain_next', interned_py_value(self._offset + mask.bit_length( ) - 1))
+    propagation_queue.schedule_all(self.propagators)
+    return True
+
+  def assign(self, value: int) -> bool:
+    return self.contains(value) and self._narrow(1 << (value - self._offset))
+
+  def remove(self, value: int) -> bool:
+    return not self.contains(value) or self._narrow(self._mask & ~(1 << (value - self._offset)))
+
+  def restrict_to(self, values: Iterable[int]) -> bool:
+    """ Intersect the domain with values. """
+    return self._narrow(self._mask & self.mask_of(values))
+
+  def restrict_to_domain_of(self, Other: 'FDVar', plus: int = 0) -> bool:
+    """ Intersect the domain with Other's domain, with plus added to each of its values. """
+    return self._narrow(self._mask & Other.mask_relative_to(self._offset - plus))
+
+  def set_min(self, lower_bound: int) -> bool:
+    """ Remove the values below lower_bound. """
+    shift = lower_bound - self._offset
+    return shift <= 0 or self._narrow(self._mask >> shift << shift)
+
+  def set_max(self, upper_bound: int) -> bool:
+    """ Remove the values above upper_bound. """
+    shift = upper_bound - self._offset + 1
+    # A bound beyond the largest value removes nothing. Don't build a mask of its size.
+    return shift >= self._mask.bit_length( ) or shift > 0 and self._narrow(self._mask & ((1 << shift) - 1))
+
+  def bind_to(self, Other: Term) -> bool:
+    """
+    Called by unify_on_trail. Other is the end of its unification_chain and is not an unconstrained Var.
+    Bind this FDVar to Other if Other is a value in the domain or another FDVar, and propagate.
+    """
+    if isinstance(Other, FDVar):
+      if not Other.restrict_to_domain_of(self):
+        return False
+      trail.assign(self, 'unification_chain_next', Other)
+      return post_on_trail(Equal(self, Other))
+    if isinstance(Other, PyValue):
+      if not Other.is_instantiated( ):
+        raise ValueError(f'An FDVar with domain {self.values( )} cannot be unified with an uninstantiated PyValue')
+      if not self.contains(Other.get_py_value( )):
+        return False
+      trail.assign(self, 'unification_chain_next', Other)
+      return self.assign(Other.get_py_value( )) and propagation_queue.propagate( )
+    # A Structure is not in any finite domain.
+    return False
+
+
+class Codebook:
+  """
+  Int codes for values that are not ints, e.g., the strings in a puzzle, so that FDVars can range over them.
+  Each value gets the next code the first time it is seen.
+  """
+
+  def __init__(self, values: Iterable = ( )):
+    self.code_of: Dict[Any, int] = {}
+    self.value_of: List[Any] = []
+    for value in values:
+      self.code(value)
+
+  def code(self, value: Any) -> int:
+    if value not in self.code_of:
+      self.code_of[value] = len(self.value_of)
+      self.value_of.append(value)
+    return self.code_of[value]
+
+  def codes(self, values: Iterable) -> List[int]:
+    return [self.code(value) for value in values]
+
+  def decode(self, code: int) -> Any:
+    return self.value_of[code]
+
+
+def fd_var(x: Any) -> FDVar:
+  """ x if it is an FDVar; otherwise an FDVar whose domain is x's single value, e.g., for an int or a bound Var. """
+  if isinstance(x, FDVar):
+    return x
+  X = x.unification_chain_end( ) if isinstance(x, Term) else x
+  if isinstance(X, FDVar):
+    return X
+  if isinstance(X, Term):
+    if not X.is_instantiated( ):
+      raise ValueError(f'{x} is neither an FDVar nor a value')
+    X = X.get_py_value( )
+  return FDVar((X, ))
+
+
+class Propagator:
+  """
+  A constraint on some FDVars. Subclasses implement propagate( ), which narrows the domains of the
+  variables (never anything else) and returns False if the constraint can no longer be satisfied.
+  propagate( ) is called when the constraint is posted and again whenever one of its variables' domains
+  changes, until a fixpoint is reached. It must therefore be correct for any current domains.
+  """
+
+  __slots__ = ('variables', 'queued', 'weight')
+
+  # A propagator is idempotent if running it twice in a row never changes anything the second time.
+  # An idempotent propagator is not woken by the changes it makes itself.
+  idempotent = False
+
+  def __init__(self, *variables: Any):
+    self.variables: Tuple[FDVar, ...] = tuple(fd_var(x) for x in variables)
+    # Whether this propagator is waiting in the propagation_queue.
+    self.queued = False
+    # 1 plus the number of times this propagator has failed, for the dom/wdeg search heuristic.
+    # Not trailed: what a failure teaches outlasts the branch it happened on.
+    self.weight = 1
+
+  def propagate(self) -> bool:
+    raise NotImplementedError
+
+
+class PropagationQueue:
+  """
+  The propagators waiting to run. Running them in turn, each possibly waking others, reaches a fixpoint.
+  A propagator is in the queue at most once.
+  """
+
+  def __init__(self):
+    self.waiting = deque( )
+    self.running = False
+    # The number of propagator runs, for benchmarking.
+    self.propagations = 0
+
+  def schedule(self, propagator: Propagator):
+    if not propagator.queued:
+      propagator.queued = True
+      self.waiting.append(propagator)
+
+  def schedule_all(self, propagators: Iterable[Propagator]):
+    for propagator in propagators:
+      if not propagator.queued:
+        propagator.queued = True
+        self.waiting.append(propagator)
+
+  def propagate(self) -> bool:
+    """
+    Run the waiting propagators to a fixpoint. Return False, and empty the queue, if one of them fails.
+    A call made while the queue is already running returns at once: the running loop reaches the fixpoint.
+    """
+    if self.running:
+      return True
+    (waiting, self.running) = (self.waiting, True)
+    try:
+      while waiting:
+        propagator = waiting.popleft( )
+        # While it runs, an idempotent propagator counts as queued, so its own changes don't wake it.
+        propagator.queued = propagator.idempotent
+        self.propagations += 1
+        succeeded = propagator.propagate( )
+        propagator.queued = False
+        if not succeeded:
+          propagator.weight += 1
+          for propagator in waiting:
+            propagator.queued = False
+          waiting.clear( )
+          return False
+      return True
+    finally:
+      self.running = False
+
+
+# The one propagation queue shared by all FDVars.
+propagation_queue = PropagationQueue( )
+
+
+def post_on_trail(*propagators: Propagator) -> bool:
+  """
+  Register propagators with their variables and propagate. Return whether propagation succeeded.
+  As with unify_on_trail, the caller undoes the changes, by trail.undo_to( ), if it fails or on backup.
+  """
+  for propagator in propagators:
+    # Register once per distinct variable. (Terms are not hashable.)
+    for X in {id(X): X for X in propagator.variables}.values( ):
+      trail.assign(X, 'propagators', X.propagators + (propagator, ))
+  propagation_queue.schedule_all(propagators)
+  return propagation_queue.propagate( )
+
+
+def post(*propagators: Propagator):
+  """ The choice point for posting constraints. Succeed once if they are consistent. Undo them on backup. """
+  mark = trail.mark( )
+  if post_on_trail(*propagators):
+    yield
+  trail.undo_to(mark)
+
+
+def indomain(X: Any):
+  """ Try each value in X's domain, smallest first, propagating each choice. Succeed once if X is bound. """
+  X_end = X.unification_chain_end( )
+  if not isinstance(X_end, FDVar):
+    yield
+    return
+  for value in X_end.values( ):
+    mark = trail.mark( )
+    if X_end.assign(value) and propagation_queue.propagate( ):
+      yield
+    trail.undo_to(mark)
+
+
+@trampolined
+def labeling(Xs: List[Any], start: int = 0):
+  """ Label Xs[start:], in order, with indomain. Each success binds all of them. """
+  if start == len(Xs):
+    yield
+  else:
+    for _ in indomain(Xs[start]):
+      yield labeling.goal(Xs, start + 1)
+
+
+class Equal(Propagator):
+  """ X == Y. unify posts this when it binds one FDVar to another. """
+
+  __slots__ = ( )
+
+  def propagate(self) -> bool:
+    (X, Y) = self.variables
+    return X.restrict_to_domain_of(Y) and Y.restrict_to_domain_of(X)
+
+
+class NotEqual(Propagator):
+  """ X != Y + offset. This propagator acts only when one side is down to a single value. """
+
+  __slots__ = ('offset', )
+
+  def __init__(self, X: Any, Y: Any, offset: Any = 0):
+    super( ).__init__(X, Y)
+    self.offset = offset
+
+  def propagate(self) -> bool:
+    (X, Y) = self.variables
+    if Y.size( ) == 1:
+      return X.remove(Y.min( ) + self.offset)
+    if X.size( ) == 1:
+      return Y.remove(X.min( ) - self.offset)
+    return True
+
+
+class Offset(Propagator):
+  """ Y == X + k. Each domain is kept to the other's shifted by k. """
+
+  __slots__ = ('k', )
+
+  idempotent = True
+
+  def __init__(self, X: Any, Y: Any, k: int):
+    super( ).__init__(X, Y)
+    self.k = k
+
+  def propagate(self) -> bool:
+    (X, Y) = self.variables
+    return Y.restrict_to_domain_of(X, plus=self.k) and X.restrict_to_domain_of(Y, plus=-self.k)
+
+
+class Distance(Propagator):
+  """ abs(X - Y) == k. Each domain is kept to the other's shifted by k either way. """
+
+  __slots__ = ('k', )
+
+  def __init__(self, X: Any, Y: Any, k: int):
+    super( ).__init__(X, Y)
+    self.k = k
+
+  def propagate(self) -> bool:
+    (X, Y) = self.variables
+    k = self.k
+    return X._narrow(X.mask & (Y.mask_relative_to(X.offset - k) | Y.mask_relative_to(X.offset + k))) and \
+           Y._narrow(Y.mask & (X.mask_relative_to(Y.offset - k) | X.mask_relative_to(Y.offset + k)))
+
+
+class Precedes(Propagator):
+  """ X + gap <= Y, i.e., X < Y for the default gap of 1. This propagator works on bounds. """
+
+  __slots__ = ('gap', )
+
+  idempotent = True
+
+  def __init__(self, X: Any, Y: Any, gap: int = 1):
+    super( ).__init__(X, Y)
+    self.gap = gap
+
+  def propagate(self) -> bool:
+    (X, Y) = self.variables
+    return X.set_max(Y.max( ) - self.gap) and Y.set_min(X.min( ) + self.gap)
+
+
+class Linear(Propagator):
+  """
+  sum(c * X for (c, X) in zip(coefficients, Xs)) <relation> constant, where relation is '==', '<=' or '>='.
+  An X may also be an int or a bound Var: it is moved into the constant.
+
+  Filtering is bounds consistency. For '<=', each term c * X can be at most the constant less the
+  smallest value the other terms can still sum to. That bounds X from above if c > 0 and from below if
+  c < 0. '>=' is the same with the signs reversed, and '==' is both. Python ints don't overflow, so the
+  coefficients and constant may be as large as need be.
+  """
+
+  __slots__ = ('coefficients', 'relation', 'constant')
+
+  relations = ('==', '<=', '>=')
+
+  def __init__(self, coefficients: Sequence[int], Xs: Sequence[Any], relation: str, constant: int):
+    if relation not in Linear.relations:
+      raise ValueError(f'relation must be one of {Linear.relations}, not {relation!r}')
+    if len(coefficients) != len(Xs):
+      raise ValueError(f'{len(coefficients)} coefficients for {len(Xs)} variables')
+    (terms, constant) = ([], constant)
+    for (c, x) in zip(coefficients, Xs):
+      X = x.unification_chain_end( ) if isinstance(x, Term) else x
+      if not isinstance(X, FDVar):
+        constant -= c * fd_var(X).min( )
+      elif c:
+        terms.append((c, X))
+    super( ).__init__(*(X for (_, X) in terms))
+    self.coefficients = tuple(c for (c, _) in terms)
+    (self.relation, self.constant) = (relation, constant)
+
+  def propagate(self) -> bool:
+    terms = list(zip(self.coefficients, self.variables))
+    # The smallest and largest value of each term and of their sum.
+    lows = [c * X.min( ) if c > 0 else c * X.max( ) for (c, X) in terms]
+    highs = [c * X.max( ) if c > 0 else c * X.min( ) for (c, X) in terms]
+    (low, high) = (sum(lows), sum(highs))
+    if self.relation != '>=':
+      # Each term is at most the constant less what the others sum to at least.
+      for ((c, X), term_low) in zip(terms, lows):
+        slack = self.constant - (low - term_low)
+        if not (X.set_max(slack // c) if c > 0 else X.set_min(-(slack // -c))):
+          return False
+    if self.relation != '<=':
+      # Each term is at least the constant less what the others sum to at most.
+      for ((c, X), term_high) in zip(terms, highs):
+        slack = self.constant - (high - term_high)
+        if not (X.set_min(-(-slack // c)) if c > 0 else X.set_max(slack // c)):
+          return False
+    return True
+
+
+def linear(coefficients: Sequence[int], Xs: Sequence[Any], relation: str, constant: int):
+  """ Succeed once if the linear constraint can still hold, with Linear posted. """
+  yield from post(Linear(coefficients, Xs, relation, constant))
+
+
+if __name__ == '__main__':
+  (X, Y, Z) = (FDVar(range(3)), FDVar(range(3)), FDVar(range(3)))
+  for _ in post(NotEqual(X, Y), NotEqual(Y, Z), NotEqual(X, Z)):
+    print(f'Before labeling: X: {X.values( )}, Y: {Y.values( )}, Z: {Z.values( )}')
+    for _ in labeling([X, Y, Z]):
+      print(f'X: {X}, Y: {Y}, Z: {Z}')
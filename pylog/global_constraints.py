@@ -0,0 +1,438 @@
+from itertools import product
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from finite_domains import bit_count, Codebook, Distance, fd_var, FDVar, Offset, post, Precedes, Propagator
+from logic_variables import StructureItem, trail
+
+"""
+Global constraints for finite-domain variables.
+
+A global constraint covers many variables at once. It can prune what a conjunction of its binary parts
+cannot see. E.g., for three variables whose domains are all {1, 2}, the three NotEqual constraints
+propagate nothing, but all_different fails at once.
+"""
+
+
+class AllDifferent(Propagator):
+  """
+  The variables take pairwise different values.
+
+  consistency='domain' (Régin's algorithm) removes every value that appears in no solution of the constraint
+  taken by itself. It finds a maximum matching of variables to values. If that matching leaves a variable
+  unmatched, the constraint fails. Otherwise a value v can be removed from the domain of X unless the edge
+  X-v is in the matching or lies on an alternating path or cycle. That edge could then be swapped in.
+  One run reaches the fixpoint, so the propagator is idempotent.
+
+  consistency='bounds' looks only at each variable's min and max. It looks for Hall intervals: if k
+  variables lie within an interval of k values, the other variables' bounds are pushed out of the interval.
+  If more than k lie within it, the constraint fails. It is cheaper per run but prunes less.
+  """
+
+  __slots__ = ('consistency', 'matching')
+
+  consistencies = ('domain', 'bounds')
+
+  def __init__(self, Xs: List[Any], consistency: str = 'domain'):
+    if consistency not in AllDifferent.consistencies:
+      raise ValueError(f'consistency must be one of {AllDifferent.consistencies}, not {consistency!r}')
+    super( ).__init__(*Xs)
+    self.consistency = consistency
+    # The last maximum matching found: matching[i] is the value matched to variables[i]. It is only a
+    # starting point for the next run, not part of the state that backup restores.
+    self.matching: List[Optional[int]] = [None] * len(self.variables)
+
+  @property
+  def idempotent(self) -> bool:
+    return self.consistency == 'domain'
+
+  def propagate(self) -> bool:
+    return self.propagate_domains( ) if self.consistency == 'domain' else self.propagate_bounds( )
+
+  def propagate_bounds(self) -> bool:
+    Xs = self.variables
+    bounds = [(X.min( ), X.max( )) for X in Xs]
+    for lower in sorted({lower for (lower, _) in bounds}):
+      for upper in sorted({upper for (_, upper) in bounds if upper >= lower}):
+        inside = [i for (i, (lo, hi)) in enumerate(bounds) if lower <= lo and hi <= upper]
+        if len(inside) > upper - lower + 1:
+          return False
+        if len(inside) == upper - lower + 1:
+          # A Hall interval. The variables inside use up all its values.
+          for (i, (lo, hi)) in enumerate(bounds):
+            if i in inside:
+              continue
+            if lower <= lo <= upper and not Xs[i].set_min(upper + 1):
+              return False
+            if lower <= hi <= upper and not Xs[i].set_max(lower - 1):
+              return False
+          # The bounds just changed wake this propagator again. The next run starts from them.
+    return True
+
+  def propagate_domains(self) -> bool:
+    Xs = self.variables
+    domains = [X.values( ) for X in Xs]
+    matching = self.maximum_matching(domains)
+    if matching is None:
+      return False
+    self.matching = matching
+
+    # The alternating graph. Node i < len(Xs) is variable i; the other nodes are values.
+    # A variable points to its matched value. A value points to the variables it is in the domain of but not
+    # matched to.
+    n = len(Xs)
+    value_node: Dict[int, int] = {}
+    for domain in domains:
+      for value in domain:
+        value_node.setdefault(value, n + len(value_node))
+    successors: List[List[int]] = [[value_node[matching[i]]] for i in range(n)] + [[] for _ in value_node]
+    for (i, domain) in enumerate(domains):
+      for value in domain:
+        if value != matching[i]:
+          successors[value_node[value]].append(i)
+
+    # The nodes reachable from the values that are not matched: an edge into one of them lies on an
+    # alternating path that starts at a free value.
+    matched_nodes = {value_node[value] for value in matching}
+    reachable = [False] * len(successors)
+    stack = [node for node in value_node.values( ) if node not in matched_nodes]
+    for node in stack:
+      reachable[node] = True
+    while stack:
+      for successor in successors[stack.pop( )]:
+        if not reachable[successor]:
+          reachable[successor] = True
+          stack.append(successor)
+
+    component = strongly_connected_components(successors)
+    for (i, domain) in enumerate(domains):
+      keep = [value for value in domain
+              if value == matching[i] or reachable[value_node[value]] or
+                 component[value_node[value]] == component[i]]
+      if len(keep) < len(domain) and not Xs[i].restrict_to(keep):
+        return False
+    return True
+
+  def maximum_matching(self, domains: List[List[int]]) -> Optional[List[int]]:
+    """
+    A matching of every variable to a distinct value in its domain, or None if there is none.
+    It starts from the previous matching, keeping whatever of it is still possible, and extends it one
+    variable at a time along shortest augmenting paths.
+    """
+    (matching, owner) = ([None] * len(domains), {})
+    for (i, value) in enumerate(self.matching):
+      if value is not None and value not in owner and self.variables[i].contains(value):
+        (matching[i], owner[value]) = (value, i)
+
+    for start in range(len(domains)):
+      if matching[start] is not None:
+        continue
+      # Breadth-first search for a free value. reached_from[value] is the variable the search came from.
+      (reached_from, queue, free_value) = ({}, [start], None)
+      for i in queue:
+        for value in domains[i]:
+          if value in reached_from:
+            continue
+          reached_from[value] = i
+          if value not in owner:
+            free_value = value
+            break
+          queue.append(owner[value])
+        if free_value is not None:
+          break
+      if free_value is None:
+        return None
+      # Flip the path: each variable on it takes the value the search reached through it.
+      value = free_value
+      while value is not None:
+        i = reached_from[value]
+        (matching[i], owner[value], value) = (value, i, matching[i])
+    return matching
+
+
+class Table(Propagator):
+  """
+  The variables take the values of one of the allowed tuples: an extensional constraint.
+
+  Filtering is compact-table. Tuple t is bit t of an int. For each variable and value, supports holds the
+  tuples that give the variable that value. current holds the tuples still valid, i.e., whose values are
+  all still in their variables' domains. On each run, current drops the tuples that lost a value since the
+  last run, using whichever of the removed or the remaining values is fewer. Then each value is kept only
+  if it still has a tuple in current. That is generalized arc consistency, reached in one run.
+  current and the last domains seen are restored on backup like the domains themselves.
+  """
+
+  __slots__ = ('supports', 'current', 'last_masks')
+
+  idempotent = True
+
+  def __init__(self, Xs: Sequence[Any], tuples: Iterable[Sequence[int]]):
+    super( ).__init__(*Xs)
+    self.supports: List[Dict[int, int]] = [{} for _ in self.variables]
+    tuple_count = 0
+    for values in tuples:
+      if len(values) != len(self.variables):
+        raise ValueError(f'Tuple {values} does not have one value for each of the {len(self.variables)} variables')
+      for (supports, value) in zip(self.supports, values):
+        supports[value] = supports.get(value, 0) | 1 << tuple_count
+      tuple_count += 1
+    self.current = (1 << tuple_count) - 1
+    # None until the first run: the domains then are compared with the tuples value by value.
+    self.last_masks: Optional[Tuple[int, ...]] = None
+
+  def propagate(self) -> bool:
+    Xs = self.variables
+    current = self.current
+    masks = tuple(X.mask for X in Xs)
+    for (i, X) in enumerate(Xs):
+      last_mask = None if self.last_masks is None else self.last_masks[i]
+      if masks[i] == last_mask:
+        continue
+      supports = self.supports[i]
+      removed = 0 if last_mask is None else last_mask & ~masks[i]
+      if last_mask is not None and bit_count(removed) < bit_count(masks[i]):
+        invalid = 0
+        for value in values_of(removed, X.offset):
+          invalid |= supports.get(value, 0)
+        current &= ~invalid
+      else:
+        valid = 0
+        for value in X.values( ):
+          valid |= supports.get(value, 0)
+        current &= valid
+      if not current:
+        return False
+
+    for (i, X) in enumerate(Xs):
+      supports = self.supports[i]
+      keep = [value for value in X.values( ) if supports.get(value, 0) & current]
+      if len(keep) < X.size( ) and not X.restrict_to(keep):
+        return False
+    if current != self.current:
+      trail.assign(self, 'current', current)
+    trail.assign(self, 'last_masks', tuple(X.mask for X in Xs))
+    return True
+
+
+def values_of(mask: int, offset: int) -> List[int]:
+  """ The values in a domain mask, as in FDVar.values( ). """
+  values = []
+  while mask:
+    lowest_bit = mask & -mask
+    values.append(offset + lowest_bit.bit_length( ) - 1)
+    mask ^= lowest_bit
+  return values
+
+
+def table(Xs: Sequence[Any], tuples: Iterable[Sequence[int]]):
+  """ Succeed once if Xs can still take the values of one of the tuples, with Table posted. """
+  yield from post(Table(Xs, tuples))
+
+
+def _is_fd_arg(arg: Any) -> bool:
+  return isinstance(arg, FDVar) or isinstance(arg.unification_chain_end( ), FDVar)
+
+
+def item_table(Template: StructureItem, Items: Iterable[StructureItem], codebook: Optional[Codebook] = None) -> Table:
+  """
+  The relation listed by Items, a collection of ground StructureItems, as a Table over Template's FDVars.
+
+  Each arg of Template is
+  o an FDVar: a column of the table,
+  o a value: only the Items with that value there are rows of the table, or
+  o an unbound Var: ignored.
+  Values in the rows that are not ints are coded by codebook.
+  """
+  columns = [i for (i, arg) in enumerate(Template.args) if _is_fd_arg(arg)]
+  filters = [(i, arg.get_py_value( )) for (i, arg) in enumerate(Template.args)
+             if not _is_fd_arg(arg) and arg.is_instantiated( )]
+  code = codebook.code if codebook else (lambda value: value)
+  tuples = [tuple(code(Item.args[i].get_py_value( )) for i in columns) for Item in Items
+            if all(Item.args[i].get_py_value( ) == value for (i, value) in filters)]
+  return Table([Template.args[i] for i in columns], tuples)
+
+
+def member_tables(Template: StructureItem, Rows: Iterable[StructureItem], codebook: Optional[Codebook] = None) \
+                  -> List[Table]:
+  """
+  member(Template, Rows) as one Table per row, for Rows whose args are FDVars and a Template that gives
+  values for some of them, e.g., House(nationality='English', color='red').
+  Each Table says that in its row either all of Template's values are there or none of them is.
+
+  That is member only if each value is in exactly one row, as in the usual puzzle: all_different holds
+  for each attribute, and there are as many values as rows.
+  Values that are not ints are coded by codebook.
+  """
+  code = codebook.code if codebook else (lambda value: value)
+  given = [(i, code(arg.get_py_value( ))) for (i, arg) in enumerate(Template.args) if arg.is_instantiated( )]
+  codes = [value for (_, value) in given]
+  tables = []
+  for Row in Rows:
+    Xs = [fd_var(Row.args[i]) for (i, _) in given]
+    tuples = [values for values in product(*(X.values( ) for X in Xs))
+              if all(value == given_value for (value, given_value) in zip(values, codes)) or
+                 all(value != given_value for (value, given_value) in zip(values, codes))]
+    tables.append(Table(Xs, tuples))
+  return tables
+
+
+class Position(Propagator):
+  """
+  Pos is the index of the row of Rows that matches Template, for Rows whose args are FDVars and a Template
+  that gives values for some of them, as in member_tables. The constraint channels both ways:
+  o a row stays in Pos's domain only while each of Template's values is still in the row's domain,
+  o when Pos is fixed, its row takes Template's values,
+  o a row with all of Template's values is the position, and
+  o a row out of Pos's domain does not match: when all but one of Template's values are in it,
+    the last one is removed from it.
+  Like member_tables, that assumes that each value is in exactly one row.
+  """
+
+  __slots__ = ('codes', 'rows')
+
+  def __init__(self, Pos: FDVar, Template: StructureItem, Rows: Sequence[StructureItem],
+               codebook: Optional[Codebook] = None):
+    code = codebook.code if codebook else (lambda value: value)
+    given = [(i, code(arg.get_py_value( ))) for (i, arg) in enumerate(Template.args) if arg.is_instantiated( )]
+    self.codes = [value for (_, value) in given]
+    self.rows = [[fd_var(Row.args[i]) for (i, _) in given] for Row in Rows]
+    super( ).__init__(Pos, *(X for row in self.rows for X in row))
+
+  def propagate(self) -> bool:
+    Pos = self.variables[0]
+    codes = self.codes
+    possible = [h for h in Pos.values( ) if h < len(self.rows) and
+                all(X.contains(value) for (X, value) in zip(self.rows[h], codes))]
+    if len(possible) < Pos.size( ) and not Pos.restrict_to(possible):
+      return False
+    for (h, row) in enumerate(self.rows):
+      missing = [(X, value) for (X, value) in zip(row, codes) if X.size( ) > 1 or X.min( ) != value]
+      if Pos.contains(h):
+        if not missing and not Pos.assign(h):
+          return False
+        if Pos.size( ) == 1 and not all(X.assign(value) for (X, value) in missing):
+          return False
+      elif not missing:
+        return False
+      elif len(missing) == 1 and not missing[0][0].remove(missing[0][1]):
+        return False
+    return True
+
+
+def position_of(Template: StructureItem, Rows: Sequence[StructureItem], codebook: Optional[Codebook] = None,
+                positions: Optional[Iterable[int]] = None) -> Tuple[FDVar, Position]:
+  """ A new FDVar over positions, by default all the row indices, and the Position that channels it. """
+  Pos = FDVar(range(len(Rows)) if positions is None else positions)
+  return (Pos, Position(Pos, Template, Rows, codebook))
+
+
+def _gives_values(Template: Any) -> bool:
+  return isinstance(Template, StructureItem) and any(arg.is_instantiated( ) for arg in Template.args)
+
+
+def next_to_constraints(A: StructureItem, B: StructureItem, Rows: Sequence[StructureItem],
+                        codebook: Optional[Codebook] = None) -> List[Propagator]:
+  """ next_to(A, B, Rows) as constraints: abs(pos(A) - pos(B)) == 1. """
+  (PosA, PositionA) = position_of(A, Rows, codebook)
+  (PosB, PositionB) = position_of(B, Rows, codebook)
+  return [PositionA, PositionB, Distance(PosA, PosB, 1)]
+
+
+def contiguous_constraints(Templates: Sequence[Any], Rows: Sequence[StructureItem],
+                           codebook: Optional[Codebook] = None) -> List[Propagator]:
+  """
+  is_contiguous_in(Templates, Rows) as constraints: pos(Templates[j]) == pos(Templates[i]) + j - i.
+  A Template that gives no values, e.g., Var( ), only holds a place.
+  """
+  last_start = len(Rows) - len(Templates)
+  constraints = []
+  # The position of the first Template that gives values, and its index in Templates.
+  (First, first) = (None, None)
+  for (j, Template) in enumerate(Templates):
+    if not _gives_values(Template):
+      continue
+    (Pos, Position_j) = position_of(Template, Rows, codebook, range(j, last_start + j + 1))
+    constraints.append(Position_j)
+    if First is None:
+      (First, first) = (Pos, j)
+    else:
+      constraints.append(Offset(First, Pos, j - first))
+  return constraints
+
+
+def subsequence_constraints(Templates: Sequence[Any], Rows: Sequence[StructureItem],
+                            codebook: Optional[Codebook] = None) -> List[Propagator]:
+  """
+  is_a_subsequence_of(Templates, Rows) as constraints: pos(Templates[i]) + j - i <= pos(Templates[j]) for
+  successive Templates. A Template that gives no values, e.g., Var( ), only holds a place.
+  """
+  last_start = len(Rows) - len(Templates)
+  constraints = []
+  # The position of the last Template so far that gives values, and its index in Templates.
+  (Previous, previous) = (None, None)
+  for (j, Template) in enumerate(Templates):
+    if not _gives_values(Template):
+      continue
+    (Pos, Position_j) = position_of(Template, Rows, codebook, range(j, last_start + j + 1))
+    constraints.append(Position_j)
+    if Previous is not None:
+      constraints.append(Precedes(Previous, Pos, j - previous))
+    (Previous, previous) = (Pos, j)
+  return constraints
+
+
+def strongly_connected_components(successors: List[List[int]]) -> List[int]:
+  """ The component number of each node of a directed graph given as successor lists. (Tarjan, iteratively.) """
+  node_count = len(successors)
+  (index, low, on_stack, component) = ([None] * node_count, [0] * node_count, [False] * node_count,
+                                       [None] * node_count)
+  (stack, counter, component_count) = ([], 0, 0)
+  for root in range(node_count):
+    if index[root] is not None:
+      continue
+    index[root] = low[root] = counter
+    counter += 1
+    stack.append(root)
+    on_stack[root] = True
+    # Each entry is a node and the position of its next successor to look at.
+    path = [(root, 0)]
+    while path:
+      (node, position) = path[-1]
+      if position < len(successors[node]):
+        path[-1] = (node, position + 1)
+        successor = successors[node][position]
+        if index[successor] is None:
+          index[successor] = low[successor] = counter
+          counter += 1
+          stack.append(successor)
+          on_stack[successor] = True
+          path.append((successor, 0))
+        elif on_stack[successor]:
+          low[node] = min(low[node], index[successor])
+      else:
+        path.pop( )
+        if path:
+          parent = path[-1][0]
+          low[parent] = min(low[parent], low[node])
+        if low[node] == index[node]:
+          while True:
+            member = stack.pop( )
+            on_stack[member] = False
+            component[member] = component_count
+            if member == node:
+              break
+          component_count += 1
+  return component
+
+
+def all_different(Xs: List[Any], consistency: str = 'domain'):
+  """ Succeed once if the values of Xs can still be pairwise different, with AllDifferent posted. """
+  yield from post(AllDifferent(Xs, consistency))
+
+
+if __name__ == '__main__':
+  (X, Y, Z) = (FDVar([1, 2]), FDVar([1, 2]), FDVar([1, 2, 3]))
+  for _ in all_different([X, Y, Z]):
+    # X and Y use up 1 and 2, so Z must be 3.
+    print(f'X: {X.values( )}, Y: {Y.values( )}, Z: {Z}')
+  for _ in all_different([X, Y, FDVar([1, 2])], consistency='bounds'):
+    print('Not reached: three variables cannot take two values.')
@@ -1,8 +1,9 @@
 from __future__ import annotations
-from functools import wraps
+from functools import lru_cache, wraps
 from inspect import isgeneratorfunction
 from numbers import Number
 from typing import Any, Iterable, List, Optional, Sequence, Sized, Tuple, Union
+from weakref import WeakValueDictionary
 
 """
 Developed by Ian Piumarta as the "unify" library (http://www.ritsumei.ac.jp/~piumarta/pl/src/unify.py) for a
@@ -68,11 +69,20 @@ class Term:
                                                                                PyList      PyTuple
   """
 
+  # Terms are allocated by the thousands (millions in large puzzles). Use __slots__ rather than a __dict__
+  # in Term and in all its subclasses.
+  __slots__ = ('_term_id', )
+
+  # The number of term_ids handed out so far.
   term_count = 0
 
+  # True if this Term is known to be ground, i.e., to contain no unbound Vars or uninstantiated PyValues.
+  # PyValues and Structures keep their own flag. A Var is never known to be ground.
+  _ground = False
+
   def __init__(self):
-    Term.term_count += 1
-    self.term_id = self.term_count
+    # A term_id is assigned only when first asked for, typically when an unbound Var is printed.
+    self._term_id = None
 
   # @euc Can't use decorators on dunder methods without doing this:
   # (https://stackoverflow.com/questions/55550300/python-how-to-decorate-a-special-dunder-method).
@@ -96,12 +106,19 @@ class Term:
     The str( ) of a Var is (a) the str of its py_value if is_instantiated( ) or (b) its term_id otherwise.
     """
     self_euc = self.unification_chain_end( )
-    return f'{self_euc}' if self_euc.is_instantiated( ) or isinstance(self_euc, Structure) else \
+    return f'{self_euc}' if isinstance(self_euc, Structure) or self_euc.is_instantiated( ) else \
            f'_{self_euc.term_id}'
 
   def get_py_value(self) -> Any:
     return None
 
+  @property
+  def term_id(self) -> int:
+    if self._term_id is None:
+      Term.term_count += 1
+      self._term_id = Term.term_count
+    return self._term_id
+
   @euc
   def is_instantiated(self) -> bool:
     """ Should never get here since no unification_chain_end is a Term. """
@@ -119,9 +136,13 @@ def is_immutable(x):
 class PyValue(Term):
   """ A wrapper class for integers, strings, and other immutable Python value. """
 
+  __slots__ = ('_py_value', '_ground', '__weakref__')
+
   def __init__(self, py_value: Optional[str, Number] = None ):
     assert is_immutable(py_value), f"Only immutable values are allowed as PyValues. {py_value} is mutable."
     self._py_value = py_value
+    # A PyValue created with a value keeps it. One created uninstantiated may be bound and unbound.
+    self._ground = py_value is not None
     super( ).__init__( )
 
   def __add__(self, other):
@@ -162,9 +183,14 @@ class Structure(Term):
   self.functor is the functor
   self.args is a tuple of args
   """
+
+  __slots__ = ('functor', 'args', '_ground')
+
   def __init__(self, term: Tuple = ( None, () ) ):
     self.functor = term[0]
     self.args = tuple(map(ensure_is_logic_variable, term[1:]))
+    # A Structure built from ground args is ground for good. Otherwise is_instantiated( ) finds out.
+    self._ground = all(arg._ground for arg in self.args)
     super().__init__()
 
   def __eq__(self, other: Term) -> bool:
@@ -185,13 +211,36 @@ class Structure(Term):
     return result
 
   def get_py_value(self) -> Structure:
-    py_value_args = [arg.get_py_value() for arg in self.args]
+    # The args of a Structure that was ground when built are all PyValues and Structures. No need to deref them.
+    py_value_args = [arg.get_py_value() for arg in self.args] if self._ground else \
+                    [arg.unification_chain_end().get_py_value() for arg in self.args]
     return Structure( (self.functor, *py_value_args) )
 
   def is_instantiated(self) -> bool:
-    """ A Structure is instantiated if all its args are. """
-    args_are_instantiated = all(arg.is_instantiated() for arg in self.args)
-    return args_are_instantiated
+    """
+    A Structure is instantiated if all its args are.
+
+    The args are walked with an explicit stack, skipping nested Structures already known to be ground.
+    If the walk finds that this Structure (and the Structures within it) are ground, their _ground
+    flags are set on the trail. They stay set until the bindings that made them ground are undone.
+    """
+    if self._ground:
+      return True
+    (stack, walked, seen) = ([self], [], {id(self)})
+    while stack:
+      T = stack.pop( )
+      walked.append(T)
+      for arg in T.args:
+        arg = arg.unification_chain_end( )
+        if isinstance(arg, Structure):
+          if not arg._ground and id(arg) not in seen:
+            seen.add(id(arg))
+            stack.append(arg)
+        elif not arg.is_instantiated( ):
+          return False
+    for T in walked:
+      trail.assign(T, '_ground', True)
+    return True
 
   @staticmethod
   def values_string(values: Iterable):
@@ -206,11 +255,22 @@ class StructureItem(Structure):
   A utility class for building and displaying Structure-based items.
   """
 
+  __slots__ = ('first_arg_as_str_functor', )
+
   def __init__(self, args, first_arg_as_str_functor=False):
     self.first_arg_as_str_functor = first_arg_as_str_functor
     functor = type(self).__name__.lower( )
     super().__init__( (functor, *map(make_property, args)) )
 
+  @classmethod
+  def fresh(cls, **properties) -> StructureItem:
+    """
+    A new cls(**properties), copied from a TermTemplate made the first time these properties were asked for.
+    The properties must be Python values: a Var has no hash. E.g., in a clue,
+        member(House.fresh(nationality='English', color='red'), Houses)
+    """
+    return _item_template(cls, **properties)( )
+
   def __str__(self):
     all_args_uninstantiated = all(isinstance(arg.unification_chain_end(), Var) for arg in self.args)
     if all_args_uninstantiated:
@@ -231,9 +291,17 @@ class Var(Term):
   A logic variable
   """
 
+  __slots__ = ('unification_chain_next', 'rank')
+
+  # True for Vars that carry constraints, e.g., finite_domains.FDVar. unify_on_trail binds a constrained Var
+  # only through its bind_to( ), which may refuse the binding. It never points one at an unconstrained Var.
+  constrained = False
+
   def __init__(self):
     # self.unification_chain_next points to the next element on the unification_chain, if any.
     self.unification_chain_next = None
+    # An upper bound on the length of the unification_chains ending at this Var. (Union by rank.)
+    self.rank = 0
     super().__init__()
 
   def __add__(self, other):
@@ -256,6 +324,11 @@ class Var(Term):
     assert isinstance(self_euc, Sized)
     return None if not hasattr(self_euc, '__len__') or self == self_euc else len(self_euc)
 
+  def bind_to(self, Other: Term) -> bool:
+    """ Make Other the next element on this Var's unification_chain. Return whether the binding is allowed. """
+    trail.assign(self, 'unification_chain_next', Other)
+    return True
+
   def _has_unification_chain_next(self) -> bool:
     # Is this the end of the unification_chain?
     return self.unification_chain_next is not None
@@ -273,8 +346,24 @@ class Var(Term):
   def unification_chain_end(self):
     """
     return: the Term, whatever it is, at the end of this Var's unification unification_chain.
+
+    The chain is walked iteratively. If it is longer than one link, every Var on it is then pointed
+    directly at the end (path compression). Those assignments go on the trail like any other binding,
+    so backup restores the chain exactly as it was built.
     """
-    return self.unification_chain_next.unification_chain_end( ) if self._has_unification_chain_next( ) else self
+    chain_next = self.unification_chain_next
+    if chain_next is None:
+      return self
+    chain_end = chain_next
+    while isinstance(chain_end, Var) and chain_end.unification_chain_next is not None:
+      chain_end = chain_end.unification_chain_next
+    if chain_next is not chain_end:
+      v = self
+      while v.unification_chain_next is not chain_end:
+        v_next = v.unification_chain_next
+        trail.assign(v, 'unification_chain_next', chain_end)
+        v = v_next
+    return chain_end
 
 
 # @staticmethod
@@ -283,9 +372,153 @@ def ensure_is_logic_variable(x: Any) -> Term:
     Applied to each argument in a Structure.
     Applies PyValue to those that are not already Terms.
     If x is not a logic variable, i.e., an instance of Term, it must be a Python value.
-    Wrap it in PyValue. (It must be immutable.)
+    Wrap it in PyValue. (It must be immutable.) Strings and ints share an interned PyValue.
   """
-  return x if isinstance(x, Term) else PyValue(x)
+  return x if isinstance(x, Term) else interned_py_value(x)
+
+
+"""
+The intern table for constants. Each PyValue that goes through interned_py_value has a single canonical
+instance, so equal constants unify by identity. The table holds its entries weakly: a canonical PyValue
+that is no longer referenced anywhere else disappears from it.
+"""
+# Only values of these exact types are interned. Interned PyValues of different types must never be equal,
+# which rules out bool (1 == True), float (1 == 1.0), and tuples ((1, ) == (True, )).
+_internable_types = (int, str)
+_interned_py_values = WeakValueDictionary( )
+
+
+def interned_py_value(py_value: Any) -> PyValue:
+  """ The canonical PyValue for py_value if it is of an internable type; otherwise a new PyValue. """
+  if type(py_value) not in _internable_types:
+    return PyValue(py_value)
+  key = (type(py_value), py_value)
+  PV = _interned_py_values.get(key)
+  if PV is None:
+    PV = _interned_py_values[key] = PyValue(py_value)
+  return PV
+
+
+def added_slots(cls: type) -> Tuple[str, ...]:
+  """ The slots a Structure subclass adds to Structure's, e.g., StructureItem's first_arg_as_str_functor. """
+  slots = _added_slots.get(cls)
+  if slots is None:
+    slots = _added_slots[cls] = tuple(slot for klass in reversed(cls.__mro__[:cls.__mro__.index(Structure)])
+                                      for slot in klass.__dict__.get('__slots__', ( ))
+                                      if slot not in ('__weakref__', '__dict__'))
+  return slots
+
+
+_added_slots = {}
+
+
+class TermTemplate:
+  """
+  The shape of a Term, worked out once, so that copies of it with fresh Vars are quick to make.
+
+  A Structure's constructor wraps each arg (see ensure_is_logic_variable and make_property) and checks
+  whether the args are ground, every time. A template does that once. Calling it then makes a copy in
+  a loop over the template's non-ground Structures, innermost first. Each copy starts from a list of its
+  args in which the ground args are already in place. Fresh Vars (and uninstantiated PyValues) go into
+  the remaining slots, as do the copies of the nested Structures.
+  o Ground subterms are not copied. Copies share them with the original, as interned PyValues are shared.
+    A subterm is shared only if it is built from values. One that is ground only because of bindings on
+    the trail is copied.
+  o Bound Vars (and PyValues) are followed: a copy has the value, as of when the template was made.
+  o A Var or Structure that appears twice in the Term appears twice in each copy, and each copy has
+    its own.
+  Vars with constraints, e.g., an unbound finite_domains.FDVar, can't be copied: their propagators
+  would have to be copied too.
+  """
+
+  __slots__ = ('term', 'fresh', 'nodes')
+
+  def __init__(self, T: Any):
+    T = ensure_is_logic_variable(T).unification_chain_end( )
+    self.term = T
+    # The class of each fresh Var or PyValue; and each non-ground Structure, innermost first, as its class,
+    # functor, added slots, its args with the ground ones in place, and where the fresh Vars and copied
+    # Structures go: (position, index) pairs.
+    self.fresh: List[type] = []
+    self.nodes: List[Tuple[type, Any, Tuple, List[Term], Tuple, Tuple]] = []
+    # For each Term seen, by id: ('var', index in fresh), ('node', index in nodes), or ('value', U) for a
+    # ground U that copies share. None while a Structure's args are being walked.
+    places = {}
+    stack = [(T, False)]
+    while stack:
+      (U, args_done) = stack.pop( )
+      if id(U) in places and not args_done:
+        continue
+      if isinstance(U, Structure):
+        # _ground alone can't be trusted: is_instantiated( ) sets it on the trail while the Vars in U are
+        # bound. So U is shared only if its args are, as they are.
+        if not args_done:
+          places[id(U)] = None
+          stack.append((U, True))
+          for arg in U.args:
+            arg = arg.unification_chain_end( )
+            if id(arg) in places and places[id(arg)] is None:
+              raise ValueError(f'{T} contains itself')
+            stack.append((arg, False))
+          continue
+        (args, var_args, node_args) = ([], [], [])
+        for (i, arg) in enumerate(U.args):
+          place = places[id(arg.unification_chain_end( ))]
+          args.append(place[1] if place[0] == 'value' else None)
+          if place[0] != 'value':
+            (var_args if place[0] == 'var' else node_args).append((i, place[1]))
+        if not var_args and not node_args and all(arg is U_arg for (arg, U_arg) in zip(args, U.args)):
+          places[id(U)] = ('value', U)
+          continue
+        self.nodes.append((type(U), U.functor, tuple((slot, getattr(U, slot)) for slot in added_slots(type(U))),
+                           args, tuple(var_args), tuple(node_args)))
+        places[id(U)] = ('node', len(self.nodes) - 1)
+      elif isinstance(U, PyValue) and not U._ground:
+        if U.is_instantiated( ):
+          # Bound on the trail. The copy gets the value.
+          places[id(U)] = ('value', interned_py_value(U.get_py_value( )))
+        else:
+          self.fresh.append(PyValue)
+          places[id(U)] = ('var', len(self.fresh) - 1)
+      elif isinstance(U, (Structure, PyValue)):
+        places[id(U)] = ('value', U)
+      else:
+        if U.constrained:
+          raise ValueError(f'{type(U).__name__} {U} has constraints and can\'t be copied')
+        self.fresh.append(Var)
+        places[id(U)] = ('var', len(self.fresh) - 1)
+    if places[id(T)][0] == 'value':
+      self.term = places[id(T)][1]
+
+  def __call__(self) -> Term:
+    """ A copy of the term with fresh Vars. """
+    Vars = [make( ) for make in self.fresh]
+    copies = []
+    for (cls, functor, slots, args, var_args, node_args) in self.nodes:
+      args = args.copy( )
+      for (i, k) in var_args:
+        args[i] = Vars[k]
+      for (i, k) in node_args:
+        args[i] = copies[k]
+      S = cls.__new__(cls)
+      S.functor = functor
+      S.args = tuple(args)
+      S._ground = False
+      S._term_id = None
+      for (slot, value) in slots:
+        setattr(S, slot, value)
+      copies.append(S)
+    return copies[-1] if copies else Vars[0] if Vars else self.term
+
+
+def copy_term(T: Any) -> Term:
+  """ A copy of T with fresh Vars in place of its unbound ones, as Prolog's copy_term/2. See TermTemplate. """
+  return TermTemplate(T)( )
+
+
+@lru_cache(maxsize=None)
+def _item_template(cls: type, **properties) -> TermTemplate:
+  return TermTemplate(cls(**properties))
 
 
 def make_property(prop):
@@ -302,8 +535,128 @@ def n_Vars(n: int) -> List[Var]:
   return [Var( ) for _ in range(n)]
 
 
-# noinspection PyProtectedMember
-@euc
+class Trail:
+  """
+  The undo stack for all bindings.
+
+  Every binding (a Var's unification_chain_next, an uninstantiated PyValue's _py_value) is made through
+  assign( ), which records the previous value before overwriting it. A choice point records trail.mark( )
+  and, on backup, calls trail.undo_to(mark), which restores everything bound since then in one pass.
+
+  Choice points must be undone in LIFO order. That is the natural order for nested for-loops and
+  yield from, which is how pylog generators are written.
+
+  The trail also keeps two running counts for benchmarking and profiling: unifications (calls to
+  unify_on_trail) and backtracks (calls to undo_to that undid at least one binding).
+  """
+
+  def __init__(self):
+    self.entries = []
+    self.unifications = 0
+    self.backtracks = 0
+
+  def __len__(self):
+    return len(self.entries)
+
+  def assign(self, obj: Any, attr: str, value: Any):
+    """ Set obj.attr to value and record the old value so that it can be restored. """
+    self.entries.append((obj, attr, getattr(obj, attr)))
+    setattr(obj, attr, value)
+
+  def mark(self) -> int:
+    return len(self.entries)
+
+  def undo_to(self, mark: int):
+    """ Restore every assignment made since mark was taken. """
+    entries = self.entries
+    if len(entries) > mark:
+      self.backtracks += 1
+    while len(entries) > mark:
+      (obj, attr, old_value) = entries.pop( )
+      setattr(obj, attr, old_value)
+
+
+# The one trail shared by all logic variables.
+trail = Trail( )
+
+
+def unify_on_trail(Left: Any, Right: Any) -> bool:
+  """
+  Unify Left and Right without creating a generator. Bindings are recorded on the trail.
+  Return True if the unification succeeded.
+
+  If it fails, some bindings may already have been made. The caller is responsible for
+  undoing them, i.e., for calling trail.undo_to( ) with a mark taken before the call.
+  Structures are unified with an explicit stack of pairs rather than by recursion.
+  """
+  trail.unifications += 1
+  pairs = [(Left, Right)]
+  while pairs:
+    (Left, Right) = pairs.pop( )
+    # Make sure both Left and Right are logic variables. This allows us to call, e.g, unify(X, 'abc').
+    # ensure_is_logic_variable will wrap 'abc' in a PyValue.
+    Left = ensure_is_logic_variable(Left).unification_chain_end( )
+    Right = ensure_is_logic_variable(Right).unification_chain_end( )
+
+    # Already unified, either as the same (unbound) Var or as the same object.
+    if Left is Right:
+      continue
+
+    # Case 1. Both are PyValues. If both are instantiated, they must have the same value.
+    # If exactly one is instantiated, "assign" its value to the other.
+    # Two uninstantiated PyValues don't unify. (See PyValue.__eq__.)
+    if isinstance(Left, PyValue) and isinstance(Right, PyValue):
+      (left_instantiated, right_instantiated) = (Left.is_instantiated( ), Right.is_instantiated( ))
+      if left_instantiated and right_instantiated:
+        if Left.get_py_value( ) != Right.get_py_value( ):
+          return False
+      elif left_instantiated or right_instantiated:
+        (assignedTo, assignedFrom) = (Left, Right) if right_instantiated else (Right, Left)
+        trail.assign(assignedTo, '_py_value', assignedFrom.get_py_value( ))
+      else:
+        return False
+
+    # Case 2. Both Structures. They can be unified if
+    # (a) they have the same functor and
+    # (b) their arguments can be unified.
+    # Push the argument pairs in reverse so that they are unified left to right.
+    elif isinstance(Left, Structure) and isinstance(Right, Structure):
+      if Left.functor != Right.functor or len(Left.args) != len(Right.args):
+        return False
+      pairs.extend(zip(Left.args[::-1], Right.args[::-1]))
+
+    # Case 3. At least one is a Var, and it is the end of its unification_chain.
+    # Make the other an extension of its unification_chain.
+    # If both are Vars, it makes no functional difference which extends which. Attach the one with
+    # the lower rank to the other so that chains stay short (union by rank).
+    # A constrained Var stays at the end of the chain so that it keeps its constraints, and it may refuse the
+    # binding (see Var.bind_to).
+    elif isinstance(Left, Var) and isinstance(Right, Var):
+      (pointsFrom, pointsTo) = (Right, Left) if Left.rank > Right.rank else (Left, Right)
+      if pointsFrom.constrained and not pointsTo.constrained:
+        (pointsFrom, pointsTo) = (pointsTo, pointsFrom)
+      if pointsFrom.rank == pointsTo.rank:
+        trail.assign(pointsTo, 'rank', pointsTo.rank + 1)
+      if pointsFrom.constrained:
+        if not pointsFrom.bind_to(pointsTo):
+          return False
+      else:
+        trail.assign(pointsFrom, 'unification_chain_next', pointsTo)
+
+    elif isinstance(Left, Var) or isinstance(Right, Var):
+      (pointsFrom, pointsTo) = (Left, Right) if isinstance(Left, Var) else (Right, Left)
+      if pointsFrom.constrained:
+        if not pointsFrom.bind_to(pointsTo):
+          return False
+      else:
+        trail.assign(pointsFrom, 'unification_chain_next', pointsTo)
+
+    else:
+      return False
+
+  return True
+
+
 def unify(Left: Any, Right: Any):
   """
   Unify two logic Terms.
@@ -316,76 +669,34 @@ def unify(Left: Any, Right: Any):
   o a non-Var, in which case the value of all preceding variables is the value of that non-Var, or
   o a Var (which is not linked to any further element), in which case, all variables on the unification_chain
     are unified but do not (yet) have a value.
-  """
-
-  # Make sure both Left and Right are logic variables. This allows us to call, e.g, unify(X, 'abc').
-  # ensure_is_logic_variable will wrap 'abc' in a PyValue.
-  (Left, Right) = map(ensure_is_logic_variable, (Left, Right))
 
-  # If the unification_chain_ends are equal, either because they have the same py_value or Structure or
-  # because they are the same (unbound) Var, do nothing. They are already unified.
-  # yield to indicate unification success. If Left and Right are both
-  # uninstantiated PyValues, Left != Right. (See PyValue.__eq__.)
-  if Left == Right:
-    yield
-
-  # The rest consists of special cases: both PyValues, both Structures, at least one Var.
-
-  # Case 1. Both are PyValues, and exactly one is instantiated.
-  # "Assign" it's value to the other. This is similar to (but simpler than)
-  # how we handle two Var's. But instead of building a unification_chain, we "assign"
-  # one value to the other.
-  elif isinstance(Left, PyValue) and isinstance(Right, PyValue) and \
-       (not Left.is_instantiated( ) or not Right.is_instantiated( )) and \
-       (Left.is_instantiated( ) or Right.is_instantiated( )):
-    (assignedTo, assignedFrom) = (Left, Right) if Right.is_instantiated( ) else (Right, Left)
-    assignedTo._set_py_value(assignedFrom.get_py_value( ))
-    yield
-    # See discussion in unify below for why we do this.
-    assignedTo._set_py_value(None)
-    #
-    # # If they are both PyValues, treat specially.
-    # yield from unify_PyValues(Left, Right)
-    
-  # Case 2. Both  Structures. They can be unified if
-  # (a) they have the same functor and
-  # (b) their arguments can be unified.
-  elif isinstance(Left, Structure) and isinstance(Right, Structure) and Left.functor == Right.functor:
-    yield from unify_sequences(Left.args, Right.args)
-
-  # Case 3. At least one is a Var. Since we use @euc, it's the end of its unification_chain.
-  # Make the other an extension of its unification_chain.
-  # (If both are Vars, it makes no functional difference which extends which.)
-  elif isinstance(Left, Var) or isinstance(Right, Var):
-    (pointsFrom, pointsTo) = (Left, Right) if isinstance(Left, Var) else (Right, Left)
-    pointsFrom.unification_chain_next = pointsTo
+  The bindings themselves are made by unify_on_trail. This generator is the choice point: it marks the trail,
+  yields once if the unification succeeded, and on backup undoes everything bound since the mark.
+  """
+  mark = trail.mark( )
+  if unify_on_trail(Left, Right):
     yield
-    # All yields create a context in which more of the program is executed--like
-    # the body of a while-loop or a for-loop. A "next()" request asks for alternatives.
-    # But there is only one functional way to do unification. So on "backup," unlink the
-    # two and exit without a further yield, i.e., fail.
+  # All yields create a context in which more of the program is executed--like
+  # the body of a while-loop or a for-loop. A "next()" request asks for alternatives.
+  # But there is only one functional way to do unification. So on "backup," undo the
+  # bindings and exit without a further yield, i.e., fail.
 
-    # This is fundamental! It's what makes it possible for a Var to become un-unified outside
-    # the context in which it was unified, e.g., unifying a Var with (successive) members
-    # of a list. The first successful unification must be undone before the second can occur.
-    pointsFrom.unification_chain_next = None
+  # This is fundamental! It's what makes it possible for a Var to become un-unified outside
+  # the context in which it was unified, e.g., unifying a Var with (successive) members
+  # of a list. The first successful unification must be undone before the second can occur.
+  trail.undo_to(mark)
 
     
 def unify_pairs(tuples: List[Tuple[Any, Any]]):
-  """ Apply unify to pairs of terms. """
-  # If no more tuples, we are done.
-  if not tuples:
+  """
+  Apply unify to pairs of terms.
+  Unification has no alternatives, so the pairs are unified one after the other, left to right, under a
+  single trail mark. There is one generator frame however many pairs there are.
+  """
+  mark = trail.mark( )
+  if all(unify_on_trail(Left, Right) for (Left, Right) in tuples):
     yield
-  else:
-    # Get the first tuple from the tuples list.
-    [(Left, Right), *restOfTuples] = tuples
-    # If they unify, go on to the rest of the tuples list.
-    for _ in unify(Left, Right):
-      yield from unify_pairs(restOfTuples)
-    # The preceding is equivalent to the following.
-    # for _ in forall([lambda: unify(Left, Right),
-    #                  lambda: unify_pairs(restOfTuples)]):
-    #   yield
+  trail.undo_to(mark)
 
 
 def unify_sequences(seq_1: Sequence, seq_2: Sequence):
@@ -394,15 +705,11 @@ def unify_sequences(seq_1: Sequence, seq_2: Sequence):
   if len(seq_1) != len(seq_2):
     return
 
-  # If they are both empty, we are done.
-  if len(seq_1) == 0:
+  # Walk the two sequences in step. No slices are taken, and there is one generator frame.
+  mark = trail.mark( )
+  if all(unify_on_trail(seq_1[i], seq_2[i]) for i in range(len(seq_1))):
     yield
-
-  else:
-    # Unify the two first elements. If successful go on to the rest.
-    # Note that slice notation is supported.
-    for _ in unify(seq_1[0], seq_2[0]):
-      yield from unify_sequences(seq_1[1:], seq_2[1:])
+  trail.undo_to(mark)
 
 
 if __name__ == '__main__':
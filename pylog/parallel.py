@@ -0,0 +1,268 @@
+import multiprocessing as mp
+from concurrent.futures import as_completed, Future, ProcessPoolExecutor
+from itertools import count, islice
+from queue import Empty
+from traceback import format_exc
+from typing import Any, Callable, Generator, Iterator, List, Optional, Tuple, Union
+
+from control_structures import ChoiceTrampoline, choice_paths
+from logic_variables import trail
+from serialization import packed, unpacked
+
+"""
+Parallel search: the top of a search tree is split across processes.
+
+Logic variables, the trail and the propagation queue all live in one process, so they can't be shipped to
+another. What is shipped instead is how to rebuild the search: a problem function and its arguments. A
+problem function is a module-level function that builds a fresh search. It returns a goal for trampoline( )
+and an answer function, which snapshots a solution as picklable values or a Term (see serialization.py).
+E.g. (see n_queens_fd.py),
+    def queens_problem(board_width):
+      Queens = [FDVar(range(board_width)) for _ in range(board_width)]
+      return (queens_goal(Queens), lambda: tuple(Q.get_py_value( ) for Q in Queens))
+
+The parent runs the top depth levels of the search to list its choice paths (see
+control_structures.choice_paths). Each path is a subproblem. A worker rebuilds the search, follows the path
+and searches everything below it. Because a worker replays the top of the search, the goal must make the same
+choices each time it is built. A randomized search must be given its seed.
+
+Pick depth so that there are several paths per worker. Then a worker that finishes early takes another.
+
+That is not enough when a few subtrees hold most of the search, as they often do. work_stealing_solutions
+splits the search as it goes. The workers take subproblems from a shared queue, starting with the whole
+search. Every check_interval alternatives, a busy worker looks whether more workers are idle than there are
+subproblems queued. If so, it gives away the untried alternatives nearest the root of its search, which
+are likely the largest subtrees left, as a new subproblem (see ChoiceTrampoline.split). A subproblem is a
+choice path and the first alternative to try at its end: a few small ints, rebuilt by replay like the paths
+above. The parent collects the answers and what each worker did (see WorkStats).
+"""
+
+
+# In a worker: the Event that tells it to give up its subproblem. It can't be sent with each subproblem, so
+# each worker gets it when it starts.
+_stop = None
+
+
+def _start_worker(stop):
+  global _stop
+  _stop = stop
+
+
+def _executor(max_workers: Optional[int], stop) -> ProcessPoolExecutor:
+  return ProcessPoolExecutor(max_workers, initializer=_start_worker, initargs=(stop, ))
+
+
+def _search_below(problem: Callable[..., Tuple[Generator, Callable[[], Any]]], args: Tuple,
+                  path: Tuple[int, ...], limit: Optional[int], count_only: bool,
+                  check_interval: int) -> Union[int, List[Any]]:
+  """
+  Run in a worker: the answers, or their number, of at most limit solutions below path. Every
+  check_interval alternatives, the worker looks whether it has been stopped. If so, it gives up.
+  """
+  (goal, answer) = problem(*args)
+  mark = trail.mark( )
+  try:
+    search = ChoiceTrampoline(goal, path, 0, lambda _: _stop.is_set( ), check_interval)
+    found = islice(search, limit)
+    return sum(1 for _ in found) if count_only else [packed(answer( )) for _ in found]
+  finally:
+    trail.undo_to(mark)
+
+
+def _subproblems(executor: ProcessPoolExecutor, problem: Callable, args: Tuple, depth: int,
+                 limit: Optional[int], count_only: bool, check_interval: int) -> List[Future]:
+  (goal, _) = problem(*args)
+  return [executor.submit(_search_below, problem, args, path, limit, count_only, check_interval)
+          for path in choice_paths(goal, depth)]
+
+
+def parallel_solutions(problem: Callable[..., Tuple[Generator, Callable[[], Any]]], args: Tuple = ( ),
+                       depth: int = 2, limit: Optional[int] = None, max_workers: Optional[int] = None,
+                       ordered: bool = False, check_interval: int = 100) -> Iterator[Any]:
+  """
+  The answers of problem(*args)'s solutions, found by max_workers processes (by default, one per core).
+  Unless ordered, the answers come as the workers finish, not in search order. After limit answers, the
+  subproblems not yet started are cancelled, and the workers give up the ones they are searching within
+  check_interval alternatives. Each worker stops after limit solutions of its own.
+  """
+  stop = mp.Event( )
+  with _executor(max_workers, stop) as executor:
+    futures = _subproblems(executor, problem, args, depth, limit, False, check_interval)
+    found = 0
+    try:
+      for future in (futures if ordered else as_completed(futures)):
+        for answer in future.result( ):
+          yield unpacked(answer)
+          found += 1
+          if found == limit:
+            return
+    finally:
+      stop.set( )
+      for future in futures:
+        future.cancel( )
+
+
+def parallel_count(problem: Callable[..., Tuple[Generator, Callable[[], Any]]], args: Tuple = ( ),
+                   depth: int = 2, max_workers: Optional[int] = None) -> int:
+  """ The number of solutions of problem(*args), counted by max_workers processes. No answers are shipped. """
+  with _executor(max_workers, mp.Event( )) as executor:
+    return sum(future.result( ) for future in _subproblems(executor, problem, args, depth, None, True, 100))
+
+
+class WorkStats:
+  """ What work_stealing_solutions( )'s workers did: for each, its subproblems, steals, alternatives and solutions. """
+
+  __slots__ = ('tasks', 'steals', 'nodes', 'solutions')
+
+  def __init__(self):
+    self.start(0)
+
+  def start(self, workers: int):
+    """ Count from 0 for workers workers. A steal is a subproblem a worker gave away to an idle one. """
+    (self.tasks, self.steals, self.nodes, self.solutions) = ([0] * workers, [0] * workers, [0] * workers, [0] * workers)
+
+  def __str__(self):
+    return (f'{sum(self.tasks)} subproblems, {sum(self.steals)} steals, {sum(self.nodes)} alternatives, '
+            f'{sum(self.solutions)} solutions; alternatives per worker: {self.nodes}')
+
+
+def _steal_worker(worker_id: int, problem: Callable[..., Tuple[Generator, Callable[[], Any]]], args: Tuple,
+                  count_only: bool, check_interval: int, tasks: mp.Queue, results: mp.Queue, idle, queued, stop):
+  """
+  Run in a worker: search the subproblems from tasks until a None comes. For each, put its answers on results
+  and then ('done', task_id, spawned task_ids, nodes, solutions, worker_id).
+  """
+  task_ids = count( )
+
+  def share(search: ChoiceTrampoline) -> bool:
+    """ Give work to an idle worker if there is one. Say whether to stop. """
+    if stop.is_set( ):
+      return True
+    if idle.value > queued.value:
+      subproblem = search.split( )
+      if subproblem:
+        task_id = (worker_id, next(task_ids))
+        spawned.append(task_id)
+        with queued.get_lock( ):
+          queued.value += 1
+        tasks.put((task_id, *subproblem))
+    return False
+
+  while True:
+    with idle.get_lock( ):
+      idle.value += 1
+    task = tasks.get( )
+    with idle.get_lock( ):
+      idle.value -= 1
+    if task is None:
+      return
+    with queued.get_lock( ):
+      queued.value -= 1
+    (task_id, path, first) = task
+    (spawned, solutions, nodes) = ([], 0, 0)
+    if not stop.is_set( ):
+      mark = trail.mark( )
+      try:
+        (goal, answer) = problem(*args)
+        search = ChoiceTrampoline(goal, path, first, share, check_interval)
+        for _ in search:
+          solutions += 1
+          if not count_only:
+            results.put(('answer', packed(answer( ))))
+        nodes = search.nodes
+      except Exception:
+        results.put(('error', format_exc( )))
+      finally:
+        # The next task starts from no bindings, even if this one failed.
+        trail.undo_to(mark)
+    results.put(('done', task_id, spawned, nodes, solutions, worker_id))
+
+
+def _work_stealing(problem: Callable[..., Tuple[Generator, Callable[[], Any]]], args: Tuple, limit: Optional[int],
+                   workers: Optional[int], check_interval: int, stats: Optional[WorkStats],
+                   count_only: bool) -> Iterator[Any]:
+  """ Yield the answers, or, if count_only, the number of solutions of each subproblem, as they come. """
+  workers = workers or mp.cpu_count( )
+  stats = WorkStats( ) if stats is None else stats
+  stats.start(workers)
+  (tasks, results) = (mp.Queue( ), mp.Queue( ))
+  (idle, queued, stop) = (mp.Value('i', 0), mp.Value('i', 1), mp.Event( ))
+  tasks.put(((-1, 0), ( ), 0))
+  processes = [mp.Process(target=_steal_worker, args=(worker_id, problem, args, count_only, check_interval,
+                                                      tasks, results, idle, queued, stop), daemon=True)
+               for worker_id in range(workers)]
+  for process in processes:
+    process.start( )
+  # The search is done when every subproblem known of is done. A subproblem becomes known when the
+  # worker that gave it away is done, so one not yet known has a known subproblem not yet done.
+  (known, done, found) = ({(-1, 0)}, set( ), 0)
+  try:
+    while done != known and (limit is None or found < limit):
+      message = results.get( )
+      if message[0] == 'answer':
+        found += 1
+        yield unpacked(message[1])
+      elif message[0] == 'error':
+        raise RuntimeError(f'A worker failed:\n{message[1]}')
+      else:
+        (_, task_id, spawned, nodes, solutions, worker_id) = message
+        known.update(spawned)
+        done.add(task_id)
+        stats.tasks[worker_id] += 1
+        stats.steals[worker_id] += len(spawned)
+        stats.nodes[worker_id] += nodes
+        stats.solutions[worker_id] += solutions
+        if count_only:
+          found += solutions
+          yield solutions
+  finally:
+    stop.set( )
+    for _ in processes:
+      tasks.put(None)
+    # A worker can't exit with results not yet read.
+    while any(process.is_alive( ) for process in processes):
+      try:
+        results.get(timeout=0.01)
+      except Empty:
+        pass
+    for process in processes:
+      process.join( )
+
+
+def work_stealing_solutions(problem: Callable[..., Tuple[Generator, Callable[[], Any]]], args: Tuple = ( ),
+                            limit: Optional[int] = None, workers: Optional[int] = None, check_interval: int = 100,
+                            stats: Optional[WorkStats] = None) -> Iterator[Any]:
+  """
+  The answers of problem(*args)'s solutions, found by workers processes (by default, one per core) that
+  share the work as they go. The answers come as they are found. After limit answers, the workers stop.
+  If stats is given, it is filled in with what each worker did.
+  """
+  return _work_stealing(problem, args, limit, workers, check_interval, stats, False)
+
+
+def work_stealing_count(problem: Callable[..., Tuple[Generator, Callable[[], Any]]], args: Tuple = ( ),
+                        workers: Optional[int] = None, check_interval: int = 100,
+                        stats: Optional[WorkStats] = None) -> int:
+  """ The number of solutions of problem(*args), counted by workers processes that share the work. """
+  return sum(_work_stealing(problem, args, None, workers, check_interval, stats, True))
+
+
+if __name__ == '__main__':
+  from timeit import default_timer as timer
+
+  from control_structures import trampoline
+  from examples.n_queens.n_queens_fd import queens_problem
+
+  for workers in [1, 2, 4]:
+    start = timer( )
+    print(f'{workers} worker(s): {parallel_count(queens_problem, (9, ), depth=3, max_workers=workers)} solutions '
+          f'to 9 queens in {round(timer( ) - start, 3)} sec')
+  start = timer( )
+  (goal, _) = queens_problem(9)
+  print(f'No workers: {sum(1 for _ in trampoline(goal))} solutions in {round(timer( ) - start, 3)} sec')
+  print(f'The first 3 solutions in search order: {list(parallel_solutions(queens_problem, (9, ), limit=3, ordered=True))}')
+  for workers in [1, 2, 4]:
+    stats = WorkStats( )
+    start = timer( )
+    print(f'{workers} worker(s), work stealing: {work_stealing_count(queens_problem, (9, ), workers, stats=stats)} '
+          f'solutions in {round(timer( ) - start, 3)} sec. {stats}')
@@ -0,0 +1,198 @@
+import json
+from functools import wraps
+from time import perf_counter
+from types import GeneratorType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+"""
+A port-model profiler for generator predicates.
+
+Prolog's box model gives each call of a predicate four ports:
+  call  the predicate is entered,
+  exit  it succeeds, i.e., yields,
+  redo  it is asked for another solution, i.e., resumed after a yield, and
+  fail  it has no more solutions, i.e., raises StopIteration.
+A Profiler counts these ports for each predicate it wraps. It also accumulates
+  inclusive time  time spent inside the predicate's generator, including the predicates it calls, and
+  exclusive time  the same less the time charged to the profiled predicates it calls.
+A redo that fails again at once is the cost of backtracking into a predicate. So a predicate with many
+redos and fails, or with a large exclusive time, is where a search spends its effort.
+
+Time is charged only while a generator is running, not while it is suspended at a yield. Inclusive time
+for a recursive predicate counts only its outermost active call, so it is not counted twice.
+
+Wrap functions with profile( ), or replace them where they are looked up with attach( ):
+    profiler = Profiler( )
+    with profiler.attach(super_sequence, 'member'):
+      ...
+    print(profiler.report( ))
+attach replaces the attribute in the given module or object only. A module that did
+"from logic_variables import unify" has its own reference, so attach to that module.
+To profile a puzzle's clues, attach to its class:
+    profiler.attach(ZebraProblem, *[f'clue_{i}' for i in range(16)])
+
+A goal written for trampoline( ) may yield a subgoal. The wrapper passes subgoals through without counting
+them as exits. The trampoline runs them outside the wrapper, so their time is not charged to the goal.
+"""
+
+
+class PortStats:
+  """ The port counts and times of one predicate. """
+  __slots__ = ('calls', 'exits', 'redos', 'fails', 'inclusive', 'exclusive', 'active')
+
+  def __init__(self):
+    (self.calls, self.exits, self.redos, self.fails) = (0, 0, 0, 0)
+    (self.inclusive, self.exclusive) = (0.0, 0.0)
+    # The number of this predicate's frames that are running, i.e., on the Python stack.
+    self.active = 0
+
+  def as_dict(self) -> Dict[str, Any]:
+    return {'calls': self.calls, 'exits': self.exits, 'redos': self.redos, 'fails': self.fails,
+            'inclusive_seconds': self.inclusive, 'exclusive_seconds': self.exclusive}
+
+
+class Profiler:
+
+  # The columns report( ) can sort by.
+  sort_keys = ('calls', 'exits', 'redos', 'fails', 'inclusive', 'exclusive')
+
+  def __init__(self):
+    self.stats: Dict[str, PortStats] = {}
+    # One entry per running profiled frame: the time charged so far to the profiled frames it called.
+    # The bottom entry collects the time of the outermost frames.
+    self._child_times: List[float] = [0.0]
+    # (owner, name, original) for each attribute replaced by attach.
+    self._attached: List[Tuple[Any, str, Any]] = []
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, type, value, traceback):
+    self.detach( )
+
+  def attach(self, owner: Any, *names: str) -> 'Profiler':
+    """ Replace each owner.name by its profiled version until detach( ). Returns self for use in "with". """
+    owner_name = getattr(owner, '__name__', type(owner).__name__)
+    for name in names:
+      original = getattr(owner, name)
+      self._attached.append((owner, name, original))
+      setattr(owner, name, self.profile(original, name=f'{owner_name}.{name}'))
+    return self
+
+  def detach(self):
+    """ Restore everything attach replaced, most recent first. The statistics are kept. """
+    while self._attached:
+      (owner, name, original) = self._attached.pop( )
+      setattr(owner, name, original)
+
+  def profile(self, f: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Return a version of f that records its ports under name, by default f's qualified name.
+    f may be a generator function or any function that returns a generator, e.g., a trampolined one.
+    A call of f that returns anything else is counted as a call and an exit, or a fail if it raises.
+    """
+    stats = self.stats.setdefault(name or getattr(f, '__qualname__', repr(f)), PortStats( ))
+    child_times = self._child_times
+
+    @wraps(f)
+    def profiled(*args, **kwargs):
+      stats.calls += 1
+      child_times.append(0.0)
+      stats.active += 1
+      start = perf_counter( )
+      try:
+        result = f(*args, **kwargs)
+      except BaseException:
+        stats.fails += 1
+        raise
+      finally:
+        self._charge(stats, perf_counter( ) - start)
+      if isinstance(result, GeneratorType):
+        return self._run_ports(result, stats)
+      stats.exits += 1
+      return result
+
+    return profiled
+
+  def _charge(self, stats: PortStats, elapsed: float):
+    """ Charge elapsed to the frame that is finishing, and as child time to the frame that called it. """
+    child_times = self._child_times
+    stats.exclusive += elapsed - child_times.pop( )
+    stats.active -= 1
+    if not stats.active:
+      stats.inclusive += elapsed
+    child_times[-1] += elapsed
+
+  def _run_ports(self, gen: GeneratorType, stats: PortStats):
+    child_times = self._child_times
+    exited = False
+    try:
+      while True:
+        if exited:
+          stats.redos += 1
+        child_times.append(0.0)
+        stats.active += 1
+        start = perf_counter( )
+        try:
+          value = next(gen)
+        except StopIteration:
+          stats.fails += 1
+          return
+        finally:
+          self._charge(stats, perf_counter( ) - start)
+        # A subgoal for the trampoline is not a success. Resuming after it is not a redo.
+        exited = not isinstance(value, GeneratorType)
+        if exited:
+          stats.exits += 1
+        yield value
+    finally:
+      gen.close( )
+
+  def reset(self):
+    """ Zero all the statistics but keep the predicates, so wrapped functions keep reporting. """
+    for stats in self.stats.values( ):
+      stats.__init__( )
+
+  def sorted_stats(self, sort_by: str = 'exclusive') -> List[Tuple[str, PortStats]]:
+    """ (name, stats) pairs for the predicates that were called, largest sort_by first. """
+    if sort_by not in Profiler.sort_keys:
+      raise ValueError(f'sort_by must be one of {Profiler.sort_keys}, not {sort_by!r}')
+    called = [(name, stats) for (name, stats) in self.stats.items( ) if stats.calls]
+    return sorted(called, key=lambda name_stats: getattr(name_stats[1], sort_by), reverse=True)
+
+  def report(self, sort_by: str = 'exclusive', limit: Optional[int] = None) -> str:
+    """ A table of the predicates, largest sort_by first, with at most limit rows. """
+    rows = self.sorted_stats(sort_by)[:limit]
+    total = sum(stats.exclusive for stats in self.stats.values( )) or 1.0
+    width = max([len('predicate')] + [len(name) for (name, _) in rows])
+    lines = [f'{"predicate":<{width}} {"calls":>9} {"exits":>9} {"redos":>9} {"fails":>9} '
+             f'{"incl ms":>10} {"excl ms":>10} {"excl %":>7}']
+    for (name, stats) in rows:
+      lines.append(f'{name:<{width}} {stats.calls:>9} {stats.exits:>9} {stats.redos:>9} {stats.fails:>9} '
+                   f'{stats.inclusive * 1000:>10.2f} {stats.exclusive * 1000:>10.2f} '
+                   f'{100 * stats.exclusive / total:>6.1f}%')
+    return '\n'.join(lines)
+
+  def to_json(self, sort_by: str = 'exclusive') -> str:
+    return json.dumps({name: stats.as_dict( ) for (name, stats) in self.sorted_stats(sort_by)}, indent=2)
+
+  def dump(self, path: str, sort_by: str = 'exclusive'):
+    """ Write to_json( ) to path. """
+    with open(path, 'w') as file:
+      file.write(self.to_json(sort_by))
+
+
+if __name__ == '__main__':
+  # Which clues of the zebra puzzle dominate the search?
+  import examples.logic_puzzles.zebra_problem as zebra_problem
+  from examples.logic_puzzles.zebra_problem import ZebraProblem
+  from sequence_options.sequences import PyList
+
+  problem = ZebraProblem( )
+  problem.ListType = PyList
+  profiler = Profiler( )
+  profiler.attach(ZebraProblem, *[f'clue_{i}' for i in range(16)])
+  with profiler.attach(zebra_problem, 'is_contiguous_in', 'member', 'members', 'next_to', 'unify'):
+    for _ in problem.run_all_clues( ):
+      pass
+  print(profiler.report( ))
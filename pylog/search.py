@@ -0,0 +1,224 @@
+from itertools import count
+from random import Random
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from control_structures import trampolined
+from finite_domains import FDVar, propagation_queue
+from logic_variables import trail
+
+"""
+Search over finite-domain variables with pluggable heuristics.
+
+label(Xs, var_order, value_order) is labeling( ) with two choices made at every step: which unbound
+variable to label next, and in what order to try its values. Each value tried is propagated, and each
+success binds all of Xs.
+
+Variable orders. The variable with the smallest key is labeled next.
+  input_order       the first unbound variable in Xs
+  first_fail        the smallest domain
+  most_constrained  the smallest domain, then the most propagators
+  dom/wdeg          the smallest domain size divided by the weighted degree: the summed weights of the
+                    variable's propagators that still constrain some other unbound variable. A propagator's
+                    weight goes up each time it fails, so the search turns to the variables of the
+                    constraints that keep failing.
+Value orders.
+  min, max          increasing or decreasing values
+  median            the middle value first, then outward
+  random            a random order
+Either may also be a function. A variable order maps an FDVar to its key. A value order maps an FDVar
+and the rng to its values in the order to try them.
+
+tie_break says which of the variables with the smallest key is labeled: the 'first' in Xs, or a 'random'
+one. rng, a random.Random, makes the random choices repeatable.
+
+A randomized search can take far longer on some runs than on others. restarts( ) cuts each run off after
+a number of fails or seconds and starts a new one, with cutoffs that grow by the Luby sequence or
+geometrically. A search cooperates by calling stop( ) at its choice points and giving up when it is True,
+as label does.
+"""
+
+
+def dom_over_wdeg(X: FDVar) -> float:
+  wdeg = sum(propagator.weight for propagator in X.propagators
+             if any(Y is not X and Y.size( ) > 1 for Y in propagator.variables))
+  return X.size( ) / wdeg if wdeg else float('inf')
+
+
+VAR_ORDERS: Dict[str, Optional[Callable[[FDVar], Any]]] = {
+  'input_order':      None,
+  'first_fail':       lambda X: X.size( ),
+  'most_constrained': lambda X: (X.size( ), -len(X.propagators)),
+  'dom/wdeg':         dom_over_wdeg,
+  }
+
+
+def median_first(X: FDVar, _: Random) -> List[int]:
+  values = X.values( )
+  middle = (len(values) - 1) // 2
+  return [value for (_, value) in sorted(enumerate(values), key=lambda i_value: abs(i_value[0] - middle))]
+
+
+VALUE_ORDERS: Dict[str, Callable[[FDVar, Random], List[int]]] = {
+  'min':    lambda X, _: X.values( ),
+  'max':    lambda X, _: X.values( )[::-1],
+  'median': median_first,
+  'random': lambda X, rng: rng.sample(X.values( ), X.size( )),
+  }
+
+
+def _strategy(name_or_function: Union[str, Callable], strategies: Dict[str, Any], kind: str) -> Any:
+  if callable(name_or_function):
+    return name_or_function
+  if name_or_function not in strategies:
+    raise ValueError(f'{kind} must be a function or one of {tuple(strategies)}, not {name_or_function!r}')
+  return strategies[name_or_function]
+
+
+def label(Xs: Sequence[Any], var_order: Union[str, Callable] = 'input_order',
+          value_order: Union[str, Callable] = 'min', tie_break: str = 'first',
+          rng: Optional[Random] = None, stop: Optional[Callable[[], bool]] = None) -> Iterator[None]:
+  """
+  Label Xs with the given heuristics. Succeed once for each assignment of values to all of them.
+  If stop is given, the search gives up, as if it had run out of values, once stop( ) is True.
+  """
+  key = _strategy(var_order, VAR_ORDERS, 'var_order')
+  order_values = _strategy(value_order, VALUE_ORDERS, 'value_order')
+  if tie_break not in ('first', 'random'):
+    raise ValueError(f"tie_break must be 'first' or 'random', not {tie_break!r}")
+  rng = rng or Random( )
+
+  def select(Xs: List[Any]) -> Optional[FDVar]:
+    """ The next variable to label, or None if all of Xs are bound. """
+    unbound = [X for X in (X.unification_chain_end( ) for X in Xs) if isinstance(X, FDVar)]
+    if not unbound or key is None:
+      return unbound[0] if unbound else None
+    keys = [key(X) for X in unbound]
+    smallest = min(keys)
+    if tie_break == 'first':
+      return unbound[keys.index(smallest)]
+    return rng.choice([X for (X, X_key) in zip(unbound, keys) if X_key == smallest])
+
+  return _label(list(Xs), select, lambda X: order_values(X, rng), stop or (lambda: False))
+
+
+@trampolined
+def _label(Xs: List[Any], select: Callable[[List[Any]], Optional[FDVar]], order_values: Callable[[FDVar], List[int]],
+           stop: Callable[[], bool]):
+  X = select(Xs)
+  if X is None:
+    yield
+  else:
+    for value in order_values(X):
+      if stop( ):
+        return
+      mark = trail.mark( )
+      if X.assign(value) and propagation_queue.propagate( ):
+        yield _label.goal(Xs, select, order_values, stop)
+      trail.undo_to(mark)
+
+
+def luby(unit: float = 1) -> Iterator[float]:
+  """ unit times the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ... """
+  for i in count(1):
+    # If i is 2**k - 1, the term is 2**(k-1). Otherwise it repeats the term at i less the largest such 2**(k-1) - 1.
+    while (i + 1) & i:
+      i -= (1 << (i.bit_length( ) - 1)) - 1
+    yield unit * ((i + 1) // 2)
+
+
+def geometric(first: float = 1, factor: float = 2) -> Iterator[float]:
+  """ first, first * factor, first * factor**2, ... """
+  cutoff = first
+  while True:
+    yield cutoff
+    cutoff *= factor
+
+
+class RestartStats:
+  """ What restarts( ) did: for each run, its cutoff (None for the last, uncut run), fails, seconds and solutions. """
+
+  __slots__ = ('runs', )
+
+  def __init__(self):
+    self.runs: List[Tuple[Optional[float], int, float, int]] = []
+
+  @property
+  def restarts(self) -> int:
+    return max(len(self.runs) - 1, 0)
+
+  @property
+  def fails(self) -> int:
+    return sum(fails for (_, fails, _, _) in self.runs)
+
+  @property
+  def seconds(self) -> float:
+    return sum(seconds for (_, _, seconds, _) in self.runs)
+
+  def __str__(self):
+    return f'{self.restarts} restarts, {self.fails} fails, {round(self.seconds, 3)} sec'
+
+
+def restarts(search: Callable[[Callable[[], bool]], Iterable], cutoffs: Optional[Iterable[float]] = None,
+             measure: str = 'fails', stats: Optional[RestartStats] = None) -> Iterator[Any]:
+  """
+  Run search(stop) again and again, each time until stop( ) is True, passing on what it yields.
+
+  stop( ) becomes True when the run has used up its cutoff: the next of cutoffs, counted in fails
+  (backtracks on the trail) or seconds, as measure says. Each solution gives the run its whole cutoff
+  again. When a run ends without being stopped, its search space is exhausted, and so is restarts( ).
+  If cutoffs runs out, the last run has no cutoff. So islice(luby( ), 10) makes 10 runs at most and then
+  a complete search. By default, cutoffs is luby(100).
+
+  Each run's bindings are undone before the next starts. Everything that is not on the trail carries over
+  from run to run: the weights dom/wdeg learns, or the state of an rng. A randomized search will then
+  go differently each time. A solution may be found again after a restart.
+  """
+  if measure not in ('fails', 'seconds'):
+    raise ValueError(f"measure must be 'fails' or 'seconds', not {measure!r}")
+  stats = RestartStats( ) if stats is None else stats
+  # A new sequence for each call. A default of luby(100) would be one generator shared by every call.
+  cutoffs = iter(luby(100) if cutoffs is None else cutoffs)
+  while True:
+    cutoff = next(cutoffs, None)
+    (start_time, start_fails) = (perf_counter( ), trail.backtracks)
+    # How much of the cutoff the run had spent at its last solution, whether stop( ) has said True,
+    # and the solutions so far.
+    (spent_at_solution, cut, solutions) = (0, False, 0)
+
+    def spent( ) -> float:
+      return trail.backtracks - start_fails if measure == 'fails' else perf_counter( ) - start_time
+
+    def stop( ) -> bool:
+      nonlocal cut
+      cut = cut or cutoff is not None and spent( ) - spent_at_solution >= cutoff
+      return cut
+
+    mark = trail.mark( )
+    try:
+      for solution in search(stop):
+        solutions += 1
+        yield solution
+        spent_at_solution = spent( )
+    finally:
+      trail.undo_to(mark)
+      stats.runs.append((cutoff, trail.backtracks - start_fails, perf_counter( ) - start_time, solutions))
+    if not cut:
+      return
+
+
+if __name__ == '__main__':
+  from examples.n_queens.n_queens import layout
+  from examples.n_queens.n_queens_fd import queens_constraints
+  from finite_domains import post
+
+  # The first solution for 40 queens under each variable order but input_order, which takes minutes.
+  for var_order in ['first_fail', 'most_constrained', 'dom/wdeg']:
+    Queens = [FDVar(range(40)) for _ in range(40)]
+    backtracks = trail.backtracks
+    for _ in post(*queens_constraints(Queens)):
+      for _ in label(Queens, var_order, 'median', tie_break='random', rng=Random(0)):
+        print(f'{var_order}: {trail.backtracks - backtracks} backtracks')
+        if var_order == 'dom/wdeg':
+          print(layout([Q.get_py_value( ) for Q in Queens], 40))
+        break
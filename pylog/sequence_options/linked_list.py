@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Any, List, Optional, Tuple, Union
 
+from control_structures import trampolined
 from logic_variables import ensure_is_logic_variable, euc, PyValue, n_Vars, Term, unify, unify_pairs, Var
 from sequence_options.super_sequence import is_a_subsequence_of,  member, SuperSequence
 
@@ -16,6 +17,9 @@ class LinkedList(SuperSequence):
   When used as a constructor, the argument must be either a Python list or a (Head, Tail) tuple.
   In the second case, Tail must be a LinkedList or a Var.
   """
+
+  __slots__ = ()
+
   def __init__(self, list_or_tuple: Union[list, str, Term, tuple], tail: Optional[Term] = None ):
     # args will either have two elements or none -- if we are creating an empty list.
     if tail is None:
@@ -63,7 +67,13 @@ class LinkedList(SuperSequence):
     :return: (nested) args for a LinkedList, i.e, (head, tail) of pylist.
     """
     # return ( ) if not pyList else ( Term.ensure_is_logic_variable(pyList[0]), LinkedList(pyList[1:]) )
-    return ( ) if not pyList else ( ensure_is_logic_variable(pyList[0]), LinkedList(pyList[1:]) )
+    if not pyList:
+      return ( )
+    # Build the tail from the end, so that long lists need neither recursion nor slices.
+    tail = LinkedList([])
+    for element in pyList[:0:-1]:
+      tail = LinkedList(element, tail)
+    return ( ensure_is_logic_variable(pyList[0]), tail )
 
   def get_py_value(self):
     args_list = self.to_python_list()
@@ -94,15 +104,15 @@ class LinkedList(SuperSequence):
 
   def prefix_and_tail(self) -> Tuple[List[Term], Any]:
     """ Get the initial list of objects and either the tail if it is a Var or [] if it is not a Var. """
-    if self.is_empty():
-      return ([], [])
-    else:
-      Tail_EoT = self.tail().unification_chain_end()
-      if isinstance(Tail_EoT, LinkedList):
-        (tail_prefix, Tail_Tail) = Tail_EoT.prefix_and_tail( )
-        return ([self.head()] + tail_prefix, Tail_Tail)
-      else:
-        return ([self.head()], Tail_EoT)
+    # Walk down the list iteratively rather than recursing on the tail.
+    (prefix, Rest) = ([], self)
+    while not Rest.is_empty():
+      prefix.append(Rest.head())
+      Tail_EoT = Rest.tail().unification_chain_end()
+      if not isinstance(Tail_EoT, LinkedList):
+        return (prefix, Tail_EoT)
+      Rest = Tail_EoT
+    return (prefix, [])
 
   def tail(self) -> Union[LinkedList, Var]:
     return self.args[1]
@@ -115,6 +125,7 @@ class LinkedList(SuperSequence):
 emptyLinkedList = LinkedList([])
 
 
+@trampolined
 @euc
 def append(Xs: Union[LinkedList, Var], Ys: Union[LinkedList, Var], Zs: Union[LinkedList, Var]):
   """
@@ -149,6 +160,9 @@ def append(Xs: Union[LinkedList, Var], Ys: Union[LinkedList, Var], Zs: Union[Lin
   Xs or Zs is empty, unify_pairs will fail.
 
   The actual code is quite short. It's very similar to the prolog code.
+
+  The recursive call is a tail call. It runs on the same trampoline (see control_structures.trampoline),
+  so append works on lists of any length, and each further solution costs the same at any depth.
   """
 
   # Corresponds to append([], Ys, Ys).
@@ -158,7 +172,7 @@ def append(Xs: Union[LinkedList, Var], Ys: Union[LinkedList, Var], Zs: Union[Lin
   (XZ_Head, Xs_Tail, Zs_Tail) = n_Vars(3)
   for _ in unify_pairs([(Xs, LinkedList(XZ_Head, Xs_Tail)),
                         (Zs, LinkedList(XZ_Head, Zs_Tail))]):
-    yield from append(Xs_Tail, Ys, Zs_Tail)
+    yield append.goal(Xs_Tail, Ys, Zs_Tail)
 
 
 if __name__ == '__main__':
@@ -11,6 +11,9 @@ class PySequence(SuperSequence):
   The self.args are the list/tuple elements. Their length is fixed. (This disallows
   appending elements to a list or extending a list.)
   """
+
+  __slots__ = ()
+
   def __init__(self, pyType, initialElements: Union[list, set, tuple]):
     super().__init__( (pyType, *initialElements) )
 
@@ -67,16 +70,22 @@ class PySequence(SuperSequence):
 
 
 class PyList(PySequence):
+  __slots__ = ()
+
   def __init__(self, initialElements: list):
     super().__init__( list, initialElements )
 
 
 class PyTuple(PySequence):
+  __slots__ = ()
+
   def __init__(self, initialElements: tuple):
     super( ).__init__( tuple, initialElements )
 
 
 class PySet(PySequence):
+  __slots__ = ()
+
   def __init__(self, initialElements: Union[list, set, tuple]):
     """ Doesn't check to see whether initialElements is really a set. """
     super( ).__init__( set, tuple(initialElements) )
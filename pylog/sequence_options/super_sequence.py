@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import List, Union
 
-from control_structures import forany, forall
+from control_structures import forany, trampolined
 from logic_variables import euc, Structure, unify, Term, Var
 
 
@@ -11,6 +11,8 @@ class SuperSequence(Structure):
   Declares a number of abstract methods.
   """
 
+  __slots__ = ()
+
   def __getitem__(self, key: Union[int, slice]) -> Union[SuperSequence, Term]:
       pass
 
@@ -42,6 +44,7 @@ def is_contiguous_in(As: List, Zs: SuperSequence):
   yield from Zs.has_contiguous_sublist(As)
 
 
+@trampolined
 @euc
 def is_a_subsequence_of(As: List, Zs: SuperSequence):
   """
@@ -56,16 +59,14 @@ def is_a_subsequence_of(As: List, Zs: SuperSequence):
     return
 
   else:
-    for _ in forany([
-                     # Match As[0] and Zs[0]; go on to is_a_subsequence_of(As[1:], Zs[1:])
-                     lambda: forall([lambda: unify(As[0], Zs[0]),
-                                     lambda: is_a_subsequence_of(As[1:], Zs[1:])]),
-                     # Whether or not we matched As[0] and Zs[0] above, try is_a_subsequence_of(As, Zs[1:])
-                     lambda: is_a_subsequence_of(As, Zs[1:])
-                     ]):
-      yield
+    # Match As[0] and Zs[0]; go on to is_a_subsequence_of(As[1:], Zs[1:])
+    for _ in unify(As[0], Zs[0]):
+      yield is_a_subsequence_of.goal(As[1:], Zs[1:])
+    # Whether or not we matched As[0] and Zs[0] above, try is_a_subsequence_of(As, Zs[1:])
+    yield is_a_subsequence_of.goal(As, Zs[1:])
 
 
+@trampolined
 @euc
 def member(E: Term, A_List: Union[List, SuperSequence, Var]):
   """
@@ -97,10 +98,12 @@ def member(E: Term, A_List: Union[List, SuperSequence, Var]):
   # Instead use type(A_List), which will be LinkedList if A_List_Tail is a Var.
   A_List_New_Tail = type(A_List)((Var( ), Var( ))) if isinstance(A_List_Tail, Var) else A_List_Tail
   # If A_List_New_Tail is A_List_Tail, this unify does nothing.
+  # The recursive call is a tail call. Run it on the same trampoline.
   for _ in unify(A_List_New_Tail, A_List_Tail):
-    yield from member(E, A_List_New_Tail)
+    yield member.goal(E, A_List_New_Tail)
 
 
+@trampolined
 @euc
 def members(Es: List, A_List: SuperSequence):
   """ Do all elements of es appear in A_List (in any order). """
@@ -109,7 +112,7 @@ def members(Es: List, A_List: SuperSequence):
     yield
   else:
     for _ in member(Es[0], A_List):
-      yield from members(Es[1:], A_List)
+      yield members.goal(Es[1:], A_List)
 
 
 def next_to(E1: Term, E2: Term, Es: SuperSequence):
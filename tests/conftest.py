@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The pylog modules import one another as top-level modules, e.g., "from logic_variables import Var".
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pylog'))
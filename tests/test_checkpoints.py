@@ -0,0 +1,49 @@
+from itertools import count
+
+from checkpoints import Checkpoint, load_checkpoint, resumable_solutions
+from control_structures import trampoline
+
+from examples.n_queens import n_queens_cp
+
+
+class Crash(Exception):
+  pass
+
+
+def test_a_search_resumed_after_each_crash_finds_the_same_solutions(tmp_path):
+  (goal, answer) = n_queens_cp.queens_problem(8, 3)
+  expected = [answer( ) for _ in trampoline(goal)]
+  assert len(set(map(tuple, expected))) == len(expected) == 92
+
+  def crashing_problem(board_size, seed):
+    """ The search, with a crash in its answer function every 6th call: as an answer is found
+    and checkpointed, and as the search checkpoints every 50 alternatives. """
+    (goal, answer) = n_queens_cp.queens_problem(board_size, seed)
+    calls = count(1)
+
+    def crashing_answer( ):
+      if next(calls) % 6 == 0:
+        raise Crash( )
+      return answer( )
+
+    return (goal, crashing_answer)
+
+  (found, crashes) = ([], 0)
+  while True:
+    try:
+      found += resumable_solutions(crashing_problem, (8, 3), str(tmp_path / 'checkpoint'), 50)
+      break
+    except Crash:
+      crashes += 1
+  assert crashes > 1 and found == expected
+  checkpoint = load_checkpoint(str(tmp_path / 'checkpoint'))
+  assert checkpoint.done( ) and checkpoint.solutions == 92
+
+
+def test_a_checkpoint_is_where_the_search_stopped():
+  checkpoint = Checkpoint([(( ), 0)])
+  expected = list(resumable_solutions(n_queens_cp.queens_problem, (6, 1), checkpoint=Checkpoint([(( ), 0)])))
+  first = [answer for (_, answer) in zip(range(2), resumable_solutions(n_queens_cp.queens_problem, (6, 1),
+                                                                       checkpoint=checkpoint))]
+  assert checkpoint.bindings == first[-1] and checkpoint.solutions == 2
+  assert first + list(resumable_solutions(n_queens_cp.queens_problem, (6, 1), checkpoint=checkpoint)) == expected
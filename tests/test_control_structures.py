@@ -0,0 +1,85 @@
+from control_structures import ChoiceTrampoline, choice_paths, findall, follow_path, solve, trace, Trace
+from logic_variables import trail, Var
+from sequence_options.linked_list import append, LinkedList
+from sequence_options.super_sequence import member
+
+
+def test_solve_returns_snapshots():
+  (Xs, Ys) = (Var( ), Var( ))
+  assert solve(append(Xs, Ys, LinkedList([1, 2])), Xs, Ys) == [([], [1, 2]), ([1], [2]), ([1, 2], [])]
+  assert not Xs.is_instantiated( ) and not Ys.is_instantiated( )
+
+
+def test_solve_limit_and_count_only_leave_vars_unbound():
+  (Xs, Ys) = (Var( ), Var( ))
+  assert solve(append(Xs, Ys, LinkedList([1, 2, 3])), Xs, limit=2) == [([], ), ([1], )]
+  assert not Xs.is_instantiated( )
+  assert solve(append(Xs, Ys, LinkedList([1, 2, 3])), count_only=True) == 4
+
+
+def test_findall():
+  E = Var( )
+  assert findall(E, member(E, LinkedList(['a', 'b']))) == ['a', 'b']
+
+
+def test_trace_keyword_arguments_and_switch(capsys):
+  @Trace
+  def countdown(n, step=1):
+    if n > 0:
+      yield from countdown(n - step, step=step)
+    yield n
+
+  assert list(countdown(2, step=1)) == [0, 1, 2]
+  assert capsys.readouterr( ).out.splitlines( ) == ['n: 2, step: 1', '  n: 1, step: 1', '    n: 0, step: 1 <=']
+  Trace.trace = False
+  try:
+    assert list(countdown(2)) == [0, 1, 2]
+  finally:
+    Trace.trace = True
+  assert capsys.readouterr( ).out == ''
+
+
+def test_lazy_trace_message(capsys):
+  assert list(trace(lambda: 1 / 0, show_trace=False)) == [None]
+  assert list(trace(lambda: 'shown')) == [None]
+  assert capsys.readouterr( ).out == 'shown\n'
+
+
+def test_choice_paths_split_a_search_in_order():
+  def goal( ):
+    (Xs, Ys) = (Var( ), Var( ))
+    return (append.goal(Xs, Ys, LinkedList([1, 2, 3, 4])), Xs)
+
+  (whole, Xs) = goal( )
+  expected = solve(whole, Xs)
+  for depth in range(1, 5):
+    found = []
+    for path in choice_paths(goal( )[0], depth):
+      (part, Xs) = goal( )
+      found += [Xs.get_py_value( ) for _ in follow_path(part, path)]
+    assert [(Xs, ) for Xs in found] == expected
+  assert len(trail) == 0
+
+
+def test_a_choice_trampoline_gives_away_and_lists_the_rest_of_its_search():
+  def goal( ):
+    (Xs, Ys) = (Var( ), Var( ))
+    return (append.goal(Xs, Ys, LinkedList([1, 2, 3, 4])), Xs)
+
+  def search(path, first):
+    (part, Xs) = goal( )
+    return [Xs.get_py_value( ) for _ in follow_path(part, path, first)]
+
+  expected = search(( ), 0)
+  (whole, Xs) = goal( )
+  trampoline = ChoiceTrampoline(whole)
+  (found, given_away) = ([], [])
+  for _ in trampoline:
+    found.append(Xs.get_py_value( ))
+    if len(found) == 2:
+      given_away.append(trampoline.split( ))
+      frontier = trampoline.frontier( )
+  # What was given away is searched elsewhere; what is left on the frontier is searched here.
+  assert found == expected[:2] + [Xs for subproblem in frontier for Xs in search(*subproblem)]
+  assert sorted(found + [Xs for subproblem in given_away for Xs in search(*subproblem)]) == sorted(expected)
+  assert len(trail) == 0
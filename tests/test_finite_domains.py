@@ -0,0 +1,85 @@
+from control_structures import solve
+from finite_domains import Distance, FDVar, labeling, Linear, linear, NotEqual, Offset, post, post_on_trail, Precedes
+from logic_variables import PyValue, trail, unify, Var
+
+
+def test_propagation_is_undone_on_backup():
+  (X, Y) = (FDVar(range(3)), FDVar(range(3)))
+  mark = trail.mark( )
+  for _ in post(NotEqual(X, Y)):
+    for _ in unify(X, 1):
+      assert X.get_py_value( ) == 1 and Y.values( ) == [0, 2]
+    assert not X.is_instantiated( ) and Y.values( ) == [0, 1, 2]
+  assert X.propagators == ( ) and trail.mark( ) == mark
+
+
+def test_singleton_domain_binds_and_values_outside_the_domain_fail():
+  (X, Y) = (FDVar([1, 2]), FDVar([2]))
+  assert Y.is_instantiated( ) and Y == PyValue(2)
+  for _ in post(NotEqual(X, Y)):
+    assert X.is_instantiated( ) and X.get_py_value( ) == 1
+    assert list(unify(X, 2)) == []
+
+
+def test_unifying_fd_vars_intersects_their_domains():
+  (X, Y, Z) = (FDVar(range(5)), FDVar(range(3, 8)), Var( ))
+  for _ in unify(Z, X):
+    for _ in unify(X, Y):
+      assert Z.unification_chain_end( ) is not Z
+      assert solve(labeling([X]), X, Y, Z) == [(3, 3, 3), (4, 4, 4)]
+
+
+def test_labeling_with_all_different_columns_and_diagonals():
+  Queens = [FDVar(range(6)) for _ in range(6)]
+  constraints = [NotEqual(Queens[i], Queens[j], offset)
+                 for i in range(6) for j in range(i + 1, 6) for offset in (0, j - i, i - j)]
+  for _ in post(*constraints):
+    assert len(solve(labeling(Queens), *Queens)) == 4
+
+
+def test_bitset_domain_operations():
+  X = FDVar([-2, 0, 3, 5])
+  assert (X.size( ), X.min( ), X.max( ), X.values( )) == (4, -2, 5, [-2, 0, 3, 5])
+  assert X.contains(3) and not X.contains(1) and not X.contains(-3) and not X.contains('a')
+  mark = trail.mark( )
+  assert X.set_min(-1) and X.set_max(4) and X.values( ) == [0, 3]
+  assert X.remove(0) and X.get_py_value( ) == 3
+  assert not X.remove(3)
+  trail.undo_to(mark)
+  assert X.values( ) == [-2, 0, 3, 5] and not X.is_instantiated( )
+  # Domains with different offsets line up when intersected.
+  Y = FDVar(range(3, 10))
+  for _ in unify(X, Y):
+    assert X.values( ) == Y.values( ) == [3, 5]
+
+
+def test_offset_distance_and_precedes_keep_the_supported_values():
+  cases = [(Offset, 2, lambda x, y: y == x + 2), (Distance, 1, lambda x, y: abs(x - y) == 1),
+           (Precedes, 2, lambda x, y: x + 2 <= y)]
+  for (Constraint, k, holds) in cases:
+    for (xs, ys) in [(range(5), [0, 3, 4]), ([1, 6], range(3, 9)), ([4], [0, 1])]:
+      (X, Y) = (FDVar(xs), FDVar(ys))
+      pairs = [(x, y) for x in xs for y in ys if holds(x, y)]
+      mark = trail.mark( )
+      assert post_on_trail(Constraint(X, Y, k)) == bool(pairs)
+      if pairs and Constraint is not Precedes:
+        assert (set(X.values( )), set(Y.values( ))) == ({x for (x, _) in pairs}, {y for (_, y) in pairs})
+      elif pairs:
+        # Bounds consistency only.
+        assert (X.max( ), Y.min( )) == (max(x for (x, _) in pairs), min(y for (_, y) in pairs))
+      trail.undo_to(mark)
+
+
+def test_linear_bounds_and_solutions():
+  (X, Y, Z) = (FDVar(range(10)), FDVar(range(10)), FDVar(range(10)))
+  # 2X + 3Y - Z == 20, with the constant 4 folded in from an int.
+  for _ in linear([2, 3, -1, 1], [X, Y, Z, 4], '==', 24):
+    assert (Y.min( ), X.max( )) == (1, 9)
+    solutions = {(x, y, z) for _ in labeling([X, Y, Z])
+                 for (x, y, z) in [(X.get_py_value( ), Y.get_py_value( ), Z.get_py_value( ))]}
+    assert solutions == {(x, y, z) for x in range(10) for y in range(10) for z in range(10) if 2*x + 3*y - z == 20}
+  # Coefficients far beyond machine ints.
+  big = 10 ** 30
+  for _ in linear([big, -big], [X, Y], '>=', 8 * big):
+    assert (X.values( ), Y.values( )) == ([8, 9], [0, 1])
+  assert list(post(Linear([1, 1], [X, Y], '<=', -1))) == []
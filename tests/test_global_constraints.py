@@ -0,0 +1,87 @@
+import itertools
+import random
+
+from finite_domains import Codebook, FDVar, labeling, post, post_on_trail
+from global_constraints import (all_different, AllDifferent, contiguous_constraints, item_table, member_tables,
+                                next_to_constraints, subsequence_constraints, table)
+from logic_variables import StructureItem, trail, unify, Var
+
+
+def test_all_different_domain_consistency_matches_brute_force():
+  rng = random.Random(14)
+  for _ in range(200):
+    domains = [rng.sample(range(8), rng.randint(1, 5)) for _ in range(rng.randint(2, 6))]
+    solutions = [values for values in itertools.product(*domains) if len(set(values)) == len(values)]
+    Xs = [FDVar(domain) for domain in domains]
+    mark = trail.mark( )
+    assert post_on_trail(AllDifferent(Xs)) == bool(solutions)
+    if solutions:
+      # Exactly the values that occur in some solution are left.
+      assert [set(X.values( )) for X in Xs] == [{values[i] for values in solutions} for i in range(len(Xs))]
+    trail.undo_to(mark)
+
+
+def test_all_different_bounds_consistency():
+  (X, Y, Z) = (FDVar([1, 2]), FDVar([1, 2]), FDVar(range(1, 5)))
+  for _ in all_different([X, Y, Z], consistency='bounds'):
+    assert Z.values( ) == [3, 4]
+  # Three variables in an interval of two values.
+  assert list(all_different([X, Y, FDVar([1, 2])], consistency='bounds')) == []
+
+
+def test_table_keeps_only_supported_values_and_restores_on_backup():
+  (X, Y) = (FDVar(range(4)), FDVar(range(4)))
+  for _ in table([X, Y], [(0, 1), (1, 2), (3, 3), (5, 0)]):
+    assert (X.values( ), Y.values( )) == ([0, 1, 3], [1, 2, 3])
+    for _ in unify(Y, 3):
+      assert X.get_py_value( ) == 3
+    assert (X.values( ), Y.values( )) == ([0, 1, 3], [1, 2, 3])
+  assert list(table([X, Y], [(0, 0), (4, 1)])) == [None]
+  assert list(table([X, Y], [(4, 1)])) == []
+
+
+def test_tables_from_structure_items():
+  codebook = Codebook(['red', 'green', 'English', 'Spanish'])
+  Rows = [Item(FDVar(codebook.codes(['English', 'Spanish'])), FDVar(codebook.codes(['red', 'green'])))
+          for _ in range(2)]
+  # The English live in the red house.
+  for _ in post(*member_tables(Item('English', 'red'), Rows, codebook)):
+    for _ in unify(Rows[0].args[0], codebook.code('Spanish')):
+      assert codebook.decode(Rows[0].args[1].get_py_value( )) == 'green'
+  # A relation listed by ground Items. The Template's value filters its rows.
+  relation = [Item('English', 'red'), Item('Spanish', 'red'), Item('Spanish', 'green')]
+  (Nationality, Color) = (FDVar(codebook.codes(['English', 'Spanish'])), FDVar(codebook.codes(['red', 'green'])))
+  for _ in post(item_table(Item(Nationality, 'red'), relation, codebook)):
+    assert Nationality.values( ) == codebook.codes(['English', 'Spanish'])
+  for _ in post(item_table(Item(Nationality, Color), relation, codebook)):
+    for _ in unify(Color, codebook.code('green')):
+      assert codebook.decode(Nationality.get_py_value( )) == 'Spanish'
+
+
+def test_positional_constraints_match_brute_force():
+  (nationalities, colors) = (['English', 'Spanish', 'Greek', 'Dutch'], ['red', 'green', 'blue', 'white'])
+  codebook = Codebook(nationalities + colors)
+
+  def solutions(constraints_of, holds):
+    Rows = [Item(FDVar(codebook.codes(nationalities)), FDVar(codebook.codes(colors))) for _ in range(4)]
+    constraints = [AllDifferent([Row.args[i] for Row in Rows]) for i in range(2)] + constraints_of(Rows)
+    found = {tuple(codebook.decode(arg.get_py_value( )) for Row in Rows for arg in Row.args)
+             for _ in post(*constraints) for _ in labeling([arg for Row in Rows for arg in Row.args])}
+    expected = {tuple(value for pair in zip(ns, cs) for value in pair)
+                for ns in itertools.permutations(nationalities) for cs in itertools.permutations(colors)
+                if holds(ns, cs)}
+    assert found == expected
+
+  solutions(lambda Rows: next_to_constraints(Item('English'), Item(color='red'), Rows, codebook),
+            lambda ns, cs: abs(ns.index('English') - cs.index('red')) == 1)
+  solutions(lambda Rows: contiguous_constraints([Item('Greek'), Var( ), Item(color='blue')], Rows, codebook),
+            lambda ns, cs: cs.index('blue') == ns.index('Greek') + 2)
+  solutions(lambda Rows: subsequence_constraints([Item(color='white'), Item('Dutch', 'green')], Rows, codebook),
+            lambda ns, cs: cs.index('white') < ns.index('Dutch') == cs.index('green'))
+
+
+class Item(StructureItem):
+  __slots__ = ()
+
+  def __init__(self, nationality=None, color=None):
+    super( ).__init__( (nationality, color) )
@@ -0,0 +1,100 @@
+from logic_variables import copy_term, PyValue, Structure, trail, unify, unify_on_trail, unify_pairs, unify_sequences, Var
+from sequence_options.linked_list import LinkedList
+
+from examples.logic_puzzles.zebra_problem import House
+
+
+def test_unify_binds_and_undoes():
+  (A, B) = (Var( ), Var( ))
+  for _ in unify(A, B):
+    for _ in unify(B, 'abc'):
+      assert A.get_py_value( ) == 'abc'
+    assert not A.is_instantiated( )
+  assert A.unification_chain_end( ) is A
+
+
+def test_failed_unify_leaves_trail_unchanged():
+  (X, Y) = (Var( ), Var( ))
+  mark = trail.mark( )
+  T1 = Structure( ('t', X, 1, 2) )
+  T2 = Structure( ('t', 'a', Y, 3) )
+  assert not any(True for _ in unify(T1, T2))
+  assert trail.mark( ) == mark
+  assert not X.is_instantiated( ) and not Y.is_instantiated( )
+
+
+def test_unify_on_trail_rolls_back_to_mark():
+  (X, Y, Z) = (Var( ), Var( ), PyValue( ))
+  mark = trail.mark( )
+  assert unify_on_trail(Structure( ('f', X, Y, Z) ), Structure( ('f', 1, X, 2) ))
+  assert (X.get_py_value( ), Y.get_py_value( ), Z.get_py_value( )) == (1, 1, 2)
+  trail.undo_to(mark)
+  assert (X.is_instantiated( ), Y.is_instantiated( ), Z.is_instantiated( )) == (False, False, False)
+
+
+def test_unify_pairs_backtracks_in_order():
+  (B, C) = (Var( ), Var( ))
+  results = [(B.get_py_value( ), C.get_py_value( )) for _ in unify_pairs([('abc', B), (B, C)])]
+  assert results == [('abc', 'abc')]
+  assert not B.is_instantiated( ) and not C.is_instantiated( )
+
+
+def test_uninstantiated_py_values_do_not_unify():
+  assert not any(True for _ in unify(PyValue( ), PyValue( )))
+
+
+def test_long_chains_are_compressed_and_restored():
+  Vs = [Var( ) for _ in range(5000)]
+  mark = trail.mark( )
+  for (V1, V2) in zip(Vs, Vs[1:]):
+    assert unify_on_trail(V1, V2)
+  assert unify_on_trail(Vs[-1], 'end')
+  assert all(V.get_py_value( ) == 'end' for V in Vs)
+  trail.undo_to(mark)
+  assert all(V.unification_chain_next is None and V.rank == 0 for V in Vs)
+
+
+def test_constants_share_interned_py_values():
+  assert Structure( ('f', 'red', 1) ).args[0] is Structure( ('g', 'red') ).args[0]
+  assert Structure( ('f', True) ).args[0] is not Structure( ('f', 1) ).args[0]
+
+
+def test_groundness_is_cached_and_restored_on_backup():
+  assert Structure( ('f', 1, Structure( ('g', 'a') )) )._ground
+  X = Var( )
+  T = Structure( ('f', 1, Structure( ('g', X) )) )
+  assert not T.is_instantiated( )
+  for _ in unify(X, 'a'):
+    assert T.is_instantiated( ) and T._ground and T.args[1]._ground
+  assert not T._ground and not T.is_instantiated( )
+
+
+def test_unify_sequences_handles_long_sequences():
+  Xs = [Var( ) for _ in range(5000)]
+  for _ in unify_sequences(Xs, list(range(5000))):
+    assert [X.get_py_value( ) for X in Xs[-3:]] == [4997, 4998, 4999]
+  assert not any(X.is_instantiated( ) for X in Xs)
+  assert not any(True for _ in unify_sequences(Xs, range(4999)))
+
+
+def test_copy_term_and_templates_make_fresh_copies():
+  X = Var( )
+  Ground = Structure( ('h', 2) )
+  T = Structure( ('f', X, Structure( ('g', X, PyValue( )) ), Ground) )
+  Copy = copy_term(T)
+  assert str(Copy).count(f'_{Copy.args[0].term_id}') == 2 and Copy.args[0] is not X
+  assert Copy.args[2] is Ground and not Copy.args[1].args[1].is_instantiated( )
+  for _ in unify(Copy, Structure( ('f', 1, Structure( ('g', 1, 'a') ), Ground) )):
+    assert not X.is_instantiated( ) and Copy.is_instantiated( )
+  # A Structure that is ground only while X is bound is copied, not shared.
+  T = Structure( ('f', Structure( ('g', X) )) )
+  for _ in unify(X, 'a'):
+    assert T.is_instantiated( )
+    Copy = copy_term(T)
+  assert str(Copy) == 'f(g(a))' and Copy.args[0] is not T.args[0] and Copy.args[0].args[0] is not X
+  # Long lists are copied with an explicit stack.
+  assert copy_term(LinkedList([Var( ) for _ in range(5000)])).args[1].args[0] is not None
+  # House.fresh( ) copies a template of House( ), made once.
+  (H1, H2) = (House.fresh(nationality='English', color='red'), House.fresh(nationality='English', color='red'))
+  assert type(H1) is House and H1.first_arg_as_str_functor and str(H1.args[4]) == 'red'
+  assert H1.args[1] is not H2.args[1]
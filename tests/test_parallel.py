@@ -0,0 +1,49 @@
+from timeit import default_timer as timer
+
+from control_structures import trampoline
+from parallel import parallel_count, parallel_solutions, work_stealing_count, work_stealing_solutions, WorkStats
+
+from examples.n_queens.n_queens_fd import queens_problem
+
+
+def test_parallel_search_matches_sequential_search():
+  (goal, answer) = queens_problem(6)
+  expected = [answer( ) for _ in trampoline(goal)]
+  assert parallel_count(queens_problem, (6, ), depth=3, max_workers=2) == len(expected) == 4
+  assert list(parallel_solutions(queens_problem, (6, ), max_workers=2, ordered=True)) == expected
+  assert sorted(parallel_solutions(queens_problem, (6, ), max_workers=2)) == sorted(expected)
+  assert list(parallel_solutions(queens_problem, (6, ), limit=3, max_workers=2, ordered=True)) == expected[:3]
+
+
+def test_work_stealing_matches_sequential_search():
+  (goal, answer) = queens_problem(6)
+  expected = [answer( ) for _ in trampoline(goal)]
+  # Check after every alternative, so the workers share work even on so small a search.
+  stats = WorkStats( )
+  assert sorted(work_stealing_solutions(queens_problem, (6, ), workers=2, check_interval=1, stats=stats)) == expected
+  assert sum(stats.tasks) == sum(stats.steals) + 1 and sum(stats.solutions) == len(expected)
+  assert work_stealing_count(queens_problem, (6, ), workers=2, check_interval=1) == len(expected)
+  assert len(list(work_stealing_solutions(queens_problem, (6, ), limit=2, workers=2))) == 2
+
+
+def dead_end_problem( ):
+  """ A search whose first subtree has a solution at once, and whose second has none in 10**9 alternatives. """
+  def fail( ):
+    return
+    yield
+
+  def dead_end( ):
+    for _ in range(10**9):
+      yield fail( )
+
+  def top( ):
+    yield 'found'
+    yield dead_end( )
+
+  return (top( ), lambda: 'found')
+
+
+def test_reaching_the_limit_stops_the_running_workers():
+  start = timer( )
+  assert list(parallel_solutions(dead_end_problem, depth=1, limit=1, max_workers=2, ordered=True)) == ['found']
+  assert timer( ) - start < 30
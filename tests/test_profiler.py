@@ -0,0 +1,40 @@
+import json
+
+import sequence_options.super_sequence as super_sequence
+from logic_variables import PyValue, Var
+from profiler import Profiler
+from sequence_options.linked_list import append, LinkedList
+
+
+def test_ports_of_a_generator_predicate():
+  profiler = Profiler( )
+  member = profiler.profile(super_sequence.member, name='member')
+  E = Var( )
+  # Three exits. Asking for more after each is a redo, and the last redo fails.
+  assert [E.get_py_value( ) for _ in member(E, LinkedList([1, 2, 3]))] == [1, 2, 3]
+  # 'a' is not a member: called once, failed once.
+  assert list(member(PyValue('a'), LinkedList([1, 2, 3]))) == []
+  stats = profiler.stats['member']
+  assert (stats.calls, stats.exits, stats.redos, stats.fails) == (2, 3, 3, 2)
+  assert 0 <= stats.exclusive <= stats.inclusive
+  assert json.loads(profiler.to_json( ))['member']['exits'] == 3
+
+
+def test_attach_and_detach():
+  original = super_sequence.member
+  with Profiler( ).attach(super_sequence, 'member') as profiler:
+    assert super_sequence.member is not original
+    for _ in super_sequence.member(PyValue(2), LinkedList([1, 2])):
+      pass
+  assert super_sequence.member is original
+  assert profiler.stats['sequence_options.super_sequence.member'].exits == 1
+
+
+def test_trampolined_goal_is_one_call():
+  profiler = Profiler( )
+  profiled_append = profiler.profile(append)
+  (Xs, Ys) = (Var( ), Var( ))
+  assert sum(1 for _ in profiled_append(Xs, Ys, LinkedList(list(range(5))))) == 6
+  (name, stats) = profiler.sorted_stats( )[0]
+  assert (name, stats.calls, stats.exits, stats.fails) == ('append', 1, 6, 1)
+  assert 'append' in profiler.report( )
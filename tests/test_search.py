@@ -0,0 +1,142 @@
+import re
+from itertools import islice
+from random import Random
+
+import pytest
+
+from finite_domains import FDVar, NotEqual, post
+from logic_variables import StructureItem, unify, Var
+from search import geometric, label, luby, median_first, restarts, RestartStats, VALUE_ORDERS, VAR_ORDERS
+from sequence_options.sequences import PyList
+from sequence_options.super_sequence import members
+
+from examples.logic_puzzles.puzzles import Problem
+from examples.logic_puzzles.scholarship_problem import ScholarshipProblem
+from examples.logic_puzzles.zebra_problem import ZebraProblem
+from examples.n_queens.n_queens_fd import queens_constraints
+
+
+def queens_solutions(var_order, value_order, tie_break='first'):
+  Queens = [FDVar(range(6)) for _ in range(6)]
+  return [tuple(Q.get_py_value( ) for Q in Queens) for _ in post(*queens_constraints(Queens))
+          for _ in label(Queens, var_order, value_order, tie_break, Random(6))]
+
+
+def test_every_heuristic_finds_the_same_solutions():
+  expected = queens_solutions('input_order', 'min')
+  assert len(expected) == 4 and expected == sorted(expected)
+  for var_order in VAR_ORDERS:
+    for value_order in VALUE_ORDERS:
+      for tie_break in ('first', 'random'):
+        found = queens_solutions(var_order, value_order, tie_break)
+        assert sorted(found) == expected and len(found) == len(expected)
+  assert queens_solutions('input_order', 'max') == expected[::-1]
+
+
+def test_value_orders_and_custom_heuristics():
+  assert median_first(FDVar([1, 2, 3, 4, 5]), Random( )) == [3, 2, 4, 1, 5]
+  (X, Y) = (FDVar(range(3)), FDVar(range(2)))
+  # Label the largest domain first, with its values largest first.
+  order = []
+  for _ in label([Y, X], lambda V: -V.size( ), lambda V, _: V.values( )[::-1]):
+    order.append((X.get_py_value( ), Y.get_py_value( )))
+  assert order[:3] == [(2, 1), (2, 0), (1, 1)]
+  with pytest.raises(ValueError):
+    label([X], 'smallest')
+
+
+def test_failing_propagators_gain_weight():
+  (X, Y) = (FDVar([1, 2]), FDVar([1, 2]))
+  Z = FDVar([1, 2])
+  constraints = [NotEqual(X, Y), NotEqual(Y, Z), NotEqual(X, Z)]
+  assert [list(label([X, Y, Z], 'dom/wdeg')) for _ in post(*constraints)] == [[]]
+  assert sum(constraint.weight for constraint in constraints) > len(constraints)
+
+
+def test_cutoff_sequences():
+  assert list(islice(luby( ), 15)) == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+  assert list(islice(geometric(10, 1.5), 3)) == [10, 15, 22.5]
+
+
+def test_restarts_cut_runs_and_keep_state_off_the_trail():
+  Queens = [FDVar(range(8)) for _ in range(8)]
+  rng = Random(8)
+  stats = RestartStats( )
+  for _ in post(*queens_constraints(Queens)):
+    # Each run gets 2 fails. The rng is not reset, so each run labels differently.
+    search = lambda stop: label(Queens, 'first_fail', 'random', 'random', rng, stop)
+    solutions = [tuple(Q.get_py_value( ) for Q in Queens) for _ in restarts(search, [2] * 50, stats=stats)]
+    # Once a run finishes uncut, its search space is exhausted: it found all 92 solutions.
+    assert len(set(solutions)) == 92
+    # Every run's bindings were undone.
+    assert all(Q.size( ) == 8 for Q in Queens)
+  assert stats.restarts == len(stats.runs) - 1 > 0
+  assert all(cutoff == 2 for (cutoff, _, _, _) in stats.runs[:-1]) and stats.runs[-1][0] is None
+
+
+
+def test_each_restarts_call_starts_its_own_cutoffs():
+  def churn(stop, runs):
+    """ Fail until stopped, in the first three runs. The fourth run finishes. """
+    runs.append(None)
+    X = Var( )
+    while len(runs) < 4 and not stop( ):
+      for _ in unify(X, 1):
+        pass
+    yield from ( )
+
+  for _ in range(2):
+    (stats, runs) = (RestartStats( ), [])
+    list(restarts(lambda stop: churn(stop, runs), stats=stats))
+    assert [cutoff for (cutoff, _, _, _) in stats.runs] == [100, 100, 200, 100]
+
+
+def test_backjumping_finds_the_same_solutions_with_fewer_rule_applications():
+  for Problem in [ScholarshipProblem, ZebraProblem]:
+    (chronological, backjumping) = (Problem( ), Problem( ))
+    for problem in (chronological, backjumping):
+      problem.ListType = PyList
+      problem.show_trace_list = []
+    # The names of unbound Vars differ from run to run.
+    solutions = [re.sub(r'_\d+', '_', str(chronological.Items)) for _ in chronological.run_all_clues( )]
+    assert [re.sub(r'_\d+', '_', str(backjumping.Items)) for _ in backjumping.run_all_clues_backjumping( )] \
+           == solutions
+  assert backjumping.backjumps.count( ) > 0
+  assert backjumping.rule_applications.count( ) < chronological.rule_applications.count( )
+
+
+class Letter(StructureItem):
+  __slots__ = ()
+
+  def __init__(self, a=None):
+    super( ).__init__( (a, ) )
+
+
+class NestedChoiceProblem(Problem):
+
+  def clue_0(self, _):
+    self.Items = self.ListType([Letter.fresh( ) for _ in range(4)])
+    self.check_all_for_distinctness(Letter)
+    self.clues += [self.clue_1, self.clue_2]
+    yield
+
+  def clue_1(self, Letters):
+    """ A choice point inside a choice point: where p is, then where q is. """
+    for _ in members([Letter.fresh(a='p'), Letter.fresh(a='q')], Letters):
+      yield
+
+  def clue_2(self, Letters):
+    for _ in unify(Letter.fresh(a='r'), Letters[0]):
+      yield
+
+
+def test_backjumping_replays_a_clue_with_nested_choice_points():
+  # p in Letters[0] makes clue_2 fail outright. clue_1 is responsible, but undoing it undoes its choice of p too.
+  (chronological, backjumping) = (NestedChoiceProblem( ), NestedChoiceProblem( ))
+  for problem in (chronological, backjumping):
+    problem.ListType = PyList
+    problem.show_trace_list = []
+  solutions = [re.sub(r'_\d+', '_', str(chronological.Items)) for _ in chronological.run_all_clues( )]
+  assert len(solutions) == 6
+  assert [re.sub(r'_\d+', '_', str(backjumping.Items)) for _ in backjumping.run_all_clues_backjumping( )] \
+         == solutions
@@ -0,0 +1,45 @@
+from control_structures import trampoline
+from logic_variables import PyValue, Var
+from sequence_options.linked_list import append, LinkedList
+from sequence_options.sequences import PyList
+from sequence_options.super_sequence import is_a_subsequence_of, member
+
+
+def test_append_splits_a_long_linked_list():
+  (Xs, Ys, Zs) = (Var( ), Var( ), LinkedList(list(range(10_000))))
+  assert sum(1 for _ in append(Xs, Ys, Zs)) == 10_001
+
+
+def test_append_joins_a_long_linked_list():
+  (Xs, Ys, Zs) = (LinkedList(list(range(10_000))), LinkedList(['end']), Var( ))
+  for _ in append(Xs, Ys, Zs):
+    assert Zs.unification_chain_end( ).get_py_value( )[-2:] == [9_999, 'end']
+  assert not Zs.is_instantiated( )
+
+
+def test_member_enumerates_in_order():
+  E = Var( )
+  assert [E.get_py_value( ) for _ in member(E, PyList(['a', 'b', 'c']))] == ['a', 'b', 'c']
+
+
+def test_is_a_subsequence_of():
+  Zs = LinkedList(list(range(6)))
+  X = Var( )
+  assert [X.get_py_value( ) for _ in is_a_subsequence_of([PyValue(1), X, PyValue(4)], Zs)] == [2, 3]
+
+
+def test_trampoline_passes_values_and_closes_early():
+  closed = []
+
+  def count_down(n):
+    try:
+      yield n
+      if n > 0:
+        yield count_down(n - 1)
+    finally:
+      closed.append(n)
+
+  assert list(trampoline(count_down(3))) == [3, 2, 1, 0]
+  for _ in trampoline(count_down(5)):
+    break
+  assert closed[-1] == 5
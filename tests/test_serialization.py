@@ -0,0 +1,52 @@
+import pickle
+import re
+
+import pytest
+
+from finite_domains import FDVar
+from logic_variables import PyValue, Structure, unify, Var
+from parallel import work_stealing_solutions
+from sequence_options.linked_list import LinkedList
+from sequence_options.sequences import PyList, PyTuple
+from serialization import dumps, loads
+
+from examples.logic_puzzles.zebra_problem import House
+
+
+def test_round_trips_keep_shapes_constants_and_shared_vars():
+  (X, Y, Z) = (Var( ), Var( ), Var( ))
+  Cell = Structure(('cell', X, 1.5))
+  for _ in unify(Y, 'bound'):
+    T = PyList([House(nationality='English', pet=X), Cell, Cell, PyTuple((1, 1.0, True, Y, Z)), PyValue( )])
+    (Copy, Answer) = loads(dumps((T, Structure(('answer', Z)))))
+    # The names of unbound Vars differ.
+    assert re.sub(r'_\d+', '_', str(Copy)) == re.sub(r'_\d+', '_', str(T))
+    assert type(Copy.args[0]) is House and Copy.args[0].first_arg_as_str_functor
+    # The copy shares what T shares, and only that. Its Vars are new.
+    (pet, cell) = (Copy.args[0].args[2], Copy.args[1])
+    assert cell is Copy.args[2] and cell.args[0] is pet and isinstance(pet, Var) and pet is not X
+    assert Answer.args[0] is Copy.args[3].args[4] is not Z
+    # A bound Var is written as its value. 1, 1.0 and True stay apart.
+    assert [type(arg.get_py_value( )) for arg in Copy.args[3].args[:4]] == [int, float, bool, str]
+    assert not Copy.args[4].is_instantiated( )
+  assert dumps(T) != dumps(House( ))
+
+
+def test_long_lists_and_what_cant_be_written():
+  # pickle recurses once per cell.
+  Long = LinkedList(list(range(5000)))
+  assert loads(dumps(Long)).get_py_value( ) == Long.get_py_value( )
+  Short = LinkedList(list(range(50)))
+  assert len(dumps(Short)) * 2 < len(pickle.dumps(Short))
+  with pytest.raises(ValueError):
+    dumps(PyList([FDVar(range(3))]))
+
+
+def house_problem( ):
+  Houses = PyList([House( ) for _ in range(2)])
+  return (unify(Houses.args[0].args[0], 'English'), lambda: Houses)
+
+
+def test_workers_send_terms_with_vars():
+  [Houses] = work_stealing_solutions(house_problem, workers=1)
+  assert str(Houses.args[0].args[0]) == 'English' and isinstance(Houses.args[1].args[0], Var)